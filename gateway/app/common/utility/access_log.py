@@ -0,0 +1,234 @@
+"""
+게이트웨이 비동기 로깅 + 구조화 액세스 로그
+
+- 모든 로그는 QueueHandler로 큐에 넣기만 하고, 실제 stdout 쓰기는 QueueListener 스레드가 수행
+  (이벤트 루프가 stdout I/O에 막히지 않음. 큐가 가득 차면 버리고 개수만 셈)
+- 요청마다 JSON 액세스 로그 한 줄 (request ID, 상태, 전체/업스트림/게이트웨이 처리 시간 등)
+- 2xx/3xx는 샘플링, 4xx/5xx와 느린 요청은 항상 기록
+"""
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import time
+import uuid
+
+from app.common.utility.metrics import metrics
+
+REQUEST_ID_HEADER = "x-request-id"
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("GATEWAY_ACCESS_LOG_SAMPLE_RATE", 1.0))
+ACCESS_LOG_SLOW_MS = float(os.getenv("GATEWAY_ACCESS_LOG_SLOW_MS", 1000))
+
+access_logger = logging.getLogger("gateway_api.access")
+
+# 요청 처리 중 프록시/캐시 등이 채우는 액세스 로그 필드
+_request_context: ContextVar[Optional[Dict[str, Any]]] = ContextVar("gateway_request_context", default=None)
+
+
+def annotate(**fields: Any) -> None:
+    """현재 요청의 액세스 로그에 필드 추가 (요청 밖에서는 무시)"""
+    context = _request_context.get()
+    if context is not None:
+        context.update(fields)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """현재 요청의 구간 시간(ms) 누적"""
+    context = _request_context.get()
+    if context is not None:
+        context[name] = round(context.get(name, 0.0) + seconds * 1000, 3)
+
+
+def default_timing(name: str, seconds: float) -> None:
+    """구간 시간이 아직 기록되지 않았을 때만 기록 (병합된 요청의 대기 시간 등)"""
+    context = _request_context.get()
+    if context is not None and name not in context:
+        context[name] = round(seconds * 1000, 3)
+
+
+def detach_context() -> None:
+    """현재 태스크의 필드 기록을 부모 요청과 분리 (batch 하위 요청처럼 같은 요청 안에서 병렬 실행될 때)"""
+    context = _request_context.get()
+    if context is not None:
+        _request_context.set({"request_id": context.get("request_id")})
+
+
+def current_request_id() -> Optional[str]:
+    context = _request_context.get()
+    return context.get("request_id") if context is not None else None
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """큐가 가득 차면 요청 경로를 막지 않고 레코드를 버림"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _AccessFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, "access", None)
+        if fields is None:
+            return super().format(record)
+        return json.dumps(fields, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class _RouterFormatter(logging.Formatter):
+    """액세스 로그는 JSON 한 줄, 그 외 로그는 기존 텍스트 포맷"""
+
+    def __init__(self, fmt: str):
+        super().__init__(fmt)
+        self._access = _AccessFormatter()
+
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "access", None) is not None:
+            return self._access.format(record)
+        return super().format(record)
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[_DroppingQueueHandler] = None
+
+
+def setup_logging(level: Optional[str] = None) -> None:
+    """루트 로거를 큐 기반 비동기 핸들러로 구성 (여러 번 호출해도 한 번만 적용)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=int(os.getenv("GATEWAY_LOG_QUEUE_SIZE", 10000)))
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(_RouterFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    _queue_handler = _DroppingQueueHandler(log_queue)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel((level or os.getenv("GATEWAY_LOG_LEVEL", "INFO")).upper())
+    # httpx/httpcore는 요청마다 INFO 로그를 남기므로 액세스 로그와 중복되지 않게 낮춤
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """남은 로그를 모두 쓴 뒤 리스너 스레드 종료"""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+def _should_log(status: int, duration_ms: float) -> bool:
+    if status >= 400 or duration_ms >= ACCESS_LOG_SLOW_MS:
+        return True
+    return ACCESS_LOG_SAMPLE_RATE >= 1.0 or random.random() < ACCESS_LOG_SAMPLE_RATE
+
+
+class AccessLogMiddleware:
+    """요청당 JSON 액세스 로그 한 줄을 남기고 요청 메트릭을 집계하는 ASGI 미들웨어 (X-Request-ID 부여/전달)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _REQUEST_ID_PATTERN.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+            # 프록시 핸들러가 요청 헤더를 그대로 업스트림에 전달하므로 스코프에 주입
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, value) for name, value in scope["headers"] if name != b"x-request-id"
+            ] + [(b"x-request-id", request_id.encode())]
+
+        context: Dict[str, Any] = {"request_id": request_id}
+        token = _request_context.set(context)
+        state = {"status": 500, "bytes": 0}
+        encoded_id = request_id.encode()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                state["status"] = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", encoded_id)]
+            elif message["type"] == "http.response.body":
+                state["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        error = None
+        metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _request_context.reset(token)
+            metrics.in_flight -= 1
+            duration_ms = (time.perf_counter() - started) * 1000
+            # 메트릭은 샘플링과 무관하게 모든 요청을 집계
+            upstream_ms = context.get("upstream_ms")
+            metrics.observe_request(
+                context.get("service"),
+                scope["method"],
+                state["status"],
+                duration_ms / 1000,
+                upstream_ms / 1000 if upstream_ms is not None else None,
+            )
+            if _should_log(state["status"], duration_ms):
+                self._emit(scope, context, state, duration_ms, error)
+
+    @staticmethod
+    def _emit(scope, context: Dict[str, Any], state: Dict[str, int], duration_ms: float, error: Optional[str]) -> None:
+        client = scope.get("client")
+        record = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()) + "Z",
+            "type": "access",
+            "request_id": context.pop("request_id"),
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": state["status"],
+            "duration_ms": round(duration_ms, 3),
+            "bytes_out": state["bytes"],
+            "client": client[0] if client else None,
+        }
+        upstream_ms = context.get("upstream_ms")
+        if upstream_ms is not None:
+            record["gateway_ms"] = round(max(duration_ms - upstream_ms, 0.0), 3)
+        record.update(context)
+        if error:
+            record["error"] = error
+        level = logging.ERROR if state["status"] >= 500 else logging.WARNING if state["status"] >= 400 else logging.INFO
+        access_logger.log(level, "access", extra={"access": record})
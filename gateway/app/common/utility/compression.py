@@ -0,0 +1,318 @@
+"""
+게이트웨이 응답 압축 (Accept-Encoding 협상: br / zstd / gzip)
+
+GRI 표준 목록, TCFD 축 같은 큰 JSON 카탈로그가 모바일 PWA로 압축 없이 전송되지 않도록
+게이트웨이에서 클라이언트가 지원하는 인코딩으로 압축한다.
+- 일정 크기(GATEWAY_COMPRESSION_MIN_BYTES) 미만이거나 이미 압축된 응답/바이너리 타입은 그대로 전달
+- 스트리밍 응답은 청크 단위로 이어서 압축하고 청크마다 flush (전체 버퍼링 없음)
+- 캐시 응답은 저장 시 인코딩별로 한 번만 압축해 두고 요청마다 재사용 (precompress)
+
+brotli / zstandard 패키지가 없으면 해당 인코딩만 비활성화되고 gzip은 항상 사용 가능하다.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import os
+import zlib
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치 시 br 비활성화
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard 미설치 시 zstd 비활성화
+    zstandard = None
+
+logger = logging.getLogger("gateway_api")
+
+COMPRESSION_ENABLED = os.getenv("GATEWAY_COMPRESSION", "true").lower() in ("1", "true", "yes")
+MIN_BYTES = int(os.getenv("GATEWAY_COMPRESSION_MIN_BYTES", 1024))
+# 이보다 큰 본문은 이벤트 루프를 막지 않도록 스레드에서 압축
+THREAD_BYTES = int(os.getenv("GATEWAY_COMPRESSION_THREAD_BYTES", 256 * 1024))
+
+# 요청마다 압축할 때는 빠른 레벨, 캐시 항목은 한 번만 압축하므로 높은 레벨
+STREAM_LEVELS = {"br": 4, "zstd": 3, "gzip": 6}
+CACHE_LEVELS = {"br": 9, "zstd": 10, "gzip": 9}
+
+# 압축해도 이득이 없는(이미 압축된) 타입은 제외하고 텍스트 계열만 압축
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/problem+json", "application/javascript",
+    "application/xml", "application/x-ndjson", "image/svg+xml",
+)
+# 이벤트 스트림은 청크 단위 지연이 중요하므로 압축하지 않음
+_EXCLUDED_TYPES = ("text/event-stream",)
+
+
+def _available() -> Tuple[str, ...]:
+    encodings = []
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    encodings.append("gzip")
+    return tuple(encodings)
+
+
+def _configured(available: Tuple[str, ...]) -> Tuple[str, ...]:
+    """GATEWAY_COMPRESSION_ENCODINGS(선호 순서) 중 설치된 인코딩만 사용"""
+    raw = os.getenv("GATEWAY_COMPRESSION_ENCODINGS", "")
+    if not raw.strip():
+        return available
+    encodings = []
+    for name in raw.split(","):
+        name = name.strip().lower()
+        if name in available and name not in encodings:
+            encodings.append(name)
+        elif name:
+            logger.warning(f"⚠️ 사용할 수 없는 압축 인코딩 무시: {name}")
+    return tuple(encodings)
+
+
+# 서버 선호 순서 (q 값이 같으면 앞쪽 우선)
+ENCODINGS: Tuple[str, ...] = _configured(_available())
+
+
+def negotiate(accept_encoding: Optional[str], encodings: Iterable[str] = None) -> Optional[str]:
+    """Accept-Encoding(q 값 포함)에서 사용할 인코딩 선택. 압축하지 않으면 None"""
+    if not accept_encoding:
+        return None
+    encodings = tuple(ENCODINGS if encodings is None else encodings)
+    qualities: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qualities[name] = q
+
+    best, best_q = None, 0.0
+    for name in encodings:
+        q = qualities.get(name, qualities.get("*", 0.0))
+        if q > best_q:
+            best, best_q = name, q
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    if not content_type:
+        return False
+    content_type = content_type.lower()
+    if content_type.startswith(_EXCLUDED_TYPES):
+        return False
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress(body: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """본문 전체를 한 번에 압축"""
+    level = STREAM_LEVELS[encoding] if level is None else level
+    if encoding == "gzip":
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _wants_precompress(body: bytes, content_type: Optional[str]) -> bool:
+    return COMPRESSION_ENABLED and len(body) >= MIN_BYTES and is_compressible(content_type)
+
+
+def precompress(
+    body: bytes,
+    content_type: Optional[str],
+    encodings: Iterable[str] = None,
+    levels: Optional[Dict[str, int]] = None,
+) -> Dict[str, bytes]:
+    """캐시 저장용: 인코딩별 압축본 (압축 이득이 없으면 생략)"""
+    if not _wants_precompress(body, content_type):
+        return {}
+    levels = CACHE_LEVELS if levels is None else levels
+    variants = {}
+    for encoding in ENCODINGS if encodings is None else encodings:
+        compressed = compress(body, encoding, levels[encoding])
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+
+async def precompress_async(
+    body: bytes,
+    content_type: Optional[str],
+    encodings: Iterable[str] = None,
+    levels: Optional[Dict[str, int]] = None,
+) -> Dict[str, bytes]:
+    """precompress를 스레드에서 실행 (캐시 레벨 br/zstd/gzip 3종은 수십 KB 본문도 이벤트 루프를 수 ms 이상 막음)"""
+    if not _wants_precompress(body, content_type):
+        return {}
+    return await asyncio.to_thread(precompress, body, content_type, encodings, levels)
+
+
+class StreamCompressor:
+    """청크 단위 증분 압축. 청크마다 flush해 NDJSON/진행 상황 스트림이 압축 버퍼에 묶이지 않게 함"""
+
+    def __init__(self, encoding: str, level: Optional[int] = None):
+        level = STREAM_LEVELS[encoding] if level is None else level
+        self.encoding = encoding
+        if encoding == "gzip":
+            compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+            self._compress: Callable[[bytes], bytes] = compressor.compress
+            self._flush: Callable[[], bytes] = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish: Callable[[], bytes] = compressor.flush
+        elif encoding == "br":
+            compressor = brotli.Compressor(quality=level)
+            self._compress = compressor.process
+            self._flush = compressor.flush
+            self._finish = compressor.finish
+        elif encoding == "zstd":
+            compressor = zstandard.ZstdCompressor(level=level).compressobj()
+            self._compress = compressor.compress
+            self._flush = lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+            self._finish = compressor.flush
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compress(chunk) + self._flush() if chunk else b""
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """압축본 ETag: "abc" → "abc-gzip" (약한 ETag는 그대로)"""
+    if etag.startswith("W/") or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def add_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """Vary에 Accept-Encoding 추가 (이미 있으면 유지)"""
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            tokens = [v.strip().lower() for v in value.split(b",")]
+            if b"accept-encoding" not in tokens and b"*" not in tokens:
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """Accept-Encoding 협상 후 응답 본문을 압축하는 ASGI 미들웨어
+
+    이미 Content-Encoding이 있는 응답(캐시의 사전 압축본, 업스트림 압축 스트림)은 건드리지 않는다.
+    """
+
+    def __init__(self, app, minimum_size: Optional[int] = None):
+        self.app = app
+        self.minimum_size = MIN_BYTES if minimum_size is None else minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.minimum_size)
+        await self.app(scope, receive, responder.send_wrapper)
+
+
+class _CompressionResponder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        # 여러 청크로 나뉜 본문을 압축 중일 때만 설정
+        self.compressor: Optional[StreamCompressor] = None
+        self.passthrough = False
+
+    def _should_compress(self, message) -> bool:
+        status = message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        content_type = None
+        for name, value in message.get("headers", []):
+            name = name.lower()
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+            elif name == b"content-length" and int(value) < self.minimum_size:
+                return False
+        return is_compressible(content_type)
+
+    def _encoded_headers(self, length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+        headers = [
+            (name, value) for name, value in self.start_message.get("headers", [])
+            if name.lower() not in (b"content-length", b"etag")
+        ]
+        # 압축본은 바이트가 다르므로 강한 ETag는 인코딩별로 구분
+        for name, value in self.start_message.get("headers", []):
+            if name.lower() == b"etag":
+                headers.append((name, variant_etag(value.decode("latin-1"), self.encoding).encode("latin-1")))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return add_vary(headers)
+
+    async def send_wrapper(self, message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if self._should_compress(message):
+                # 본문 첫 청크를 보고 전체 압축/스트리밍 압축 여부를 결정하므로 보류
+                self.start_message = message
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body:
+                # 단일 본문: 최소 크기 이상일 때만 한 번에 압축
+                if len(body) < self.minimum_size:
+                    self.passthrough = True
+                    await self.send(self.start_message)
+                    await self.send(message)
+                    return
+                if len(body) >= THREAD_BYTES:
+                    compressed = await asyncio.to_thread(compress, body, self.encoding)
+                else:
+                    compressed = compress(body, self.encoding)
+                self.start_message["headers"] = self._encoded_headers(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            self.compressor = StreamCompressor(self.encoding)
+            self.start_message["headers"] = self._encoded_headers(None)
+            await self.send(self.start_message)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        if data or not more_body:
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
@@ -0,0 +1,221 @@
+"""
+POST Idempotency-Key 처리 (중복 실행 방지 + 결과 재전송)
+
+리포트 생성(/grireport/generate, /tcfdreport/generate)이나 회원가입(/auth/signup)처럼 비싼 POST를
+클라이언트가 타임아웃 후 재시도해도 업스트림에서는 한 번만 실행되도록 한다.
+- 같은 키의 요청이 처리 중이면 새로 실행하지 않고 먼저 온 요청의 결과를 기다림
+  (먼저 온 클라이언트가 연결을 끊어도 실행은 계속되고 기다리던 요청은 결과를 받음)
+- 완료된 결과는 TTL 동안 메모리 예산이 있는 저장소에 보관하고, 재시도는 업스트림 호출 없이
+  저장된 응답을 `Idempotent-Replayed: true` 헤더와 함께 그대로 돌려줌
+- 같은 키로 다른 본문/경로를 보내면 422 (키 재사용 오류)
+- 5xx, 408, 429와 게이트웨이 오류(타임아웃, 서킷 오픈 등)는 저장하지 않으므로 재시도 시 다시 실행
+키는 서비스, 업스트림 경로, Authorization 단위로 구분되어 다른 사용자의 결과가 재전송되지 않는다.
+저장소는 프로세스 내에 있으므로 게이트웨이 레플리카가 여럿이면 같은 키가 같은 레플리카로 가야 한다.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+from urllib.parse import urlencode
+import asyncio
+import hashlib
+import os
+import time
+import logging
+
+import httpx
+from fastapi import HTTPException
+
+logger = logging.getLogger("gateway_api")
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# 재시도하면 다른 결과가 나올 수 있어 저장하지 않는 상태 코드 (5xx는 별도로 제외)
+_RETRYABLE_STATUS = {408, 425, 429}
+# 저장 응답에 싣지 않는 헤더 (httpx가 본문을 디코딩하므로 길이/인코딩도 제외)
+_UNSTORED_HEADERS = {
+    "content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive", "date", "server",
+}
+
+
+@dataclass
+class StoredResponse:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    media_type: Optional[str]
+    fingerprint: str
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+
+class IdempotencyKeyMismatch(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request",
+        )
+
+
+class IdempotencyStore:
+    def __init__(
+        self,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None,
+        max_key_length: Optional[int] = None,
+    ):
+        self.ttl = ttl or float(os.getenv("GATEWAY_IDEMPOTENCY_TTL", 3600))
+        self.max_bytes = max_bytes or int(os.getenv("GATEWAY_IDEMPOTENCY_MAX_BYTES", 32 * 1024 * 1024))
+        self.max_entries = max_entries or int(os.getenv("GATEWAY_IDEMPOTENCY_MAX_ENTRIES", 10000))
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv("GATEWAY_IDEMPOTENCY_MAX_ENTRY_BYTES", 1024 * 1024))
+        self.max_key_length = max_key_length or int(os.getenv("GATEWAY_IDEMPOTENCY_MAX_KEY_LENGTH", 255))
+        # TTL이 모두 같으므로 삽입 순서 = 만료 순서 (앞에서부터 만료/축출)
+        self._entries: "OrderedDict[str, StoredResponse]" = OrderedDict()
+        self._in_flight: Dict[str, Tuple[asyncio.Task, str]] = {}
+        self._bytes = 0
+        self.executed = 0
+        self.replayed = 0
+        self.joined = 0
+        self.mismatched = 0
+        self.not_stored = 0
+        self.evictions = 0
+
+    def scope_key(self, service: str, upstream_path: str, key: str, headers: Mapping[str, str]) -> str:
+        """서비스 + 업스트림 경로 + 호출자(Authorization) + Idempotency-Key"""
+        key = key.strip()
+        if not key or len(key) > self.max_key_length:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be 1-{self.max_key_length} characters",
+            )
+        caller = hashlib.blake2b(headers.get("authorization", "").encode("utf-8"), digest_size=8).hexdigest()
+        return f"{service}:{upstream_path}:{caller}:{key}"
+
+    @staticmethod
+    def fingerprint(method: str, upstream_path: str, query_items: Iterable[Tuple[str, str]], body: bytes) -> str:
+        """같은 키로 다른 요청을 보냈는지 판별하기 위한 요청 지문"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{method} {upstream_path}?{urlencode(sorted(query_items))}\n".encode("utf-8"))
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _lookup(self, key: str) -> Optional[StoredResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        return entry
+
+    async def execute(
+        self,
+        key: str,
+        fingerprint: str,
+        fn: Callable[[], Awaitable[httpx.Response]],
+    ) -> Tuple[Union[StoredResponse, httpx.Response], str]:
+        """(응답, 결과) 반환. 결과: executed(업스트림 호출) / replayed(저장 결과) / joined(진행 중 호출 결과)"""
+        entry = self._lookup(key)
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                self.mismatched += 1
+                raise IdempotencyKeyMismatch()
+            self.replayed += 1
+            return entry, "replayed"
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            task, in_flight_fingerprint = in_flight
+            if in_flight_fingerprint != fingerprint:
+                self.mismatched += 1
+                raise IdempotencyKeyMismatch()
+            self.joined += 1
+            return await asyncio.shield(task), "joined"
+
+        async def run() -> httpx.Response:
+            response = await fn()
+            self._store(key, fingerprint, response)
+            return response
+
+        # 별도 Task로 실행해 먼저 온 요청이 취소돼도 실행과 저장은 끝까지 진행
+        task = asyncio.ensure_future(run())
+        self._in_flight[key] = (task, fingerprint)
+        task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        self.executed += 1
+        return await asyncio.shield(task), "executed"
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and in_flight[0] is task:
+            del self._in_flight[key]
+        # 기다리던 요청이 모두 취소된 경우에도 예외가 처리되지 않은 채 남지 않도록 조회
+        if not task.cancelled():
+            task.exception()
+
+    def _store(self, key: str, fingerprint: str, response: httpx.Response) -> None:
+        if response.status_code >= 500 or response.status_code in _RETRYABLE_STATUS:
+            self.not_stored += 1
+            return
+        entry = StoredResponse(
+            status_code=response.status_code,
+            headers={k: v for k, v in response.headers.items() if k.lower() not in _UNSTORED_HEADERS},
+            body=response.content,
+            media_type=response.headers.get("content-type"),
+            fingerprint=fingerprint,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        if entry.size > self.max_entry_bytes:
+            # 큰 응답은 저장하지 않음 (재시도 시 다시 실행)
+            self.not_stored += 1
+            logger.warning(f"⚠️ Idempotency 응답이 커서 저장하지 않음: {entry.size} bytes > {self.max_entry_bytes}")
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        """만료된 항목과, 예산(바이트/개수)을 넘는 오래된 항목부터 제거"""
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            expired = entry.expires_at <= now
+            if not expired and self._bytes <= self.max_bytes and len(self._entries) <= self.max_entries:
+                break
+            self._remove(key)
+            if not expired:
+                self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "in_flight": len(self._in_flight),
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "joined": self.joined,
+            "mismatched": self.mismatched,
+            "not_stored": self.not_stored,
+            "evictions": self.evictions,
+        }
+
+
+# 게이트웨이 전역 Idempotency-Key 저장소
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,233 @@
+"""
+게이트웨이 Prometheus 메트릭 (텍스트 노출 형식 0.0.4)
+
+외부 의존성 없이 카운터/히스토그램만 직접 구현한다.
+- 요청 수/에러 수: 서비스, 메서드(표준 메서드 외에는 OTHER), 상태 코드별
+- 지연 히스토그램: 전체 / 업스트림 대기 / 게이트웨이 자체 오버헤드
+- 파일 업로드: 바이트 수, 구간(수신/전달)별 시간, 수신 처리량
+- 커넥션 풀, 캐시, 동시성 제한 등 런타임 상태는 수집 함수(collector)로 조회 시점에 계산
+"""
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[Mapping[str, object], float]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 메서드 레이블로 그대로 쓰는 표준 HTTP 메서드. 클라이언트가 보낸 임의 메서드는 OTHER로 묶어 시계열 수를 제한
+STANDARD_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"})
+
+# 업스트림/전체 지연용 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 게이트웨이 오버헤드는 훨씬 짧으므로 더 촘촘하게
+OVERHEAD_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+# 업로드 처리량 (bytes/s): 느린 모바일 회선 ~ 데이터센터 내부
+THROUGHPUT_BUCKETS = (
+    64 * 1024, 256 * 1024, 1024 ** 2, 4 * 1024 ** 2, 16 * 1024 ** 2, 64 * 1024 ** 2, 256 * 1024 ** 2, 1024 ** 3,
+)
+
+
+def method_label(method: str) -> str:
+    method = method.upper()
+    return method if method in STANDARD_METHODS else "OTHER"
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[object]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨별 [버킷별 개수..., +Inf 개수], 합계
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        # 누적은 출력 시 계산하고 관측 시에는 해당 버킷 하나만 증가
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}"
+                )
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(self._sums[labels])}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+def gauge(name: str, documentation: str, samples: Iterable[Sample], metric_type: str = "gauge") -> List[str]:
+    """조회 시점에 계산한 값들을 gauge(또는 counter) 형식으로 출력"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        if value is None:
+            continue
+        lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+    return lines
+
+
+class GatewayMetrics:
+    def __init__(self):
+        self.requests = Counter(
+            "gateway_requests_total", "Requests handled by the gateway", ("service", "method", "status")
+        )
+        self.errors = Counter(
+            "gateway_request_errors_total", "Requests answered with 4xx/5xx", ("service", "method", "status_class")
+        )
+        self.duration = Histogram(
+            "gateway_request_duration_seconds", "Total request latency seen by clients", ("service", "method")
+        )
+        self.upstream = Histogram(
+            "gateway_upstream_duration_seconds", "Time spent waiting for upstream response headers", ("service", "method")
+        )
+        self.overhead = Histogram(
+            "gateway_overhead_seconds",
+            "Gateway processing time excluding upstream wait",
+            ("service", "method"),
+            buckets=OVERHEAD_BUCKETS,
+        )
+        self.upload_bytes = Counter("gateway_upload_bytes_total", "Multipart upload bytes received", ("service",))
+        self.upload_rejected = Counter(
+            "gateway_upload_rejected_total", "Multipart uploads rejected before forwarding", ("service", "reason")
+        )
+        self.upload_duration = Histogram(
+            "gateway_upload_duration_seconds",
+            "Multipart upload time by phase (receive=client to gateway spool, forward=gateway to upstream)",
+            ("service", "phase"),
+        )
+        self.upload_throughput = Histogram(
+            "gateway_upload_throughput_bytes_per_second",
+            "Client upload throughput while receiving multipart bodies",
+            ("service",),
+            buckets=THROUGHPUT_BUCKETS,
+        )
+        self.mirror_requests = Counter(
+            "gateway_mirror_requests_total", "Requests copied to shadow upstreams by result", ("service", "result")
+        )
+        self.mirror_diffs = Counter(
+            "gateway_mirror_diffs_total", "Primary/shadow response differences", ("service", "kind")
+        )
+        self.mirror_latency = Histogram(
+            "gateway_mirror_latency_seconds",
+            "Upstream latency of mirrored requests (primary vs shadow)",
+            ("service", "target"),
+        )
+        self.in_flight = 0
+        self._collectors: List[Callable[[], Iterable[List[str]]]] = []
+
+    def observe_request(
+        self,
+        service: Optional[str],
+        method: str,
+        status: int,
+        duration: float,
+        upstream: Optional[float],
+    ) -> None:
+        service = service or "gateway"
+        method = method_label(method)
+        self.requests.inc(service, method, str(status))
+        if status >= 400:
+            self.errors.inc(service, method, f"{status // 100}xx")
+        self.duration.observe(duration, service, method)
+        if upstream is not None:
+            self.upstream.observe(upstream, service, method)
+            self.overhead.observe(max(duration - upstream, 0.0), service, method)
+        else:
+            self.overhead.observe(duration, service, method)
+
+    def observe_upload(self, service: str, size: int, receive: float, forward: Optional[float]) -> None:
+        self.upload_bytes.inc(service, amount=size)
+        self.upload_duration.observe(receive, service, "receive")
+        if receive > 0:
+            self.upload_throughput.observe(size / receive, service)
+        if forward is not None:
+            self.upload_duration.observe(forward, service, "forward")
+
+    def observe_mirror(
+        self, service: str, primary: float, shadow: Optional[float], status_diff: bool, body_diff: bool
+    ) -> None:
+        self.mirror_latency.observe(primary, service, "primary")
+        if shadow is None:
+            self.mirror_requests.inc(service, "error")
+            return
+        self.mirror_requests.inc(service, "mirrored")
+        self.mirror_latency.observe(shadow, service, "shadow")
+        if status_diff:
+            self.mirror_diffs.inc(service, "status")
+        if body_diff:
+            self.mirror_diffs.inc(service, "body")
+
+    def register_collector(self, collector: Callable[[], Iterable[List[str]]]) -> None:
+        """조회 시점에 런타임 상태를 메트릭으로 변환하는 함수 등록"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in (
+            self.requests, self.errors, self.duration, self.upstream, self.overhead,
+            self.upload_bytes, self.upload_rejected, self.upload_duration, self.upload_throughput,
+            self.mirror_requests, self.mirror_diffs, self.mirror_latency,
+        ):
+            lines.extend(metric.render())
+        lines.extend(gauge("gateway_requests_in_flight", "Requests currently being handled", [({}, self.in_flight)]))
+        for collector in self._collectors:
+            for family in collector():
+                lines.extend(family)
+        return "\n".join(lines) + "\n"
+
+
+# 게이트웨이 전역 메트릭
+metrics = GatewayMetrics()
@@ -0,0 +1,365 @@
+"""
+게이트웨이 GET 응답 캐시 (TTL + 메모리 예산 LRU + Vary 인식 + ETag)
+
+카탈로그성 엔드포인트(/gri/standards 등)는 매번 같은 데이터를 돌려주므로
+라우트별 TTL 동안 게이트웨이에서 바로 응답하고, If-None-Match가 맞으면 304로 응답한다.
+압축 가능한 항목은 저장 시 인코딩별(br/zstd/gzip) 압축본을 함께 만들어 두어 요청마다 압축하지 않는다.
+(사전 압축은 스레드에서 수행하고, 공유 캐시에서 다시 채울 때는 빠른 레벨을 사용)
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Set, Tuple
+from urllib.parse import urlencode
+import asyncio
+import hashlib
+import json
+import os
+import time
+import logging
+
+import httpx
+
+from app.common.utility.compression import CACHE_LEVELS, STREAM_LEVELS, precompress_async
+
+logger = logging.getLogger("gateway_api")
+
+# 기본 라우트별 TTL(초): "{service}/{path}"
+DEFAULT_CACHE_TTLS: Dict[str, float] = {
+    "gri/standards": 300,
+    "grireport/standards": 300,
+    "grireport/templates": 300,
+    "tcfd/scenarios": 300,
+    "tcfdreport/pillars": 300,
+    "materiality/criteria": 300,
+}
+
+# 캐시 응답에 그대로 실으면 안 되는 헤더
+_UNCACHEABLE_HEADERS = {
+    "content-length", "content-encoding", "transfer-encoding", "connection",
+    "keep-alive", "date", "server", "set-cookie",
+}
+
+
+def parse_ttl_rules(raw: str) -> Dict[str, float]:
+    """"gri/standards=300,tcfd/scenarios=60" 형식 파싱"""
+    rules = {}
+    for item in raw.split(","):
+        route, _, ttl = item.partition("=")
+        route = route.strip().strip("/")
+        if not route or not ttl.strip():
+            continue
+        try:
+            rules[route] = float(ttl)
+        except ValueError:
+            logger.warning(f"⚠️ 잘못된 캐시 TTL 설정 무시: {item}")
+    return rules
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 약한 비교 (W/ 접두사 무시, * 허용)"""
+    if not if_none_match:
+        return False
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    etag: str
+    expires_at: float
+    vary: Tuple[str, ...] = ()
+    media_type: Optional[str] = None
+    # 인코딩 → 사전 압축 본문 (공유 캐시에는 원본만 저장하고 로컬 적재 시 다시 만듦)
+    encoded: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def size(self) -> int:
+        return (
+            len(self.body)
+            + sum(len(v) for v in self.encoded.values())
+            + sum(len(k) + len(v) for k, v in self.headers.items())
+        )
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.monotonic()) < self.expires_at
+
+    def ttl_remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def to_bytes(self) -> bytes:
+        """공유 캐시 저장용 직렬화: JSON 메타데이터 한 줄 + 본문 바이트"""
+        meta = {
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "etag": self.etag,
+            "vary": list(self.vary),
+            "media_type": self.media_type,
+            # monotonic 시계는 프로세스마다 다르므로 벽시계 기준으로 저장
+            "expires_epoch": time.time() + self.ttl_remaining(),
+        }
+        return json.dumps(meta, separators=(",", ":")).encode("utf-8") + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Optional["CachedResponse"]:
+        try:
+            raw_meta, _, body = data.partition(b"\n")
+            meta = json.loads(raw_meta)
+            return cls(
+                status_code=meta["status_code"],
+                headers=meta["headers"],
+                body=body,
+                etag=meta["etag"],
+                expires_at=time.monotonic() + (meta["expires_epoch"] - time.time()),
+                vary=tuple(meta.get("vary") or ()),
+                media_type=meta.get("media_type"),
+            )
+        except (ValueError, KeyError, TypeError):
+            return None
+
+
+class _Bypass(Exception):
+    """get_or_compute 계산을 저장 없이 끝냄 (캐시할 수 없는 응답이거나 다른 Vary 변형으로 저장된 경우)"""
+
+    def __init__(self, entry: Optional[CachedResponse]):
+        super().__init__("response not stored under the requested key")
+        self.entry = entry
+
+
+class ResponseCache:
+    # Vary 이름 맵 상한 (쿼리 조합이 무한히 늘어나는 것 방지)
+    MAX_VARY_KEYS = 10000
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_entry_bytes: Optional[int] = None,
+        ttl_rules: Optional[Dict[str, float]] = None,
+        shared: Optional[Any] = None,
+    ):
+        self.max_bytes = max_bytes or int(os.getenv("GATEWAY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+        self.max_entry_bytes = max_entry_bytes or int(os.getenv("GATEWAY_CACHE_MAX_ENTRY_BYTES", 4 * 1024 * 1024))
+        if ttl_rules is None:
+            ttl_rules = dict(DEFAULT_CACHE_TTLS)
+            ttl_rules.update(parse_ttl_rules(os.getenv("GATEWAY_CACHE_TTLS", "")))
+        self.ttl_rules = ttl_rules
+        # 2차 공유 캐시 (shared_cache.TwoLevelCache, 레플리카 간 공유)
+        self.shared = shared
+        self._pending_writes: Set[asyncio.Task] = set()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        # base key → 업스트림 Vary 헤더 이름 목록
+        self._vary: Dict[str, Tuple[str, ...]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def ttl_for(self, service: str, path: str) -> Optional[float]:
+        ttl = self.ttl_rules.get(f"{service}/{path.strip('/')}")
+        return ttl if ttl and ttl > 0 else None
+
+    @staticmethod
+    def base_key(service: str, path: str, query_items: Iterable[Tuple[str, str]]) -> str:
+        """서비스 + 경로 + 정렬된 쿼리스트링"""
+        query = urlencode(sorted(query_items))
+        return f"{service}:/{path.strip('/')}?{query}"
+
+    @staticmethod
+    def _variant_key(base_key: str, vary: Tuple[str, ...], request_headers: Mapping[str, str]) -> str:
+        if not vary:
+            return base_key
+        return base_key + "|" + "|".join(f"{name}={request_headers.get(name, '')}" for name in vary)
+
+    def lookup(self, base_key: str, request_headers: Mapping[str, str]) -> Optional[CachedResponse]:
+        vary = self._vary.get(base_key, ())
+        key = self._variant_key(base_key, vary, request_headers)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if not entry.is_fresh():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def fetch(
+        self,
+        base_key: str,
+        request_headers: Mapping[str, str],
+        ttl: float,
+        fetch: Callable[[], Awaitable[httpx.Response]],
+    ) -> Tuple[Optional[CachedResponse], Optional[httpx.Response]]:
+        """로컬 미스(lookup 이후) 경로: (캐시 항목, 이 요청이 직접 받은 업스트림 응답)
+
+        공유 캐시가 있으면 TwoLevelCache.get_or_compute로 조회해, 미스일 때 레플리카 간 한 곳만
+        업스트림을 호출하고 나머지는 그 결과를 기다린다 (TTL 만료 직후 stampede 방지).
+        공유 캐시에서 받은 항목이면 업스트림 응답은 None, 캐시할 수 없는 응답이면 캐시 항목이 None.
+        """
+        if self.shared is None:
+            response = await fetch()
+            return await self.store(base_key, request_headers, response, ttl), response
+
+        vary = tuple(await self.shared.get(f"vary:{base_key}", near=False) or ())
+        key = self._variant_key(base_key, vary, request_headers)
+        mine: Dict[str, Any] = {}
+
+        async def compute() -> bytes:
+            response = mine["response"] = await fetch()
+            entry = mine["entry"] = self._build_entry(response, ttl)
+            if entry is None or entry.vary != vary:
+                if entry is not None:
+                    # 업스트림 Vary가 바뀜 → 실제 변형 키로 저장
+                    await self._save(base_key, request_headers, entry, ttl)
+                raise _Bypass(entry)
+            await self._insert(base_key, key, entry, CACHE_LEVELS)
+            await self.shared.set(f"vary:{base_key}", list(vary), ttl, near=False)
+            return entry.to_bytes()
+
+        try:
+            data = await self.shared.get_or_compute(f"resp:{key}", compute, ttl, near=False)
+        except _Bypass as e:
+            if "response" in mine:
+                return e.entry, mine["response"]
+            # 합류한 요청: 저장된 변형이 있으면 사용하고, 캐시할 수 없는 응답(호출자마다 다를 수 있음)은 직접 호출
+            cached = self.lookup(base_key, request_headers) if e.entry is not None else None
+            if cached is not None:
+                return cached, None
+            response = await fetch()
+            return await self.store(base_key, request_headers, response, ttl), response
+
+        if "response" in mine:
+            return mine["entry"], mine["response"]
+        # 같은 프로세스의 다른 요청이 방금 채웠으면 그대로 사용
+        entry = self._entries.get(key)
+        if entry is not None and entry.is_fresh():
+            return entry, None
+        entry = CachedResponse.from_bytes(data) if isinstance(data, bytes) else None
+        if entry is None or not entry.is_fresh():
+            response = await fetch()
+            return await self.store(base_key, request_headers, response, ttl), response
+        # 공유 캐시 적중은 레플리카마다 다시 압축하므로 요청 압축과 같은 빠른 레벨 사용
+        await self._insert(base_key, key, entry, STREAM_LEVELS)
+        self.shared_hits += 1
+        return entry, None
+
+    def _build_entry(self, response: httpx.Response, ttl: float) -> Optional[CachedResponse]:
+        """캐시 가능한 업스트림 응답이면 캐시 항목, 아니면 None"""
+        if response.status_code != 200:
+            return None
+        cache_control = response.headers.get("cache-control", "").lower()
+        if "no-store" in cache_control or "private" in cache_control:
+            return None
+        vary = tuple(sorted(
+            v.strip().lower() for v in response.headers.get("vary", "").split(",") if v.strip()
+        ))
+        if "*" in vary:
+            return None
+
+        body = response.content
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _UNCACHEABLE_HEADERS}
+        etag = response.headers.get("etag") or make_etag(body)
+        headers["etag"] = etag
+        entry = CachedResponse(
+            status_code=response.status_code,
+            headers=headers,
+            body=body,
+            etag=etag,
+            expires_at=time.monotonic() + ttl,
+            vary=vary,
+            media_type=response.headers.get("content-type"),
+        )
+        return entry if entry.size <= self.max_entry_bytes else None
+
+    async def store(
+        self,
+        base_key: str,
+        request_headers: Mapping[str, str],
+        response: httpx.Response,
+        ttl: float,
+    ) -> Optional[CachedResponse]:
+        """캐시 가능한 업스트림 응답이면 저장 후 반환, 아니면 None"""
+        entry = self._build_entry(response, ttl)
+        if entry is None:
+            return None
+        await self._save(base_key, request_headers, entry, ttl)
+        return entry
+
+    async def _save(self, base_key: str, request_headers: Mapping[str, str], entry: CachedResponse, ttl: float) -> None:
+        key = self._variant_key(base_key, entry.vary, request_headers)
+        await self._insert(base_key, key, entry, CACHE_LEVELS)
+        if self.shared is not None:
+            self._write_shared(base_key, key, entry, ttl)
+
+    async def _insert(self, base_key: str, key: str, entry: CachedResponse, levels: Dict[str, int]) -> None:
+        if not entry.encoded:
+            # 압축은 이벤트 루프 밖에서 (최대 max_entry_bytes 본문을 인코딩 3종으로 압축)
+            entry.encoded = await precompress_async(entry.body, entry.media_type, levels=levels)
+        if len(self._vary) >= self.MAX_VARY_KEYS and base_key not in self._vary:
+            self._vary.clear()
+        self._vary[base_key] = entry.vary
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        self._evict()
+
+    def _write_shared(self, base_key: str, key: str, entry: CachedResponse, ttl: float) -> None:
+        """공유 캐시 쓰기는 응답 경로를 막지 않도록 백그라운드로 수행"""
+        async def write():
+            await self.shared.set(f"vary:{base_key}", list(entry.vary), ttl, near=False)
+            await self.shared.set(f"resp:{key}", entry.to_bytes(), ttl, near=False)
+
+        task = asyncio.get_running_loop().create_task(write())
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        """메모리 예산 초과 시 가장 오래 사용되지 않은 항목부터 제거"""
+        while self._bytes > self.max_bytes and self._entries:
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._vary.clear()
+        self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "shared_hits": self.shared_hits,
+            "hit_ratio": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# 게이트웨이 전역 응답 캐시
+response_cache = ResponseCache()
@@ -0,0 +1,327 @@
+"""
+2단계 공유 캐시 (프로세스 내 near-cache → Redis)
+
+게이트웨이 레플리카들이 같은 캐시를 공유하고 재시작 후에도 캐시가 유지되도록
+docker-compose의 redis 컨테이너를 2차 캐시로 사용한다.
+REDIS_URL이 없거나 redis 패키지가 없으면 공유 캐시 없이 동작하며,
+테스트에서는 InMemoryBackend를 Redis 대신 사용할 수 있다.
+"""
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+import asyncio
+import json
+import os
+import time
+import uuid
+import zlib
+import logging
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis 미설치 시 공유 캐시 비활성화
+    aioredis = None
+
+from app.common.utility.single_flight import SingleFlight
+
+logger = logging.getLogger("gateway_api")
+
+# 값 인코딩: [codec 1byte][compression 1byte][payload]
+_CODEC_BYTES = b"B"
+_CODEC_JSON = b"J"
+_COMPRESS_NONE = b"-"
+_COMPRESS_ZLIB = b"Z"
+
+
+def redact_url(url: str) -> str:
+    """로그용 URL: 사용자/비밀번호 제거 (redis://:secret@redis:6379/0 → redis://redis:6379/0)"""
+    parts = urlsplit(url)
+    if "@" not in parts.netloc:
+        return url
+    return urlunsplit(parts._replace(netloc=parts.netloc.rpartition("@")[2]))
+
+
+def encode_value(value: Any, compress_min_bytes: int) -> bytes:
+    """bytes는 그대로, 그 외는 JSON으로 직렬화하고 큰 값은 zlib 압축"""
+    if isinstance(value, (bytes, bytearray)):
+        codec, payload = _CODEC_BYTES, bytes(value)
+    else:
+        codec, payload = _CODEC_JSON, json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(payload) >= compress_min_bytes:
+        compressed = zlib.compress(payload, 6)
+        if len(compressed) < len(payload):
+            return codec + _COMPRESS_ZLIB + compressed
+    return codec + _COMPRESS_NONE + payload
+
+
+def decode_value(data: bytes) -> Any:
+    codec, compression, payload = data[:1], data[1:2], data[2:]
+    if compression == _COMPRESS_ZLIB:
+        payload = zlib.decompress(payload)
+    if codec == _CODEC_JSON:
+        return json.loads(payload)
+    return payload
+
+
+class InMemoryBackend:
+    """Redis 대체용 프로세스 내 백엔드 (테스트/로컬 개발용)"""
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+
+    def _alive(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self._data.pop(key, None)
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._alive(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        self._data[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        if self._alive(key) is not None:
+            return False
+        self._data[key] = (token.encode(), time.monotonic() + ttl)
+        return True
+
+    async def release_lock(self, key: str, token: str) -> None:
+        if self._alive(key) == token.encode():
+            self._data.pop(key, None)
+
+    async def close(self) -> None:
+        self._data.clear()
+
+
+class RedisBackend:
+    """redis.asyncio 기반 백엔드"""
+
+    # 자신이 잡은 락만 해제 (compare-and-delete)
+    _RELEASE_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, url: str):
+        if aioredis is None:
+            raise RuntimeError("redis 패키지가 설치되어 있지 않습니다 (pip install redis)")
+        self._redis = aioredis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        await self._redis.set(key, value, px=int(ttl * 1000) if ttl else None)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def acquire_lock(self, key: str, token: str, ttl: float) -> bool:
+        return bool(await self._redis.set(key, token, nx=True, px=int(ttl * 1000)))
+
+    async def release_lock(self, key: str, token: str) -> None:
+        await self._redis.eval(self._RELEASE_SCRIPT, 1, key, token)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+class TwoLevelCache:
+    """near-cache(LRU, 짧은 TTL) + 공유 백엔드 캐시"""
+
+    def __init__(
+        self,
+        backend,
+        namespace: str = "gateway",
+        near_max_items: int = 1024,
+        near_ttl: float = 5.0,
+        compress_min_bytes: int = 1024,
+        lock_ttl: float = 10.0,
+        lock_wait: float = 5.0,
+    ):
+        self.backend = backend
+        self.namespace = namespace
+        self.near_max_items = near_max_items
+        self.near_ttl = near_ttl
+        self.compress_min_bytes = compress_min_bytes
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self._near: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._flights = SingleFlight()
+        self.stats_counters = {"near_hits": 0, "shared_hits": 0, "misses": 0, "errors": 0, "computes": 0}
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _near_get(self, key: str) -> Tuple[bool, Any]:
+        item = self._near.get(key)
+        if item is None:
+            return False, None
+        value, expires_at = item
+        if time.monotonic() >= expires_at:
+            self._near.pop(key, None)
+            return False, None
+        self._near.move_to_end(key)
+        return True, value
+
+    def _near_set(self, key: str, value: Any, ttl: Optional[float]) -> None:
+        near_ttl = min(ttl, self.near_ttl) if ttl else self.near_ttl
+        self._near[key] = (value, time.monotonic() + near_ttl)
+        self._near.move_to_end(key)
+        while len(self._near) > self.near_max_items:
+            self._near.popitem(last=False)
+
+    async def get(self, key: str, near: bool = True) -> Optional[Any]:
+        if near:
+            found, value = self._near_get(key)
+            if found:
+                self.stats_counters["near_hits"] += 1
+                return value
+        try:
+            data = await self.backend.get(self._key(key))
+        except Exception as e:
+            # Redis 장애 시 캐시 미스로 처리하고 요청은 계속 진행
+            self.stats_counters["errors"] += 1
+            logger.warning(f"⚠️ 공유 캐시 조회 실패: {e}")
+            return None
+        if data is None:
+            self.stats_counters["misses"] += 1
+            return None
+        self.stats_counters["shared_hits"] += 1
+        value = decode_value(data)
+        if near:
+            self._near_set(key, value, None)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None, near: bool = True) -> None:
+        if near:
+            self._near_set(key, value, ttl)
+        try:
+            await self.backend.set(self._key(key), encode_value(value, self.compress_min_bytes), ttl)
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.warning(f"⚠️ 공유 캐시 저장 실패: {e}")
+
+    async def delete(self, key: str) -> None:
+        self._near.pop(key, None)
+        try:
+            await self.backend.delete(self._key(key))
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.warning(f"⚠️ 공유 캐시 삭제 실패: {e}")
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        near: bool = True,
+    ) -> Any:
+        """캐시 미스 시 compute()로 계산해 저장. 동시 미스가 한꺼번에 계산하지 않도록 보호
+
+        compute()가 예외를 던지면 저장하지 않고, 그 예외가 기다리던 호출에도 그대로 전달된다.
+        near=False면 near-cache를 거치지 않음 (호출자가 자체 로컬 캐시를 가진 경우)
+        """
+        value = await self.get(key, near=near)
+        if value is not None:
+            return value
+
+        # 같은 프로세스 안의 동시 미스는 하나의 계산 결과를 공유
+        return await self._flights.do(key, lambda: self._compute_with_lock(key, compute, ttl, near))
+
+    async def _compute_with_lock(self, key: str, compute, ttl: float, near: bool = True) -> Any:
+        """레플리카 간에는 분산 락으로 한 곳만 계산하고 나머지는 결과를 기다림"""
+        lock_key = self._key(f"lock:{key}")
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.backend.acquire_lock(lock_key, token, self.lock_ttl)
+        except Exception as e:
+            self.stats_counters["errors"] += 1
+            logger.warning(f"⚠️ 공유 캐시 락 획득 실패: {e}")
+            acquired = True  # 락 없이 계산
+
+        if not acquired:
+            deadline = time.monotonic() + self.lock_wait
+            delay = 0.02
+            while time.monotonic() < deadline:
+                await asyncio.sleep(delay)
+                value = await self.get(key, near=near)
+                if value is not None:
+                    return value
+                # 락 보유자가 저장 없이 끝났으면(계산 실패 등) 대기 시간을 다 쓰지 않고 직접 계산
+                try:
+                    acquired = await self.backend.acquire_lock(lock_key, token, self.lock_ttl)
+                except Exception:
+                    acquired = False
+                if acquired:
+                    break
+                delay = min(delay * 2, 0.2)
+            # 락 보유자가 제때 끝내지 못하면 직접 계산
+
+        try:
+            self.stats_counters["computes"] += 1
+            value = await compute()
+            await self.set(key, value, ttl, near=near)
+            return value
+        finally:
+            if acquired:
+                try:
+                    await self.backend.release_lock(lock_key, token)
+                except Exception as e:
+                    logger.warning(f"⚠️ 공유 캐시 락 해제 실패: {e}")
+
+    async def close(self) -> None:
+        self._near.clear()
+        await self.backend.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self.backend).__name__,
+            "near_items": len(self._near),
+            **self.stats_counters,
+        }
+
+
+# 게이트웨이 전역 공유 캐시 (REDIS_URL 설정 시 main.lifespan에서 생성)
+shared_cache: Optional[TwoLevelCache] = None
+
+
+def init_shared_cache(backend=None) -> Optional[TwoLevelCache]:
+    """REDIS_URL로 공유 캐시 생성. backend를 주면 (테스트용 InMemoryBackend 등) 그대로 사용"""
+    global shared_cache
+    if backend is None:
+        redis_url = os.getenv("REDIS_URL")
+        if not redis_url:
+            logger.info("ℹ️ REDIS_URL 미설정 - 공유 캐시 비활성화 (프로세스 내 캐시만 사용)")
+            return None
+        if aioredis is None:
+            logger.warning("⚠️ redis 패키지 미설치 - 공유 캐시 비활성화")
+            return None
+        backend = RedisBackend(redis_url)
+        logger.info(f"🧰 Redis 공유 캐시 연결: {redact_url(redis_url)}")
+    shared_cache = TwoLevelCache(
+        backend,
+        namespace=os.getenv("SHARED_CACHE_NAMESPACE", "gateway"),
+        near_max_items=int(os.getenv("SHARED_CACHE_NEAR_MAX_ITEMS", 1024)),
+        near_ttl=float(os.getenv("SHARED_CACHE_NEAR_TTL", 5.0)),
+        compress_min_bytes=int(os.getenv("SHARED_CACHE_COMPRESS_MIN_BYTES", 1024)),
+    )
+    return shared_cache
+
+
+async def close_shared_cache() -> None:
+    global shared_cache
+    if shared_cache is not None:
+        await shared_cache.close()
+        shared_cache = None
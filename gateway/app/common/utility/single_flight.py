@@ -0,0 +1,71 @@
+"""
+Single-flight 요청 병합
+
+같은 키의 호출이 동시에 여러 번 들어오면 업스트림 호출은 한 번만 수행하고
+나머지는 그 결과를 함께 받는다. (대시보드 동시 로딩 시 동일 GET 중복 제거)
+"""
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Mapping, Tuple
+from urllib.parse import urlencode
+import asyncio
+import os
+
+# 응답 내용에 영향을 주는 요청 헤더 (키에 포함)
+COALESCE_HEADERS = tuple(
+    h.strip().lower()
+    for h in os.getenv("GATEWAY_COALESCE_HEADERS", "authorization,cookie,accept,accept-language").split(",")
+    if h.strip()
+)
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.executions = 0  # 실제 수행된 호출 수
+        self.coalesced = 0   # 진행 중인 호출에 합류해 절약된 호출 수
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            # 별도 Task로 실행해 먼저 온 요청이 취소돼도 합류한 요청들은 결과를 받음
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+            self.executions += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 기다리던 요청이 모두 취소/시간 초과된 경우에도 예외가 처리되지 않은 채 남지 않도록 조회
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._calls),
+            "upstream_calls": self.executions,
+            "coalesced": self.coalesced,
+            "saved_ratio": round(self.coalesced / total, 4) if total else 0.0,
+        }
+
+
+def coalesce_key(
+    service: str,
+    upstream_path: str,
+    query_items: Iterable[Tuple[str, str]],
+    headers: Mapping[str, str],
+) -> Tuple[str, str, str, Tuple[str, ...]]:
+    """서비스 + 업스트림 경로 + 정렬된 쿼리 + 관련 헤더 값"""
+    return (
+        service,
+        upstream_path,
+        urlencode(sorted(query_items)),
+        tuple(headers.get(name, "") for name in COALESCE_HEADERS),
+    )
+
+
+# 게이트웨이 GET 프록시용 병합기
+request_coalescer = SingleFlight()
@@ -0,0 +1,424 @@
+# 자동 생성 파일 - 원본: shared/common/tracing.py (직접 수정하지 말고 원본 수정 후 `python shared/sync.py`)
+"""
+W3C Trace Context(traceparent) 기반 경량 분산 트레이싱
+
+- 수신 요청의 traceparent를 이어받아 server span 생성 (TracingMiddleware)
+- DB 쿼리(SQLAlchemy 엔진 이벤트)와 외부 HTTP 호출은 자식 client span으로 기록
+- span은 큐에 넣고 백그라운드 스레드가 JSONL 파일(TRACE_EXPORT_FILE) 또는
+  OTLP/HTTP JSON 수집기(OTEL_EXPORTER_OTLP_ENDPOINT)로 배치 전송
+내보낼 곳이 설정되지 않으면 span을 만들지 않고 요청 헤더의 traceparent만 그대로 전달된다.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import urllib.request
+
+logger = logging.getLogger("gateway_api")
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_INVALID_TRACE_ID = "0" * 32
+_INVALID_SPAN_ID = "0" * 16
+
+# OTLP span kind 값
+_SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+
+
+class SpanContext(NamedTuple):
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """"00-{trace_id}-{parent_id}-{flags}" 파싱. 형식이 틀리면 None"""
+    if not value:
+        return None
+    match = _TRACEPARENT_RE.match(value.strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == _INVALID_TRACE_ID or span_id == _INVALID_SPAN_ID:
+        return None
+    return SpanContext(trace_id, span_id, bool(int(flags, 16) & 0x01))
+
+
+def format_traceparent(context: SpanContext) -> str:
+    return f"00-{context.trace_id}-{context.span_id}-{'01' if context.sampled else '00'}"
+
+
+class Span:
+    __slots__ = ("tracer", "name", "kind", "context", "parent_id", "attributes", "start_ns", "end_ns", "error")
+
+    def __init__(self, tracer: "Tracer", name: str, kind: str, context: SpanContext,
+                 parent_id: Optional[str], attributes: Optional[Dict[str, Any]]):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.context = context
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.context.trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, error: Any) -> None:
+        self.error = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.context.sampled:
+            self.tracer.exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "service": self.tracer.service_name,
+            "name": self.name,
+            "kind": self.kind,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class SpanExporter:
+    """span 배치 전송 (요청 경로에서는 큐에 넣기만 함)"""
+
+    def __init__(
+        self,
+        service_name: str,
+        file_path: Optional[str] = None,
+        otlp_endpoint: Optional[str] = None,
+        max_queue: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+    ):
+        self.service_name = service_name
+        self.file_path = file_path
+        self.otlp_endpoint = otlp_endpoint
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._queue: "queue.Queue[Optional[Span]]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.file_path or self.otlp_endpoint)
+
+    def start(self) -> None:
+        if self._thread is None and self.enabled:
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def shutdown(self) -> None:
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout=5)
+
+    def _run(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                span = False
+            if span is None:
+                self._flush(batch)
+                return
+            if span:
+                batch.append(span)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._flush(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, batch: List[Span]) -> None:
+        if not batch:
+            return
+        records = [span.to_dict() for span in batch]
+        if self.file_path:
+            try:
+                with open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(r, ensure_ascii=False, default=str) + "\n" for r in records))
+            except OSError as e:
+                logger.warning(f"⚠️ span 파일 기록 실패: {e}")
+        if self.otlp_endpoint:
+            try:
+                request = urllib.request.Request(
+                    self.otlp_endpoint,
+                    data=json.dumps(self._to_otlp(records)).encode("utf-8"),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                urllib.request.urlopen(request, timeout=2).close()
+            except Exception as e:
+                logger.warning(f"⚠️ OTLP span 전송 실패: {e}")
+
+    def _to_otlp(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """OTLP/HTTP JSON (ExportTraceServiceRequest) 형식"""
+        spans = []
+        for r in records:
+            span = {
+                "traceId": r["trace_id"],
+                "spanId": r["span_id"],
+                "name": r["name"],
+                "kind": _SPAN_KINDS.get(r["kind"], 1),
+                "startTimeUnixNano": str(r["start_time_unix_nano"]),
+                "endTimeUnixNano": str(r["end_time_unix_nano"]),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in r["attributes"].items()],
+                "status": {"code": 2, "message": r["error"]} if r["error"] else {"code": 1},
+            }
+            if r["parent_span_id"]:
+                span["parentSpanId"] = r["parent_span_id"]
+            spans.append(span)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": "taeheonai.tracing"}, "spans": spans}],
+            }]
+        }
+
+
+class Tracer:
+    def __init__(self, service_name: str, exporter: SpanExporter, sample_ratio: float = 1.0):
+        self.service_name = service_name
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter.enabled
+
+    def start_span(
+        self,
+        name: str,
+        kind: str = "internal",
+        parent: Optional[SpanContext] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        """parent가 없으면 현재 span의 자식, 현재 span도 없으면 새 trace 시작"""
+        if parent is None:
+            current = _current_span.get()
+            parent = current.context if current is not None else None
+        if parent is None:
+            trace_id = "%032x" % random.getrandbits(128)
+            sampled = self.sample_ratio >= 1.0 or random.random() < self.sample_ratio
+            parent_id = None
+        else:
+            trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+        context = SpanContext(trace_id, "%016x" % random.getrandbits(64), sampled)
+        return Span(self, name, kind, context, parent_id, attributes)
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", attributes: Optional[Dict[str, Any]] = None) -> Iterator[Optional[Span]]:
+        """with 블록 동안 현재 span으로 설정 (트레이싱 비활성 시 None)"""
+        if not self.enabled:
+            yield None
+            return
+        span = self.start_span(name, kind, attributes=attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def inject(self, headers: Dict[str, str], span: Optional[Span] = None) -> Dict[str, str]:
+        """외부 호출 헤더에 현재(또는 지정한) span의 traceparent 추가"""
+        span = span or _current_span.get()
+        if span is not None:
+            headers[TRACEPARENT_HEADER] = format_traceparent(span.context)
+        return headers
+
+    @contextmanager
+    def outbound_span(self, method: str, url: str, headers: Dict[str, str]) -> Iterator[Optional[Span]]:
+        """외부 HTTP 호출용 client span. headers에 traceparent를 넣어줌"""
+        with self.span(f"HTTP {method.upper()}", "client", {"http.method": method.upper(), "http.url": url}) as span:
+            if span is not None:
+                self.inject(headers, span)
+            yield span
+
+
+class TracingMiddleware:
+    """수신 요청마다 server span을 만드는 ASGI 미들웨어"""
+
+    def __init__(self, app, tracer: "Tracer", on_span=None, route_names: bool = True):
+        self.app = app
+        self.tracer = tracer
+        # span 시작 시 호출 (게이트웨이 액세스 로그에 trace_id 기록 등)
+        self.on_span = on_span
+        # True면 span 이름을 경로 템플릿으로 변경 (catch-all 프록시처럼 템플릿이 의미 없으면 False)
+        self.route_names = route_names
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        parent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                parent = parse_traceparent(value.decode("latin-1"))
+                break
+        method = scope["method"]
+        span = self.tracer.start_span(
+            f"{method} {scope['path']}", "server", parent=parent,
+            attributes={"http.method": method, "http.target": scope["path"]},
+        )
+        if self.on_span is not None:
+            self.on_span(span)
+        token = _current_span.set(span)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            route = scope.get("route")
+            if self.route_names and route is not None and getattr(route, "path", None):
+                # 경로 템플릿 기준으로 이름을 바꿔 집계가 쉽게 함
+                span.name = f"{method} {route.path}"
+                span.set_attribute("http.route", route.path)
+            span.set_attribute("http.status_code", status["code"])
+            if status["code"] >= 500 and span.error is None:
+                span.set_error(f"HTTP {status['code']}")
+            span.end()
+
+
+def instrument_engine(engine, tracer: Optional["Tracer"] = None) -> None:
+    """SQLAlchemy (Async)Engine의 쿼리마다 client span 기록"""
+    from sqlalchemy import event
+
+    tracer = tracer or get_tracer()
+    sync_engine = getattr(engine, "sync_engine", engine)
+    system = sync_engine.dialect.name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if not tracer.enabled or _current_span.get() is None:
+            return
+        operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "QUERY"
+        # 바인드 파라미터 값은 기록하지 않음 (문장은 자리표시자 형태)
+        context._trace_span = tracer.start_span(
+            f"db {operation}", "client", attributes={"db.system": system, "db.statement": statement[:500]}
+        )
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute("db.rows", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.set_error(exception_context.original_exception)
+            span.end()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """환경변수로 구성한 전역 tracer (최초 호출 시 생성)"""
+    global _tracer
+    if _tracer is None:
+        service_name = os.getenv("SERVICE_NAME", "unknown-service")
+        init_tracing(service_name)
+    return _tracer
+
+
+def _otlp_traces_endpoint() -> Optional[str]:
+    """OTEL_EXPORTER_OTLP_TRACES_ENDPOINT(전체 URL) 또는 OTEL_EXPORTER_OTLP_ENDPOINT + /v1/traces"""
+    endpoint = os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+    if endpoint:
+        return endpoint
+    base = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+    return base.rstrip("/") + "/v1/traces" if base else None
+
+
+def init_tracing(service_name: str, app=None, on_span=None, route_names: bool = True) -> Tracer:
+    """TRACE_EXPORT_FILE / OTEL_EXPORTER_OTLP_ENDPOINT / TRACE_SAMPLE_RATIO로 tracer 구성 후 미들웨어 등록"""
+    global _tracer
+    if _tracer is None:
+        service_name = os.getenv("OTEL_SERVICE_NAME", service_name)
+        exporter = SpanExporter(
+            service_name,
+            file_path=os.getenv("TRACE_EXPORT_FILE") or None,
+            otlp_endpoint=_otlp_traces_endpoint(),
+        )
+        _tracer = Tracer(service_name, exporter, float(os.getenv("TRACE_SAMPLE_RATIO", 1.0)))
+        exporter.start()
+        atexit.register(exporter.shutdown)
+        if exporter.enabled:
+            logger.info(
+                f"🧵 트레이싱 활성화: service={service_name}, "
+                f"file={exporter.file_path}, otlp={exporter.otlp_endpoint}, sample={_tracer.sample_ratio}"
+            )
+    if app is not None:
+        app.add_middleware(TracingMiddleware, tracer=_tracer, on_span=on_span, route_names=route_names)
+    return _tracer
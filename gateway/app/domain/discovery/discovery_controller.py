@@ -0,0 +1,406 @@
+"""
+서비스 디스커버리 레지스트리
+
+서비스는 시작 시 게이트웨이에 자기 주소를 등록하고 TTL 안에 heartbeat를 보내며, 종료 시 등록을 해제한다.
+게이트웨이는 백그라운드 watcher가 레지스트리를 보고 있다가 살아 있는 인스턴스 목록이 바뀔 때만
+새 라우팅 테이블을 만들어 한 번에 교체한다 (요청마다 레지스트리를 조회하지 않음).
+- 백엔드: memory(프로세스 내, 테스트/단일 게이트웨이) / redis(REDIS_URL, 여러 게이트웨이 레플리카가 공유)
+- 살아 있는 등록 인스턴스가 있는 서비스는 그 인스턴스로만 라우팅하고, 하나도 없을 때만
+  환경변수({SERVICE}_SERVICE_URL) 레플리카로 돌아감. TTL 안에 heartbeat가 없는 인스턴스는 자동으로 빠짐
+- 기본 비활성화(GATEWAY_DISCOVERY_BACKEND=off). 켜더라도 GATEWAY_DISCOVERY_TOKEN이 없으면
+  등록/heartbeat/해제 API는 503으로 닫혀 있고, 토큰이 있으면 Bearer 토큰을 요구 (fail closed)
+- GATEWAY_DISCOVERY_ALLOWED_HOSTS가 설정되면 그 호스트 패턴에 맞는 URL만 등록 허용
+"""
+from dataclasses import asdict, dataclass, field, replace
+from fnmatch import fnmatch
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import hmac
+import json
+import os
+import time
+import uuid
+import logging
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis 미설치 시 memory 백엔드만 사용
+    aioredis = None
+
+from fastapi import APIRouter, Header, HTTPException, Response
+from pydantic import BaseModel, Field, field_validator
+
+from app.common.utility.shared_cache import redact_url
+from app.domain.model.load_balancer import ReplicaSpec
+from app.domain.model.service_factory import (
+    RouteTable, ServiceType, _install_route_table, build_route_table, get_route_table
+)
+
+logger = logging.getLogger("gateway_api")
+
+DISCOVERY_BACKEND = os.getenv("GATEWAY_DISCOVERY_BACKEND", "off").lower()
+DISCOVERY_ENABLED = DISCOVERY_BACKEND not in ("", "off", "false", "none")
+
+
+def parse_allowed_hosts(raw: str) -> Tuple[str, ...]:
+    """"*.internal,10.0.*,auth-service" → 호스트 패턴 목록 (fnmatch)"""
+    return tuple(item.strip().lower() for item in raw.split(",") if item.strip())
+
+
+@dataclass
+class ServiceInstance:
+    """등록된 서비스 인스턴스 하나"""
+    service: str
+    instance_id: str
+    url: str
+    weight: float = 1.0
+    metadata: Dict[str, str] = field(default_factory=dict)
+    registered_at: float = 0.0
+    expires_at: float = 0.0
+
+
+class InMemoryRegistry:
+    """프로세스 내 레지스트리 (테스트/게이트웨이 1대)"""
+
+    name = "memory"
+
+    def __init__(self):
+        self._instances: Dict[Tuple[str, str], ServiceInstance] = {}
+
+    async def register(self, instance: ServiceInstance, ttl: float) -> None:
+        instance.expires_at = time.time() + ttl
+        self._instances[(instance.service, instance.instance_id)] = instance
+
+    async def heartbeat(self, service: str, instance_id: str, ttl: float) -> bool:
+        instance = self._instances.get((service, instance_id))
+        if instance is None or instance.expires_at <= time.time():
+            return False
+        instance.expires_at = time.time() + ttl
+        return True
+
+    async def deregister(self, service: str, instance_id: str) -> bool:
+        return self._instances.pop((service, instance_id), None) is not None
+
+    async def instances(self) -> List[ServiceInstance]:
+        now = time.time()
+        for key in [key for key, instance in self._instances.items() if instance.expires_at <= now]:
+            del self._instances[key]
+        return list(self._instances.values())
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisRegistry:
+    """Redis 레지스트리: 인스턴스마다 키 하나, 만료는 Redis TTL에 맡김"""
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: Optional[str] = None):
+        if aioredis is None:
+            raise RuntimeError("redis package is not installed")
+        self._redis = aioredis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+        self.prefix = prefix or os.getenv("GATEWAY_DISCOVERY_REDIS_PREFIX", "gateway:discovery")
+
+    def _key(self, service: str, instance_id: str) -> str:
+        return f"{self.prefix}:{service}:{instance_id}"
+
+    async def register(self, instance: ServiceInstance, ttl: float) -> None:
+        instance.expires_at = time.time() + ttl
+        await self._redis.set(
+            self._key(instance.service, instance.instance_id),
+            json.dumps(asdict(instance)),
+            px=int(ttl * 1000),
+        )
+
+    async def heartbeat(self, service: str, instance_id: str, ttl: float) -> bool:
+        key = self._key(service, instance_id)
+        raw = await self._redis.get(key)
+        if raw is None:
+            return False
+        data = json.loads(raw)
+        data["expires_at"] = time.time() + ttl
+        # XX: 그 사이 만료/해제된 인스턴스를 되살리지 않음
+        return bool(await self._redis.set(key, json.dumps(data), px=int(ttl * 1000), xx=True))
+
+    async def deregister(self, service: str, instance_id: str) -> bool:
+        return bool(await self._redis.delete(self._key(service, instance_id)))
+
+    async def instances(self) -> List[ServiceInstance]:
+        keys = [key async for key in self._redis.scan_iter(match=f"{self.prefix}:*", count=500)]
+        if not keys:
+            return []
+        instances = []
+        for raw in await self._redis.mget(keys):
+            if raw is not None:
+                instances.append(ServiceInstance(**json.loads(raw)))
+        return instances
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_registry(backend: Optional[str] = None):
+    """GATEWAY_DISCOVERY_BACKEND로 레지스트리 생성 (redis 사용 불가 시 memory)"""
+    backend = (backend or DISCOVERY_BACKEND).lower()
+    if backend == "redis":
+        redis_url = os.getenv("REDIS_URL")
+        if redis_url and aioredis is not None:
+            logger.info(f"🧭 Redis 서비스 레지스트리 연결: {redact_url(redis_url)}")
+            return RedisRegistry(redis_url)
+        logger.warning("⚠️ REDIS_URL 미설정 또는 redis 패키지 미설치 - 프로세스 내 서비스 레지스트리 사용")
+    return InMemoryRegistry()
+
+
+class ServiceDiscovery:
+    def __init__(
+        self,
+        registry=None,
+        ttl: Optional[float] = None,
+        max_ttl: Optional[float] = None,
+        interval: Optional[float] = None,
+        token: Optional[str] = None,
+        allowed_hosts: Optional[Tuple[str, ...]] = None,
+    ):
+        self.registry = registry
+        self.ttl = ttl or float(os.getenv("GATEWAY_DISCOVERY_TTL", 30))
+        self.max_ttl = max_ttl or float(os.getenv("GATEWAY_DISCOVERY_MAX_TTL", 300))
+        # 레지스트리 재조회 주기 (TTL 만료, 다른 게이트웨이 레플리카에서의 변경 반영)
+        self.interval = interval or float(os.getenv("GATEWAY_DISCOVERY_INTERVAL", 2))
+        self.token = token if token is not None else os.getenv("GATEWAY_DISCOVERY_TOKEN", "")
+        # 등록 가능한 인스턴스 호스트 패턴 (비어 있으면 호스트 제한 없음, 토큰은 항상 필요)
+        self.allowed_hosts = (
+            allowed_hosts if allowed_hosts is not None
+            else parse_allowed_hosts(os.getenv("GATEWAY_DISCOVERY_ALLOWED_HOSTS", ""))
+        )
+        # 라우팅 테이블 설치 직전에 적용할 변환 (단일 프로세스 모드 등)
+        self.transform: Optional[Callable[[RouteTable], RouteTable]] = None
+        self._static: Optional[RouteTable] = None
+        self._applied: Optional[Dict[str, Tuple[ReplicaSpec, ...]]] = None
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.registrations = 0
+        self.heartbeats = 0
+        self.expired_heartbeats = 0
+        self.deregistrations = 0
+        self.table_swaps = 0
+        self.last_swap: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def clamp_ttl(self, ttl: Optional[float]) -> float:
+        return min(max(ttl or self.ttl, 1.0), self.max_ttl)
+
+    async def start(self, transform: Optional[Callable[[RouteTable], RouteTable]] = None) -> None:
+        if self._task is not None:
+            return
+        if self.registry is None:
+            self.registry = create_registry()
+        self.transform = transform
+        # 등록이 없는 서비스가 돌아갈 환경변수 기반 테이블 (시작 시 한 번)
+        self._static = build_route_table()
+        await self.refresh()
+        self._task = asyncio.get_running_loop().create_task(self._watch())
+        if not self.token:
+            logger.error("❌ GATEWAY_DISCOVERY_TOKEN 미설정 - 서비스 등록 API 비활성화 (503)")
+        logger.info(
+            f"🧭 서비스 디스커버리 시작: backend={self.registry.name}, ttl={self.ttl}s, interval={self.interval}s"
+        )
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await self.registry.close()
+        logger.info("🧭 서비스 디스커버리 종료")
+
+    async def _watch(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
+            try:
+                await self.refresh()
+            except Exception as e:
+                # 레지스트리 장애 시 마지막으로 설치한 테이블을 유지
+                self.last_error = f"{type(e).__name__}: {e}"
+                logger.error(f"🚨 서비스 레지스트리 조회 실패 (기존 라우팅 유지): {e}")
+
+    async def refresh(self) -> bool:
+        """살아 있는 인스턴스로 라우팅 테이블을 다시 만들고, 바뀐 경우에만 교체"""
+        discovered: Dict[str, List[ReplicaSpec]] = {}
+        for instance in await self.registry.instances():
+            discovered.setdefault(instance.service, []).append(ReplicaSpec(instance.url, instance.weight))
+        replicas = {service: tuple(sorted(specs, key=lambda spec: spec.url)) for service, specs in discovered.items()}
+        self.last_error = None
+        if replicas == self._applied:
+            return False
+
+        static = self._static or build_route_table()
+        routes = {}
+        for service_type, route in static.items():
+            # 등록된 인스턴스가 있으면 그것만 사용, 없을 때만 환경변수(기본 URL 포함) 레플리카로 라우팅
+            found = replicas.get(service_type.value)
+            routes[service_type] = replace(route, replicas=found) if found else route
+        table: RouteTable = MappingProxyType(routes)
+        if self.transform is not None:
+            table = self.transform(table)
+        _install_route_table(table)
+
+        previous = self._applied or {}
+        for service in sorted(set(previous) | set(replicas)):
+            before, after = previous.get(service, ()), replicas.get(service, ())
+            if before != after:
+                urls = ", ".join(spec.url for spec in after) or "환경변수 레플리카만"
+                logger.info(f"🧭 [{service}] 라우팅 갱신: {len(before)} → {len(after)}개 인스턴스 [{urls}]")
+        self._applied = replicas
+        self.table_swaps += 1
+        self.last_swap = time.time()
+        return True
+
+    def notify(self) -> None:
+        """등록 상태가 바뀌었으니 다음 주기를 기다리지 않고 라우팅 갱신"""
+        self._changed.set()
+
+    def authorize(self, authorization: Optional[str]) -> None:
+        if self.registry is None:
+            # GATEWAY_DISCOVERY_BACKEND=off
+            raise HTTPException(status_code=503, detail="Service discovery is disabled")
+        if not self.token:
+            # 토큰 없이 등록을 허용하면 누구나 업스트림을 바꿔치기할 수 있으므로 닫아 둠
+            raise HTTPException(status_code=503, detail="Service discovery registration requires GATEWAY_DISCOVERY_TOKEN")
+        scheme, _, credentials = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.strip(), self.token):
+            raise HTTPException(status_code=401, detail="Invalid discovery token")
+
+    def check_url(self, url: str) -> None:
+        """GATEWAY_DISCOVERY_ALLOWED_HOSTS에 맞지 않는 인스턴스 주소는 거부"""
+        if not self.allowed_hosts:
+            return
+        host = (urlsplit(url).hostname or "").lower()
+        if not any(fnmatch(host, pattern) for pattern in self.allowed_hosts):
+            raise HTTPException(status_code=403, detail=f"Instance host {host!r} is not allowed")
+
+    async def stats(self) -> Dict[str, object]:
+        instances = await self.registry.instances() if self.registry is not None else []
+        now = time.time()
+        services: Dict[str, List[Dict[str, object]]] = {}
+        for instance in sorted(instances, key=lambda i: (i.service, i.url)):
+            services.setdefault(instance.service, []).append({
+                "instance_id": instance.instance_id,
+                "url": instance.url,
+                "weight": instance.weight,
+                "metadata": instance.metadata,
+                "expires_in": round(instance.expires_at - now, 1),
+            })
+        return {
+            "backend": self.registry.name if self.registry is not None else None,
+            "running": self._task is not None,
+            "ttl": self.ttl,
+            "interval": self.interval,
+            "services": services,
+            "routes": {
+                service_type.value: [replica.url for replica in route.replicas]
+                for service_type, route in get_route_table().items()
+            },
+            "registrations": self.registrations,
+            "heartbeats": self.heartbeats,
+            "expired_heartbeats": self.expired_heartbeats,
+            "deregistrations": self.deregistrations,
+            "table_swaps": self.table_swaps,
+            "last_swap": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.last_swap)) if self.last_swap else None,
+            "last_error": self.last_error,
+        }
+
+
+# 게이트웨이 전역 서비스 디스커버리 (main.lifespan에서 start/stop)
+service_discovery = ServiceDiscovery()
+
+
+class RegisterIn(BaseModel):
+    service: ServiceType
+    url: str = Field(..., description="게이트웨이가 호출할 인스턴스 주소 (예: http://10.0.0.5:8008)")
+    weight: float = Field(1.0, ge=0)
+    instance_id: Optional[str] = Field(None, max_length=128, description="없으면 게이트웨이가 발급")
+    ttl: Optional[float] = Field(None, gt=0, description="heartbeat 없이 유지되는 시간(초)")
+    metadata: Dict[str, str] = Field(default_factory=dict)
+
+    @field_validator("url")
+    @classmethod
+    def _http_url(cls, value: str) -> str:
+        value = value.strip().rstrip("/")
+        if not value.startswith(("http://", "https://")):
+            raise ValueError("url must start with http:// or https://")
+        return value
+
+
+class HeartbeatIn(BaseModel):
+    ttl: Optional[float] = Field(None, gt=0)
+
+
+discovery_router = APIRouter(prefix="/api/v1/discovery", tags=["Service Discovery"])
+
+
+@discovery_router.get("", summary="서비스 레지스트리 상태")
+async def discovery_stats():
+    return await service_discovery.stats()
+
+
+@discovery_router.post("/register", status_code=201, summary="서비스 인스턴스 등록")
+async def register_instance(body: RegisterIn, authorization: Optional[str] = Header(None)):
+    service_discovery.authorize(authorization)
+    service_discovery.check_url(body.url)
+    ttl = service_discovery.clamp_ttl(body.ttl)
+    instance = ServiceInstance(
+        service=body.service.value,
+        instance_id=body.instance_id or uuid.uuid4().hex,
+        url=body.url,
+        weight=body.weight,
+        metadata=body.metadata,
+        registered_at=time.time(),
+    )
+    await service_discovery.registry.register(instance, ttl)
+    service_discovery.registrations += 1
+    service_discovery.notify()
+    logger.info(f"🧭 [{instance.service}] 인스턴스 등록: {instance.url} (id={instance.instance_id}, ttl={ttl}s)")
+    return {
+        "service": instance.service,
+        "instance_id": instance.instance_id,
+        "ttl": ttl,
+        # TTL 안에 두세 번은 heartbeat를 보내도록 권장
+        "heartbeat_interval": round(ttl / 3, 1),
+    }
+
+
+@discovery_router.put("/{service}/{instance_id}/heartbeat", summary="인스턴스 heartbeat (TTL 연장)")
+async def heartbeat_instance(
+    service: ServiceType, instance_id: str, body: Optional[HeartbeatIn] = None,
+    authorization: Optional[str] = Header(None),
+):
+    service_discovery.authorize(authorization)
+    ttl = service_discovery.clamp_ttl(body.ttl if body else None)
+    if not await service_discovery.registry.heartbeat(service.value, instance_id, ttl):
+        # 만료되었거나 게이트웨이가 재시작됨 → 서비스가 다시 등록해야 함
+        service_discovery.expired_heartbeats += 1
+        raise HTTPException(status_code=404, detail="Instance not registered")
+    service_discovery.heartbeats += 1
+    return {"service": service.value, "instance_id": instance_id, "ttl": ttl}
+
+
+@discovery_router.delete("/{service}/{instance_id}", status_code=204, summary="인스턴스 등록 해제")
+async def deregister_instance(service: ServiceType, instance_id: str, authorization: Optional[str] = Header(None)):
+    service_discovery.authorize(authorization)
+    if not await service_discovery.registry.deregister(service.value, instance_id):
+        raise HTTPException(status_code=404, detail="Instance not registered")
+    service_discovery.deregistrations += 1
+    service_discovery.notify()
+    logger.info(f"🧭 [{service.value}] 인스턴스 등록 해제: id={instance_id}")
+    return Response(status_code=204)
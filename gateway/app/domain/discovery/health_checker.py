@@ -0,0 +1,236 @@
+"""
+업스트림 액티브 헬스체커
+
+lifespan 동안 백그라운드에서 모든 서비스 레플리카의 /health를 동시에 주기적으로 조회한다.
+레플리카마다 무작위 지연(jitter)을 두어 조회가 한순간에 몰리지 않게 하고,
+최근 결과(rolling window)와 연속 성공/실패 횟수로 상태를 판정해
+비정상 레플리카는 즉시 로드밸런서 라우팅에서 제외(Replica.healthy)한다.
+조회는 전용 클라이언트로 사용자 요청과 분리되어 수행되므로 요청 지연에 영향을 주지 않는다.
+"""
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+import asyncio
+import os
+import random
+import time
+import logging
+
+import httpx
+
+from app.domain.model.load_balancer import LoadBalancerRegistry, Replica, load_balancers
+
+logger = logging.getLogger("gateway_api")
+
+
+class ReplicaHealth:
+    """레플리카 하나의 헬스체크 이력"""
+
+    def __init__(self, service: str, url: str, window: int):
+        self.service = service
+        self.url = url
+        self.status = "unknown"
+        self.results: Deque[bool] = deque(maxlen=window)
+        self.consecutive_successes = 0
+        self.consecutive_failures = 0
+        self.last_checked: Optional[float] = None
+        self.last_latency: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_transition: Optional[float] = None
+
+    def record(self, ok: bool, latency: float, error: Optional[str]) -> None:
+        self.results.append(ok)
+        self.last_checked = time.time()
+        self.last_latency = latency
+        self.last_error = error
+        if ok:
+            self.consecutive_successes += 1
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+            self.consecutive_successes = 0
+
+    def snapshot(self) -> Dict[str, object]:
+        checks = len(self.results)
+        return {
+            "url": self.url,
+            "status": self.status,
+            "success_rate": round(sum(self.results) / checks, 4) if checks else None,
+            "checks": checks,
+            "consecutive_failures": self.consecutive_failures,
+            "last_latency_ms": round(self.last_latency * 1000, 2) if self.last_latency is not None else None,
+            "last_error": self.last_error,
+            "last_checked": _iso(self.last_checked),
+            "last_transition": _iso(self.last_transition),
+        }
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts)) if ts else None
+
+
+class HealthChecker:
+    def __init__(
+        self,
+        balancers: LoadBalancerRegistry,
+        interval: Optional[float] = None,
+        timeout: Optional[float] = None,
+        jitter: Optional[float] = None,
+        rise: Optional[int] = None,
+        fall: Optional[int] = None,
+        window: Optional[int] = None,
+        path: Optional[str] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.balancers = balancers
+        self.interval = interval or float(os.getenv("GATEWAY_HEALTH_INTERVAL", 10))
+        self.timeout = timeout or float(os.getenv("GATEWAY_HEALTH_TIMEOUT", 2))
+        # 주기 대비 무작위 지연 비율 (0.2 → 최대 주기의 20%)
+        self.jitter = jitter if jitter is not None else float(os.getenv("GATEWAY_HEALTH_JITTER", 0.2))
+        self.rise = rise or int(os.getenv("GATEWAY_HEALTH_RISE", 2))
+        self.fall = fall or int(os.getenv("GATEWAY_HEALTH_FALL", 3))
+        self.window = window or int(os.getenv("GATEWAY_HEALTH_WINDOW", 10))
+        self.path = path or os.getenv("GATEWAY_HEALTH_PATH", "/health")
+        self.transport = transport
+        self._states: Dict[Tuple[str, str], ReplicaHealth] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        # 사용자 요청용 풀과 분리된 전용 클라이언트 (헬스체크가 풀 슬롯을 차지하지 않도록)
+        self._client = httpx.AsyncClient(
+            transport=self.transport,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(
+            f"🩺 업스트림 헬스체커 시작: interval={self.interval}s, path={self.path}, "
+            f"rise={self.rise}, fall={self.fall}"
+        )
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+        logger.info("🩺 업스트림 헬스체커 종료")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.check_all()
+            except Exception as e:
+                logger.error(f"🚨 헬스체크 라운드 실패: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def check_all(self, jitter: bool = True) -> None:
+        """현재 라우팅 테이블의 모든 레플리카를 동시에 한 번씩 조회"""
+        targets = [
+            (name, replica)
+            for name, balancer in self.balancers.items()
+            for replica in balancer.replicas
+        ]
+        # 라우팅 테이블에서 빠진 레플리카의 상태는 정리
+        live = {(name, replica.url) for name, replica in targets}
+        for key in [key for key in self._states if key not in live]:
+            del self._states[key]
+        await asyncio.gather(*(self._check(name, replica, jitter) for name, replica in targets))
+
+    async def _check(self, service: str, replica: Replica, jitter: bool) -> None:
+        if jitter and self.jitter > 0:
+            await asyncio.sleep(random.uniform(0, self.interval * self.jitter))
+        key = (service, replica.url)
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = ReplicaHealth(service, replica.url, self.window)
+
+        started = time.perf_counter()
+        error = None
+        try:
+            response = await self._client.get(replica.url + self.path)
+            ok = response.status_code < 400
+            if not ok:
+                error = f"HTTP {response.status_code}"
+        except httpx.HTTPError as e:
+            ok = False
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+        state.record(ok, time.perf_counter() - started, error)
+        self._apply(state, replica)
+
+    def _apply(self, state: ReplicaHealth, replica: Replica) -> None:
+        """연속 성공(rise)/실패(fall) 기준으로 상태 전환 후 라우팅에 반영"""
+        if state.status != "healthy" and state.consecutive_successes >= self.rise:
+            status = "healthy"
+        elif state.status != "unhealthy" and state.consecutive_failures >= self.fall:
+            status = "unhealthy"
+        elif state.status == "unknown" and state.results and state.results[-1]:
+            # 시작 직후 첫 성공은 바로 정상으로 간주
+            status = "healthy"
+        else:
+            status = state.status
+        if status != state.status:
+            if status == "unhealthy":
+                logger.warning(f"🩺 [{state.service}] 레플리카 비정상 → 라우팅 제외: {state.url} ({state.last_error})")
+            elif state.status == "unhealthy":
+                logger.info(f"🩺 [{state.service}] 레플리카 복구 → 라우팅 복귀: {state.url}")
+                # 액티브 체크로 복구가 확인되면 패시브 제외(outlier ejection)도 해제
+                replica.ejected_until = 0.0
+            state.status = status
+            state.last_transition = time.time()
+        replica.healthy = state.status != "unhealthy"
+
+    def snapshot(self) -> Dict[str, object]:
+        """서비스별 집계 상태"""
+        services = {}
+        for name, balancer in self.balancers.items():
+            replicas = [
+                self._states[(name, replica.url)].snapshot()
+                if (name, replica.url) in self._states
+                else {"url": replica.url, "status": "unknown"}
+                for replica in balancer.replicas
+            ]
+            healthy = sum(1 for replica in replicas if replica["status"] == "healthy")
+            unhealthy = sum(1 for replica in replicas if replica["status"] == "unhealthy")
+            if not replicas:
+                status = "unknown"
+            elif unhealthy == len(replicas):
+                status = "unhealthy"
+            elif unhealthy:
+                status = "degraded"
+            elif healthy == len(replicas):
+                status = "healthy"
+            else:
+                status = "unknown"
+            services[name] = {
+                "status": status,
+                "healthy_replicas": healthy,
+                "total_replicas": len(replicas),
+                "replicas": replicas,
+            }
+
+        statuses = {service["status"] for service in services.values()}
+        if "unhealthy" in statuses or "degraded" in statuses:
+            overall = "degraded"
+        elif statuses == {"healthy"}:
+            overall = "healthy"
+        else:
+            overall = "unknown"
+        return {
+            "status": overall,
+            "running": self._task is not None,
+            "interval": self.interval,
+            "services": services,
+        }
+
+
+# 게이트웨이 전역 헬스체커 (main.lifespan에서 start/stop)
+health_checker = HealthChecker(load_balancers)
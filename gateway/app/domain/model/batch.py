@@ -0,0 +1,306 @@
+"""
+배치(fan-out) 프록시
+
+대시보드가 서비스마다 따로 호출해 매번 클라이언트 RTT를 내는 대신,
+하위 요청 목록을 한 번에 받아 게이트웨이 커넥션 풀로 동시에 실행한다.
+- 하위 요청마다 개별 deadline (배치 전체 deadline을 넘지 않음)
+- 일부 실패(4xx/5xx, 시간 초과, 잘못된 항목)는 해당 항목 결과로만 돌려주고 배치 자체는 200
+- 업스트림 JSON 본문은 재직렬화 없이 바이트 그대로 결과에 삽입
+  (유효한 JSON인지만 확인하고, JSON이라면서 HTML 오류 페이지나 잘린 본문이면 문자열로 삽입)
+- NDJSON 모드에서는 완료되는 순서대로 한 줄씩 전송
+- GET 하위 요청도 일반 GET 프록시와 같이 응답 캐시/요청 병합을 거침
+- POST 하위 요청도 단일 POST와 같이 라우트별 스키마 검증과 Idempotency-Key 처리를 거침
+- 항목별 headers는 허용 목록(ITEM_HEADERS)에 있는 것만 적용 (host, hop-by-hop, 타임아웃 헤더 등은 무시)
+"""
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple, Union
+import asyncio
+import json
+import os
+import time
+import logging
+
+import httpx
+from fastapi import HTTPException
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+from app.common.utility.access_log import add_timing, detach_context
+from app.common.utility.idempotency import IDEMPOTENCY_HEADER, StoredResponse, idempotency_store
+from app.common.utility.response_cache import response_cache
+from app.common.utility.single_flight import coalesce_key, request_coalescer
+from app.domain.model.proxy_schema import validate_post_body
+from app.domain.model.service_factory import ServiceProxyFactory, ServiceType
+
+logger = logging.getLogger("gateway_api")
+
+# 배치 요청 헤더 중 하위 요청에 전달할 헤더 (인증/세션/언어/추적용)
+FORWARD_HEADERS = ("authorization", "cookie", "accept-language", "x-request-id")
+# 항목별 headers 중 하위 요청에 적용하는 헤더 (그 외는 무시)
+ITEM_HEADERS = FORWARD_HEADERS + ("accept", "if-none-match", IDEMPOTENCY_HEADER)
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+
+class BatchItem(BaseModel):
+    id: Optional[str] = Field(default=None, max_length=128)
+    service: ServiceType
+    method: str = "GET"
+    path: str = Field(..., min_length=1)
+    params: Dict[str, str] = Field(default_factory=dict)
+    headers: Dict[str, str] = Field(default_factory=dict)
+    body: Any = None
+    timeout_ms: Optional[int] = Field(default=None, gt=0)
+
+    @field_validator("method")
+    @classmethod
+    def _upper_method(cls, value: str) -> str:
+        value = value.upper()
+        if value not in BATCH_METHODS:
+            raise ValueError(f"method must be one of {', '.join(BATCH_METHODS)}")
+        return value
+
+
+def _is_json(content_type: Optional[str]) -> bool:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+
+def _is_valid_json(body: bytes) -> bool:
+    """빈 본문은 null로 삽입하므로 유효한 것으로 봄"""
+    if not body.strip():
+        return True
+    try:
+        json.loads(body)
+    except ValueError:
+        return False
+    return True
+
+
+def encode_result(
+    index: int,
+    item_id: Optional[str],
+    status: int,
+    content_type: Optional[str],
+    body: bytes,
+    duration_ms: float,
+) -> bytes:
+    """항목 결과 한 줄(JSON 객체). 유효한 JSON 본문은 바이트 그대로, 그 외는 문자열로 "body"에 삽입"""
+    head = json.dumps(
+        {
+            "index": index,
+            "id": item_id,
+            "status": status,
+            "content_type": content_type,
+            "duration_ms": round(duration_ms, 3),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    payload = None
+    if _is_json(content_type) and _is_valid_json(body):
+        # JSON 문자열 안에는 raw 개행이 올 수 없으므로 개행은 모두 공백(토큰 사이)이라 안전하게 치환
+        payload = body.strip().replace(b"\r", b" ").replace(b"\n", b" ") or b"null"
+    if payload is None:
+        # 본문 하나가 깨져도 배치 응답 전체가 잘못된 JSON이 되지 않도록 문자열로 삽입
+        payload = json.dumps(body.decode("utf-8", "replace"), ensure_ascii=False).encode("utf-8")
+    return head[:-1].encode("utf-8") + b',"body":' + payload + b"}"
+
+
+def _error_body(detail: Any) -> bytes:
+    return json.dumps({"detail": detail}, ensure_ascii=False, default=str).encode("utf-8")
+
+
+class BatchExecutor:
+    def __init__(
+        self,
+        max_items: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ):
+        self.max_items = max_items or int(os.getenv("GATEWAY_BATCH_MAX_ITEMS", 20))
+        self.concurrency = concurrency or int(os.getenv("GATEWAY_BATCH_CONCURRENCY", 10))
+        self.item_timeout = item_timeout or float(os.getenv("GATEWAY_BATCH_ITEM_TIMEOUT", 5.0))
+        self.timeout = timeout or float(os.getenv("GATEWAY_BATCH_TIMEOUT", 10.0))
+        self.batches = 0
+        self.items = 0
+        self.failed = 0
+
+    def parse(self, raw: bytes) -> Tuple[List[Union[BatchItem, str]], float]:
+        """{"requests": [...], "timeout_ms": 3000} 파싱. 잘못된 항목은 오류 메시지(str)로 남겨 해당 항목만 실패 처리"""
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Batch body must be valid JSON")
+        requests = payload.get("requests") if isinstance(payload, dict) else None
+        if not isinstance(requests, list) or not requests:
+            raise HTTPException(status_code=422, detail='Batch body must contain a non-empty "requests" list')
+        if len(requests) > self.max_items:
+            raise HTTPException(status_code=413, detail=f"Batch may contain at most {self.max_items} requests")
+
+        timeout = self.timeout
+        timeout_ms = payload.get("timeout_ms")
+        if isinstance(timeout_ms, (int, float)) and timeout_ms > 0:
+            timeout = min(timeout, timeout_ms / 1000)
+
+        items: List[Union[BatchItem, str]] = []
+        for raw_item in requests:
+            try:
+                items.append(BatchItem.model_validate(raw_item))
+            except ValidationError as e:
+                items.append("; ".join(
+                    f"{'.'.join(str(loc) for loc in error['loc']) or 'item'}: {error['msg']}" for error in e.errors()
+                ))
+        return items, timeout
+
+    @staticmethod
+    def forward_headers(request_headers: Mapping[str, str]) -> Dict[str, str]:
+        return {name: request_headers[name] for name in FORWARD_HEADERS if name in request_headers}
+
+    @staticmethod
+    def item_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+        """항목별 headers 중 허용 목록에 있는 것만 (host, hop-by-hop, x-request-timeout-ms 덮어쓰기 방지)"""
+        return {name.lower(): value for name, value in headers.items() if name.lower() in ITEM_HEADERS}
+
+    async def _call(self, item: BatchItem, headers: Dict[str, str], timeout: float) -> Tuple[int, Optional[str], bytes]:
+        factory = ServiceProxyFactory.for_service(item.service)
+        service = item.service.value
+        if item.method == "GET":
+            query_items = list(item.params.items())
+            cache_ttl = response_cache.ttl_for(service, item.path)
+            if cache_ttl:
+                cache_key = response_cache.base_key(service, item.path, query_items)
+                cached = response_cache.lookup(cache_key, headers)
+                if cached is not None:
+                    return cached.status_code, cached.media_type, cached.body
+            flight_key = coalesce_key(service, factory.upstream_path(item.path), query_items, headers)
+            fetch = lambda: request_coalescer.do(
+                flight_key,
+                lambda: factory.request(
+                    method="GET", path=item.path, headers=headers, params=item.params, timeout=timeout
+                ),
+            )
+            if not cache_ttl:
+                resp = await fetch()
+            else:
+                cached, resp = await response_cache.fetch(cache_key, headers, cache_ttl, fetch)
+                if cached is not None:
+                    return cached.status_code, cached.media_type, cached.body
+        else:
+            body = None
+            if item.body is not None and item.method != "DELETE":
+                body = json.dumps(item.body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                headers = {**headers, "content-type": "application/json"}
+            if item.method == "POST":
+                if body is None:
+                    raise HTTPException(status_code=422, detail="Request body is required")
+                # 단일 POST 프록시와 같은 라우트별 스키마 검증 (배치로 우회할 수 없도록)
+                validate_post_body(item.service, item.path, body)
+            send = lambda: factory.request(
+                method=item.method,
+                path=item.path,
+                headers=headers,
+                body=body,
+                params=item.params or None,
+                timeout=timeout,
+            )
+            idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+            if item.method == "POST" and idempotency_key is not None:
+                upstream_path = factory.upstream_path(item.path)
+                key = idempotency_store.scope_key(service, upstream_path, idempotency_key, headers)
+                fingerprint = idempotency_store.fingerprint("POST", upstream_path, item.params.items(), body)
+                resp, _ = await idempotency_store.execute(key, fingerprint, send)
+                if isinstance(resp, StoredResponse):
+                    return resp.status_code, resp.media_type, resp.body
+            else:
+                resp = await send()
+        return resp.status_code, resp.headers.get("content-type"), resp.content
+
+    async def _execute(
+        self,
+        index: int,
+        item: Union[BatchItem, str],
+        base_headers: Dict[str, str],
+        deadline: float,
+        slots: asyncio.Semaphore,
+    ) -> Tuple[int, bytes]:
+        # 하위 요청의 서비스/업스트림 시간이 배치 요청 액세스 로그에 섞이지 않도록 분리
+        detach_context()
+        started = time.perf_counter()
+        content_type = "application/json"
+        item_id = item.id if isinstance(item, BatchItem) else None
+        if not isinstance(item, BatchItem):
+            status, body = 400, _error_body(item)
+        else:
+            headers = {**base_headers, **self.item_headers(item.headers)}
+            timeout = min(item.timeout_ms / 1000 if item.timeout_ms else self.item_timeout, deadline - time.monotonic())
+
+            async def call():
+                # 동시 실행 슬롯 대기 시간도 항목 deadline에 포함, 업스트림에는 남은 시간을 deadline으로 전달
+                async with slots:
+                    return await self._call(item, headers, started + timeout - time.perf_counter())
+
+            try:
+                if timeout <= 0:
+                    raise asyncio.TimeoutError
+                status, content_type, body = await asyncio.wait_for(call(), timeout)
+            except asyncio.TimeoutError:
+                status, body = 504, _error_body("Batch item deadline exceeded")
+            except HTTPException as he:
+                status, body = he.status_code, _error_body(he.detail)
+            except httpx.RequestError as e:
+                status, body = 502, _error_body(f"Upstream request failed: {type(e).__name__}")
+            except Exception as e:
+                logger.error(f"🚨 배치 항목 처리 중 오류: {e}", exc_info=True)
+                status, body = 500, _error_body(f"Gateway error: {e}")
+
+        if status >= 400:
+            self.failed += 1
+        duration_ms = (time.perf_counter() - started) * 1000
+        return status, encode_result(index, item_id, status, content_type, body, duration_ms)
+
+    def _start(self, items: List[Union[BatchItem, str]], headers: Dict[str, str], timeout: float) -> List[asyncio.Task]:
+        self.batches += 1
+        self.items += len(items)
+        deadline = time.monotonic() + timeout
+        slots = asyncio.Semaphore(self.concurrency)
+        return [
+            asyncio.ensure_future(self._execute(index, item, headers, deadline, slots))
+            for index, item in enumerate(items)
+        ]
+
+    async def run(self, items: List[Union[BatchItem, str]], headers: Dict[str, str], timeout: float) -> bytes:
+        """모든 항목을 실행해 요청 순서대로 결과를 담은 JSON 응답 본문 반환"""
+        started = time.perf_counter()
+        tasks = self._start(items, headers, timeout)
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+        add_timing("upstream_ms", time.perf_counter() - started)
+        succeeded = sum(1 for status, _ in results if status < 400)
+        return (
+            b'{"results":[' + b",".join(line for _, line in results) + b"]"
+            + f',"succeeded":{succeeded},"failed":{len(results) - succeeded}}}'.encode()
+        )
+
+    async def stream(
+        self, items: List[Union[BatchItem, str]], headers: Dict[str, str], timeout: float
+    ) -> AsyncIterator[bytes]:
+        """완료되는 순서대로 NDJSON 한 줄씩 반환 (클라이언트가 끊으면 남은 항목 취소)"""
+        started = time.perf_counter()
+        tasks = self._start(items, headers, timeout)
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                _, line = await next_done
+                yield line + b"\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            add_timing("upstream_ms", time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, int]:
+        return {"batches": self.batches, "items": self.items, "failed_items": self.failed}
+
+
+# 게이트웨이 전역 배치 실행기
+batch_executor = BatchExecutor()
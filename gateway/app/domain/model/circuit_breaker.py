@@ -0,0 +1,167 @@
+"""
+업스트림 서비스별 서킷 브레이커 (closed / open / half-open)
+
+최근 구간의 에러율 또는 느린 호출 비율이 임계치를 넘으면 open 상태로 전환해
+업스트림을 기다리지 않고 즉시 503으로 실패시키고, 일정 시간 후 소수의 probe 요청으로 복구를 확인한다.
+"""
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Optional, Tuple
+import os
+import time
+import logging
+
+logger = logging.getLogger("gateway_api")
+
+
+class BreakerState(str, Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit for {name} is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: Optional[float] = None,
+        min_requests: Optional[int] = None,
+        error_rate_threshold: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None,
+        slow_call_rate_threshold: Optional[float] = None,
+        open_seconds: Optional[float] = None,
+        half_open_probes: Optional[int] = None,
+    ):
+        self.name = name
+        self.window_seconds = window_seconds or float(os.getenv("CIRCUIT_BREAKER_WINDOW", 30))
+        self.min_requests = min_requests or int(os.getenv("CIRCUIT_BREAKER_MIN_REQUESTS", 10))
+        self.error_rate_threshold = error_rate_threshold or float(os.getenv("CIRCUIT_BREAKER_ERROR_RATE", 0.5))
+        self.slow_call_seconds = slow_call_seconds or float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", 3.0))
+        self.slow_call_rate_threshold = slow_call_rate_threshold or float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", 0.8))
+        self.open_seconds = open_seconds or float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", 15))
+        self.half_open_probes = half_open_probes or int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", 3))
+
+        self.state = BreakerState.closed
+        # (시각, 실패 여부, 느린 호출 여부)
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self.rejected = 0
+        self.last_transition = time.time()
+
+    def _transition(self, state: BreakerState, reason: str = "") -> None:
+        if self.state == state:
+            return
+        logger.warning(f"⚡ 서킷 브레이커 [{self.name}] {self.state.value} → {state.value} {reason}")
+        self.state = state
+        self.last_transition = time.time()
+        if state == BreakerState.open:
+            self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == BreakerState.closed:
+            self._calls.clear()
+            self._failures = self._slow = 0
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            _, failed, slow = self._calls.popleft()
+            self._failures -= failed
+            self._slow -= slow
+
+    def _rates(self) -> Tuple[int, float, float]:
+        total = len(self._calls)
+        if not total:
+            return 0, 0.0, 0.0
+        return total, self._failures / total, self._slow / total
+
+    def before_call(self) -> None:
+        """호출 허용 여부 확인. open 상태면 CircuitOpenError"""
+        if self.state == BreakerState.open:
+            remaining = self.open_seconds - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, remaining)
+            self._transition(BreakerState.half_open, "(probe 시작)")
+
+        if self.state == BreakerState.half_open:
+            if self._probes_in_flight >= self.half_open_probes:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 1.0)
+            self._probes_in_flight += 1
+
+    def record(self, success: bool, latency: float) -> None:
+        """업스트림 호출 결과 기록 (5xx/연결 오류는 실패)"""
+        slow = latency >= self.slow_call_seconds
+        if self.state == BreakerState.half_open:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if not success or slow:
+                self._transition(BreakerState.open, "(probe 실패)")
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_probes:
+                self._transition(BreakerState.closed, "(probe 성공)")
+            return
+
+        now = time.monotonic()
+        self._calls.append((now, not success, slow))
+        self._failures += not success
+        self._slow += slow
+        self._prune(now)
+        total, error_rate, slow_rate = self._rates()
+        if total < self.min_requests:
+            return
+        if error_rate >= self.error_rate_threshold:
+            self._transition(BreakerState.open, f"(에러율 {error_rate:.0%})")
+        elif slow_rate >= self.slow_call_rate_threshold:
+            self._transition(BreakerState.open, f"(느린 호출 비율 {slow_rate:.0%})")
+
+    def abandon(self) -> None:
+        """결과 없이 끝난 호출(클라이언트 취소 등)의 probe 슬롯 반환"""
+        if self.state == BreakerState.half_open:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def snapshot(self) -> Dict[str, object]:
+        self._prune(time.monotonic())
+        total, error_rate, slow_rate = self._rates()
+        retry_after = 0.0
+        if self.state == BreakerState.open:
+            retry_after = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+        return {
+            "state": self.state.value,
+            "window_requests": total,
+            "error_rate": round(error_rate, 4),
+            "slow_call_rate": round(slow_rate, 4),
+            "rejected": self.rejected,
+            "retry_after": round(retry_after, 2),
+            "last_transition": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.last_transition)),
+        }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name)
+        return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {name: breaker.snapshot() for name, breaker in self._breakers.items()}
+
+
+# 게이트웨이 전역 브레이커 (키: ServiceType 값)
+circuit_breakers = CircuitBreakerRegistry()
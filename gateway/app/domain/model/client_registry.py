@@ -0,0 +1,301 @@
+"""
+업스트림 HTTP 클라이언트 레지스트리
+
+ServiceType별로 커넥션 풀을 가진 httpx.AsyncClient를 하나씩 유지해
+요청마다 TCP/TLS 핸드셰이크를 반복하지 않고 keep-alive 연결을 재사용한다.
+
+업스트림별로 HTTP/2를 선택할 수 있다 (h2 패키지 필요, httpx[http2]).
+- "1.1": HTTP/1.1 (기본값, 동시 요청마다 연결 하나)
+- "h2":  TLS ALPN으로 HTTP/2 협상 (서버가 지원하지 않으면 자동으로 HTTP/1.1)
+- "h2c": 평문 HTTP/2 prior knowledge (클러스터 내부 서비스용). 첫 요청 전 확인 요청이
+         프로토콜 오류로 실패하면 해당 서비스는 HTTP/1.1로 폴백
+HTTP/2는 레플리카당 연결 하나로 요청을 다중화하며, 연결당 동시 스트림 수를 제한한다.
+"""
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from typing import AsyncIterator, Callable, Dict, Iterable, Mapping, Optional, Tuple
+import asyncio
+import os
+import logging
+
+import httpx
+
+try:
+    import h2  # noqa: F401  httpx[http2]
+    HTTP2_AVAILABLE = True
+except ImportError:  # h2 미설치 시 HTTP/1.1만 사용
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger("gateway_api")
+
+HTTP_VERSIONS = ("1.1", "h2", "h2c")
+_HTTP_VERSION_ALIASES = {"1": "1.1", "http/1.1": "1.1", "http1": "1.1", "2": "h2", "http2": "h2", "http/2": "h2"}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def parse_http_version(raw: Optional[str], default: Optional[str] = "1.1") -> Optional[str]:
+    """"1.1" / "h2" / "h2c" (http2, http/1.1 등 별칭 허용). 잘못된 값이면 default"""
+    if raw is None or not raw.strip():
+        return default
+    value = raw.strip().lower()
+    value = _HTTP_VERSION_ALIASES.get(value, value)
+    if value not in HTTP_VERSIONS:
+        logger.warning(f"⚠️ 잘못된 업스트림 HTTP 버전 설정 무시: {raw}")
+        return default
+    return value
+
+
+def _no_cookie_jar() -> CookieJar:
+    """공유 클라이언트가 업스트림 Set-Cookie를 저장해 다른 사용자 요청에 섞지 않도록 차단"""
+    return CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+
+
+class _StreamSlotRelease(httpx.AsyncByteStream):
+    """응답 본문을 다 읽거나 닫을 때 HTTP/2 스트림 슬롯 반환"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release: Optional[Callable[[], None]] = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+        await self._stream.aclose()
+
+
+class Http2Transport(httpx.AsyncBaseTransport):
+    """HTTP/2 전송: 연결(레플리카)당 동시 스트림 제한 + h2c 실패 시 HTTP/1.1 폴백"""
+
+    IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, service: str, http_version: str, limits: httpx.Limits, max_streams: int):
+        self.service = service
+        self.http_version = http_version
+        self.limits = limits
+        self.max_streams = max_streams
+        # h2: ALPN 협상(HTTP/1.1 허용), h2c: http1=False → 평문에서 prior knowledge
+        self._http2 = httpx.AsyncHTTPTransport(http1=http_version == "h2", http2=True, limits=limits)
+        self._http1: Optional[httpx.AsyncHTTPTransport] = None
+        # httpcore는 origin당 HTTP/2 연결 하나로 다중화하므로 origin별 세마포어 = 연결당 스트림 제한
+        self._streams: Dict[Tuple[bytes, bytes, Optional[int]], asyncio.Semaphore] = {}
+        self._probe_lock = asyncio.Lock()
+        self.confirmed = False
+        self.fallback = False
+        self.streams_in_flight = 0
+
+    @property
+    def pool_transport(self) -> httpx.AsyncHTTPTransport:
+        return self._http1 if self.fallback else self._http2
+
+    def _fallback_transport(self) -> httpx.AsyncHTTPTransport:
+        if self._http1 is None:
+            self._http1 = httpx.AsyncHTTPTransport(limits=self.limits)
+        return self._http1
+
+    def _slots(self, url: httpx.URL) -> asyncio.Semaphore:
+        key = (url.raw_scheme, url.raw_host, url.port)
+        semaphore = self._streams.get(key)
+        if semaphore is None:
+            semaphore = self._streams[key] = asyncio.Semaphore(self.max_streams)
+        return semaphore
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        slots = self._slots(request.url)
+        await slots.acquire()
+        self.streams_in_flight += 1
+
+        def release() -> None:
+            self.streams_in_flight -= 1
+            slots.release()
+
+        try:
+            response = await self._http2.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+        response.stream = _StreamSlotRelease(response.stream, release)
+        return response
+
+    async def _probe(self, url: httpx.URL) -> None:
+        """h2c 첫 요청 전에 한 번만 확인 요청을 보내 서버의 HTTP/2 지원 여부 판정 (실제 요청 본문은 보존)"""
+        async with self._probe_lock:
+            if self.confirmed or self.fallback:
+                return
+            probe = httpx.Request("OPTIONS", url.copy_with(path="/", query=None))
+            try:
+                response = await self._http2.handle_async_request(probe)
+            except httpx.RemoteProtocolError:
+                # 서버가 h2c 연결 서문(preface)을 이해하지 못함 → 이후 요청은 HTTP/1.1
+                self.fallback = True
+                logger.warning(f"⚠️ {self.service} 업스트림이 h2c를 지원하지 않아 HTTP/1.1로 폴백")
+                return
+            await response.aclose()
+            self.confirmed = True
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.http_version == "h2c" and not (self.confirmed or self.fallback):
+            await self._probe(request.url)
+        if self.fallback:
+            return await self._fallback_transport().handle_async_request(request)
+
+        try:
+            response = await self._send(request)
+        except (httpx.RemoteProtocolError, httpx.WriteError):
+            # 서버가 연결을 재활용(GOAWAY 후 종료)한 경우: 멱등 요청만 새 연결로 한 번 재시도
+            if self.confirmed and request.method in self.IDEMPOTENT_METHODS:
+                return await self._send(request)
+            raise
+
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self.confirmed = True
+        return response
+
+    async def aclose(self) -> None:
+        await self._http2.aclose()
+        if self._http1 is not None:
+            await self._http1.aclose()
+
+
+class UpstreamClientRegistry:
+    """ServiceType별 장수명(pooled) httpx.AsyncClient 모음"""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None,
+        timeout: Optional[float] = None,
+        transport_factory: Optional[Callable[[str], httpx.AsyncBaseTransport]] = None,
+        http_version: Optional[str] = None,
+        max_streams: Optional[int] = None,
+    ):
+        self.max_connections = max_connections or _env_int("GATEWAY_POOL_MAX_CONNECTIONS", 100)
+        self.max_keepalive_connections = max_keepalive_connections or _env_int("GATEWAY_POOL_MAX_KEEPALIVE", 20)
+        self.keepalive_expiry = keepalive_expiry or _env_float("GATEWAY_POOL_KEEPALIVE_EXPIRY", 30.0)
+        self.timeout = timeout or _env_float("GATEWAY_UPSTREAM_TIMEOUT", 5.0)
+        # 서비스별 전송 계층 주입 (벤치마크의 MockTransport, 단일 프로세스 모드의 ASGI 전송 등).
+        # 팩토리가 없거나 None을 반환하면 기본 전송(HTTP/1.1 또는 HTTP/2)
+        self.transport_factory = transport_factory
+        # 서비스별 설정이 없을 때의 업스트림 HTTP 버전 / HTTP/2 연결당 동시 스트림 수
+        self.http_version = parse_http_version(http_version or os.getenv("GATEWAY_UPSTREAM_HTTP_VERSION"))
+        self.max_streams = max_streams or _env_int("GATEWAY_H2_MAX_STREAMS", 100)
+        self._protocols: Dict[str, str] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @staticmethod
+    def _key(service_type) -> str:
+        return str(getattr(service_type, "value", service_type))
+
+    def set_protocols(self, protocols: Mapping[str, str]) -> None:
+        """서비스별 HTTP 버전 지정 (라우팅 테이블 설치 시 호출, 이미 만든 클라이언트는 유지)"""
+        self._protocols = dict(protocols)
+
+    def protocol_for(self, service_type) -> str:
+        return self._protocols.get(self._key(service_type), self.http_version)
+
+    def _create_transport(self, service_type) -> Optional[httpx.AsyncBaseTransport]:
+        if self.transport_factory:
+            transport = self.transport_factory(service_type)
+            if transport is not None:
+                return transport
+        protocol = self.protocol_for(service_type)
+        if protocol == "1.1":
+            return None
+        if not HTTP2_AVAILABLE:
+            logger.warning(f"⚠️ h2 패키지가 없어 {self._key(service_type)} 업스트림은 HTTP/1.1 사용")
+            return None
+        return Http2Transport(self._key(service_type), protocol, self.limits, self.max_streams)
+
+    def _create_client(self, service_type: str) -> httpx.AsyncClient:
+        transport = self._create_transport(service_type)
+        return httpx.AsyncClient(
+            transport=transport,
+            limits=self.limits,
+            timeout=self.timeout,
+            cookies=_no_cookie_jar(),
+        )
+
+    async def start(self, service_types: Iterable[str]) -> None:
+        """lifespan 시작 시 모든 서비스의 클라이언트를 미리 생성"""
+        for service_type in service_types:
+            self.get(service_type)
+        logger.info(
+            f"🔌 업스트림 커넥션 풀 준비 완료: services={len(self._clients)}, "
+            f"max_connections={self.max_connections}, "
+            f"max_keepalive={self.max_keepalive_connections}, "
+            f"keepalive_expiry={self.keepalive_expiry}s, "
+            f"http_version={self.http_version}, overrides={self._protocols or '-'}"
+        )
+
+    def get(self, service_type: str) -> httpx.AsyncClient:
+        """서비스 클라이언트 반환 (lifespan 밖에서 호출되면 지연 생성)"""
+        client = self._clients.get(service_type)
+        if client is None or client.is_closed:
+            client = self._create_client(service_type)
+            self._clients[service_type] = client
+        return client
+
+    async def aclose(self) -> None:
+        """lifespan 종료 시 모든 풀을 정상 종료"""
+        clients, self._clients = self._clients, {}
+        for service_type, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning(f"⚠️ {service_type} 클라이언트 종료 중 오류: {e}")
+        logger.info("🔌 업스트림 커넥션 풀 종료 완료")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """서비스별 커넥션 풀 상태 (전체/활성/유휴 연결 수)"""
+        result = {}
+        for service_type, client in self._clients.items():
+            # httpx는 풀 상태를 공개 API로 노출하지 않으므로 httpcore 풀을 직접 조회
+            transport = getattr(client, "_transport", None)
+            pool = getattr(getattr(transport, "pool_transport", transport), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            idle = sum(1 for conn in connections if conn.is_idle())
+            entry = {
+                "connections": len(connections),
+                "active": len(connections) - idle,
+                "idle": idle,
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "http_version": "1.1",
+            }
+            if isinstance(transport, Http2Transport):
+                entry.update({
+                    "http_version": "1.1 (fallback)" if transport.fallback else transport.http_version,
+                    "streams_in_flight": transport.streams_in_flight,
+                    "max_streams_per_connection": transport.max_streams,
+                })
+            result[self._key(service_type)] = entry
+        return result
+
+
+# 게이트웨이 전역 레지스트리 (main.lifespan에서 start/aclose)
+client_registry = UpstreamClientRegistry()
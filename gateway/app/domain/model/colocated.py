@@ -0,0 +1,395 @@
+"""
+단일 프로세스(co-located) 배포 모드
+
+작은 테넌트/CI 환경에서는 서비스마다 컨테이너를 띄우고 네트워크 홉을 거칠 필요가 없으므로
+게이트웨이가 각 서비스의 FastAPI `app`을 직접 import해 ASGI 하위 앱으로 올리고,
+ServiceProxyFactory는 HTTP 대신 프로세스 내부 ASGI 전송으로 호출한다.
+- 서비스 패키지는 모두 이름이 `app`이므로 서비스마다 `_colocated_{service}.app`이라는 별도 이름으로 import하고,
+  서비스 소스의 `app...` 절대 import는 컴파일할 때 그 이름으로 바꿔 씀
+  (sys.modules의 `app`은 항상 게이트웨이 패키지이고, 요청 처리 중 지연 import도 자기 서비스 모듈을 찾음)
+- 라우트에 /v1/{service} 접두사가 없는 서비스는 /v1/{service}와 / 두 곳에 마운트
+- 응답 본문은 청크 단위로 흘려보내므로 SSE/대용량 다운로드도 버퍼링되지 않음
+- 캐시, 요청 병합, 서킷 브레이커, 동시성 제한, deadline 전파 등 게이트웨이 기능은 그대로 적용
+- import/시작에 실패한 서비스는 기존처럼 HTTP({SERVICE}_SERVICE_URL)로 호출
+
+"""
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+import ast
+import asyncio
+import dataclasses
+import importlib
+import importlib.abc
+import importlib.machinery
+import os
+import sys
+import time
+import logging
+
+import httpx
+from starlette.routing import Mount, Router
+
+from app.domain.model.load_balancer import ReplicaSpec
+from app.domain.model.service_factory import RouteTable, ServiceType, _install_route_table, get_route_table
+
+logger = logging.getLogger("gateway_api")
+
+COLOCATED_ENABLED = os.getenv("GATEWAY_COLOCATED", "false").lower() in ("1", "true", "yes")
+
+# 서비스 → 서비스 디렉터리 이름 (GATEWAY_SERVICES_DIR 아래)
+SERVICE_DIRECTORIES: Dict[ServiceType, str] = {
+    ServiceType.auth: "auth-service",
+    ServiceType.chatbot: "chatbot-service",
+    ServiceType.gri: "gri-service",
+    ServiceType.materiality: "materiality-service",
+    ServiceType.tcfd: "tcfd-service",
+    ServiceType.grireport: "grireport-service",
+    ServiceType.tcfdreport: "tcfdreport-service",
+    ServiceType.survey: "survey-service",
+}
+
+# 저장소 구조(gateway/, service/) 기준 기본 경로. 컨테이너에서는 /service
+DEFAULT_SERVICES_DIR = Path(__file__).resolve().parents[4] / "service"
+
+
+def colocated_url(service: str) -> str:
+    """라우팅 테이블/로그에 쓰는 내부 주소 (실제 네트워크 연결 없음)"""
+    return f"http://{service}.colocated"
+
+
+def service_package(service: str) -> str:
+    """서비스의 `app` 패키지를 올릴 최상위 패키지 이름"""
+    return f"_colocated_{service}"
+
+
+class _AppImportRewriter(ast.NodeTransformer):
+    """`from app.x import y` / `import app.x` → `{package}.app...` (상대 import는 그대로)"""
+
+    def __init__(self, package: str):
+        self.package = package
+
+    def _rename(self, name: str) -> Optional[str]:
+        if name == "app" or name.startswith("app."):
+            return f"{self.package}.{name}"
+        return None
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> ast.ImportFrom:
+        if node.level == 0 and node.module and self._rename(node.module):
+            node.module = self._rename(node.module)
+        return node
+
+    def visit_Import(self, node: ast.Import):
+        nodes: List[ast.stmt] = []
+        names = []
+        for alias in node.names:
+            renamed = self._rename(alias.name)
+            if renamed is None:
+                names.append(alias)
+            elif alias.asname is not None:
+                nodes.append(ast.Import(names=[ast.alias(name=renamed, asname=alias.asname)]))
+            else:
+                # `import app.x`는 이름 `app`을 바인딩하므로 하위 모듈을 import한 뒤 서비스의 app 패키지를 바인딩
+                nodes.append(ast.Import(names=[ast.alias(name=renamed)]))
+                nodes.append(ast.ImportFrom(module=self.package, names=[ast.alias(name="app")], level=0))
+        if not nodes:
+            return node
+        if names:
+            nodes.insert(0, ast.Import(names=names))
+        for new in nodes:
+            ast.copy_location(new, node)
+        return nodes
+
+
+class _ServiceSourceLoader(importlib.machinery.SourceFileLoader):
+    """import 문을 바꿔 쓴 뒤 컴파일 (__pycache__의 원본 바이트코드는 쓰지도 읽지도 않음)"""
+
+    def __init__(self, fullname: str, path: str, package: str):
+        super().__init__(fullname, path)
+        self.package = package
+
+    def get_code(self, fullname):
+        source = self.get_data(self.path)
+        tree = _AppImportRewriter(self.package).visit(ast.parse(source, self.path))
+        return compile(ast.fix_missing_locations(tree), self.path, "exec", dont_inherit=True)
+
+
+class _ServicePackageFinder(importlib.abc.MetaPathFinder):
+    """`_colocated_{service}.*` 모듈만 찾아 해당 서비스 디렉터리에서 로드"""
+
+    def __init__(self):
+        self.roots: Dict[str, Path] = {}
+
+    def find_spec(self, fullname, path, target=None):
+        package = fullname.partition(".")[0]
+        if package not in self.roots or fullname == package:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec(fullname, path)
+        if spec is not None and isinstance(spec.loader, importlib.machinery.SourceFileLoader):
+            spec.loader = _ServiceSourceLoader(fullname, spec.origin, package)
+        return spec
+
+
+_finder = _ServicePackageFinder()
+
+
+def _forget_package(package: str) -> None:
+    for name in [name for name in sys.modules if name == package or name.startswith(package + ".")]:
+        del sys.modules[name]
+
+
+class _ASGIResponseStream(httpx.AsyncByteStream):
+    def __init__(self, chunks: asyncio.Queue, task: asyncio.Task, closed: asyncio.Event, read_timeout: Optional[float]):
+        self._chunks = chunks
+        self._task = task
+        self._closed = closed
+        self._read_timeout = read_timeout
+
+    async def __aiter__(self):
+        while True:
+            try:
+                chunk = await asyncio.wait_for(self._chunks.get(), self._read_timeout)
+            except asyncio.TimeoutError:
+                raise httpx.ReadTimeout("Timed out reading in-process response body")
+            if chunk is None:
+                return
+            yield chunk
+
+    async def aclose(self) -> None:
+        # 호출자가 본문을 끝까지 읽지 않으면 앱에 disconnect를 알리고 정리
+        self._closed.set()
+        if not self._task.done():
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class ASGIStreamingTransport(httpx.AsyncBaseTransport):
+    """프로세스 내부 ASGI 앱 호출. httpx.ASGITransport와 달리 응답 본문을 모으지 않고 청크 단위로 전달"""
+
+    def __init__(self, app, client: Tuple[str, int] = ("127.0.0.1", 123), buffer_size: int = 64):
+        self.app = app
+        self.client = client
+        self.buffer_size = buffer_size
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timeouts = request.extensions.get("timeout", {})
+        read_timeout = timeouts.get("read")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": request.method,
+            "headers": [(name.lower(), value) for name, value in request.headers.raw],
+            "scheme": request.url.scheme,
+            "path": unquote(request.url.path),
+            "raw_path": request.url.raw_path.split(b"?")[0],
+            "query_string": request.url.query,
+            "server": (request.url.host, request.url.port),
+            "client": self.client,
+            "root_path": "",
+        }
+        request_body = request.stream.__aiter__()
+        request_complete = False
+        started = asyncio.Event()
+        closed = asyncio.Event()
+        # 본문 큐가 차면 앱의 send()가 대기 (호출자가 읽는 속도에 맞춤)
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_size)
+        response: Dict[str, Any] = {"status": 500, "headers": [], "ended": False}
+
+        async def receive():
+            nonlocal request_complete
+            if request_complete:
+                await closed.wait()
+                return {"type": "http.disconnect"}
+            try:
+                body = await request_body.__anext__()
+            except StopAsyncIteration:
+                request_complete = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            return {"type": "http.request", "body": body, "more_body": True}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = message.get("headers", [])
+                started.set()
+            elif message["type"] == "http.response.body" and not response["ended"]:
+                body = message.get("body", b"")
+                if body:
+                    await chunks.put(body)
+                if not message.get("more_body", False):
+                    response["ended"] = True
+                    await chunks.put(None)
+
+        async def run():
+            try:
+                await self.app(scope, receive, send)
+            except Exception as e:
+                logger.error(f"🚨 프로세스 내부 서비스 처리 중 오류: {e}", exc_info=True)
+                if not started.is_set():
+                    response["status"], response["headers"] = 500, [(b"content-type", b"text/plain")]
+                    await chunks.put(b"Internal Server Error")
+            finally:
+                started.set()
+                if not response["ended"]:
+                    response["ended"] = True
+                    await chunks.put(None)
+
+        task = asyncio.ensure_future(run())
+        try:
+            await asyncio.wait_for(started.wait(), read_timeout)
+        except asyncio.TimeoutError:
+            closed.set()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            raise httpx.ReadTimeout("Timed out waiting for in-process response", request=request)
+        except BaseException:
+            task.cancel()
+            raise
+        return httpx.Response(
+            response["status"],
+            headers=response["headers"],
+            stream=_ASGIResponseStream(chunks, task, closed, read_timeout),
+            request=request,
+        )
+
+
+class _HostDispatchTransport(httpx.AsyncBaseTransport):
+    """*.colocated 호스트는 프로세스 내부 앱으로, 나머지는 일반 HTTP로 (헬스체커용)"""
+
+    def __init__(self, apps: Dict[str, httpx.AsyncBaseTransport]):
+        self.apps = apps
+        self.fallback = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        transport = self.apps.get(request.url.host, self.fallback)
+        return await transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.fallback.aclose()
+
+
+class ColocatedServices:
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        services: Optional[List[str]] = None,
+        root: Optional[str] = None,
+    ):
+        self.enabled = COLOCATED_ENABLED if enabled is None else enabled
+        if services is None:
+            raw = os.getenv("GATEWAY_COLOCATED_SERVICES", "")
+            services = [s.strip().lower() for s in raw.split(",") if s.strip()] or [s.value for s in SERVICE_DIRECTORIES]
+        self.services = services
+        self.root = Path(root or os.getenv("GATEWAY_SERVICES_DIR") or DEFAULT_SERVICES_DIR)
+        # 서비스 → 마운트된 ASGI 앱 / 원본 FastAPI 앱
+        self.apps: Dict[str, Any] = {}
+        self._service_apps: Dict[str, Any] = {}
+        self._lifespans: Dict[str, Any] = {}
+        self.failed: Dict[str, str] = {}
+        self.load_ms: Dict[str, float] = {}
+
+    @staticmethod
+    def _mount(service: str, service_app):
+        """라우트에 /v1/{service} 접두사가 없으면 접두사 경로와 루트 양쪽에 마운트"""
+        prefix = f"/v1/{service}"
+        if any(getattr(route, "path", "").startswith(prefix) for route in getattr(service_app, "routes", [])):
+            return service_app
+        return Router(routes=[Mount(prefix, app=service_app), Mount("", app=service_app)])
+
+    def _import(self, service: str, directory: Path):
+        package = service_package(service)
+        if _finder not in sys.meta_path:
+            sys.meta_path.insert(0, _finder)
+        _forget_package(package)
+        _finder.roots[package] = directory
+        root = ModuleType(package)
+        root.__path__ = [str(directory)]
+        sys.modules[package] = root
+        importlib.invalidate_caches()
+        try:
+            return importlib.import_module(f"{package}.app.main").app
+        except BaseException:
+            _forget_package(package)
+            del _finder.roots[package]
+            raise
+
+    def load(self) -> None:
+        """설정된 서비스 앱 import (실패한 서비스는 HTTP 호출 유지)"""
+        for service_type, dirname in SERVICE_DIRECTORIES.items():
+            service = service_type.value
+            if service not in self.services or service in self.apps:
+                continue
+            directory = self.root / dirname
+            started = time.perf_counter()
+            try:
+                if not (directory / "app" / "main.py").exists():
+                    raise FileNotFoundError(f"{directory}/app/main.py not found")
+                service_app = self._import(service, directory)
+            except Exception as e:
+                self.failed[service] = f"{type(e).__name__}: {e}"
+                logger.error(f"❌ {service} 서비스 앱 로드 실패 → HTTP 호출 유지: {e}")
+                continue
+            self._service_apps[service] = service_app
+            self.apps[service] = self._mount(service, service_app)
+            self.load_ms[service] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"📦 {service} 서비스 앱 로드 ({directory.name}, {self.load_ms[service]}ms)")
+
+    async def start(self) -> None:
+        """서비스별 lifespan(startup 훅) 실행 후 라우팅 테이블을 프로세스 내부 주소로 교체"""
+        for service in list(self.apps):
+            service_app = self._service_apps[service]
+            lifespan = service_app.router.lifespan_context(service_app)
+            try:
+                await lifespan.__aenter__()
+            except Exception as e:
+                self.failed[service] = f"startup: {type(e).__name__}: {e}"
+                del self.apps[service]
+                logger.error(f"❌ {service} 서비스 시작 실패 → HTTP 호출 유지: {e}")
+                continue
+            self._lifespans[service] = lifespan
+        _install_route_table(self.apply_routes(get_route_table()))
+        if self.apps:
+            logger.info(f"🏠 단일 프로세스 모드: {', '.join(self.apps)} 서비스를 프로세스 내부에서 호출")
+
+    async def stop(self) -> None:
+        for service in reversed(list(self._lifespans)):
+            lifespan = self._lifespans.pop(service)
+            try:
+                await lifespan.__aexit__(None, None, None)
+            except Exception as e:
+                logger.warning(f"⚠️ {service} 서비스 종료 중 오류: {e}")
+
+    def apply_routes(self, table: RouteTable) -> RouteTable:
+        """프로세스 내부 서비스의 레플리카를 내부 주소 하나로 대체한 라우팅 테이블"""
+        routes = dict(table)
+        for service_type, route in table.items():
+            if service_type.value in self.apps:
+                routes[service_type] = dataclasses.replace(
+                    route, replicas=(ReplicaSpec(colocated_url(service_type.value)),), http_version=None
+                )
+        return routes
+
+    def transport_for(self, service_type) -> Optional[httpx.AsyncBaseTransport]:
+        """client_registry.transport_factory: 프로세스 내부 서비스만 ASGI 전송, 나머지는 None(기본 전송)"""
+        service_app = self.apps.get(str(getattr(service_type, "value", service_type)))
+        return ASGIStreamingTransport(service_app) if service_app is not None else None
+
+    def health_transport(self) -> httpx.AsyncBaseTransport:
+        return _HostDispatchTransport({
+            f"{service}.colocated": ASGIStreamingTransport(service_app) for service, service_app in self.apps.items()
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "services": sorted(self.apps),
+            "failed": dict(self.failed),
+            "load_ms": dict(self.load_ms),
+            "root": str(self.root),
+        }
+
+
+# 게이트웨이 전역 단일 프로세스 서비스 모음 (GATEWAY_COLOCATED=true일 때만 로드)
+colocated_services = ColocatedServices()
@@ -0,0 +1,302 @@
+"""
+업스트림 서비스별 적응형 동시성 제한 + 부하 차단(load shedding)
+
+서비스마다 동시에 처리 중인 업스트림 요청 수를 AIMD로 조절한다.
+- 지연이 기준(장기 평균 × 허용 배수) 이내면 limit을 천천히 늘리고(additive increase)
+- 지연이 급증하거나 5xx/연결 오류가 나면 limit을 줄인다(multiplicative decrease)
+
+limit을 넘는 요청은 우선순위 대기열(크기 제한)에서 잠깐 기다리고,
+대기열이 차거나 대기 시간이 지나면 즉시 503 + Retry-After로 차단한다.
+게이트웨이 전체 동시 요청 수도 상한을 두어 리포트 생성 폭주가 다른 서비스까지 막지 않게 한다.
+
+우선순위 (숫자가 작을수록 높음)
+- critical: 로그인/회원가입 등 사용자 진입 경로
+- normal: 일반 요청
+- bulk: 리포트 생성처럼 무겁고 미뤄도 되는 요청
+우선순위가 낮을수록 limit의 일부(PRIORITY_SHARES)까지만 쓸 수 있어 과부하 시 먼저 차단된다.
+"""
+from enum import IntEnum
+from typing import Dict, List, Optional
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+import logging
+
+logger = logging.getLogger("gateway_api")
+
+
+class Priority(IntEnum):
+    critical = 0
+    normal = 1
+    bulk = 2
+
+
+# 우선순위별로 사용할 수 있는 limit 비율
+PRIORITY_SHARES: Dict[Priority, float] = {
+    Priority.critical: 1.0,
+    Priority.normal: 0.9,
+    Priority.bulk: float(os.getenv("GATEWAY_CONCURRENCY_BULK_SHARE", 0.7)),
+}
+
+# 기본 우선순위 규칙: "{service}/{경로 끝부분}"
+DEFAULT_PRIORITY_RULES: Dict[str, Priority] = {
+    "auth/login": Priority.critical,
+    "auth/signup": Priority.critical,
+    "grireport/generate": Priority.bulk,
+    "tcfdreport/generate": Priority.bulk,
+}
+
+
+def parse_priority_rules(raw: str) -> Dict[str, Priority]:
+    """"auth/login=critical,grireport/generate=bulk" 형식 파싱"""
+    rules = {}
+    for item in raw.split(","):
+        route, _, name = item.partition("=")
+        route = route.strip().strip("/")
+        if not route or not name.strip():
+            continue
+        try:
+            rules[route] = Priority[name.strip().lower()]
+        except KeyError:
+            logger.warning(f"⚠️ 잘못된 우선순위 설정 무시: {item}")
+    return rules
+
+
+PRIORITY_RULES = {**DEFAULT_PRIORITY_RULES, **parse_priority_rules(os.getenv("GATEWAY_PRIORITY_RULES", ""))}
+
+
+def classify_priority(service: str, path: str) -> Priority:
+    """게이트웨이 경로(login, v1/auth/login 등) 끝부분으로 우선순위 판정"""
+    path = path.strip("/")
+    for route, priority in PRIORITY_RULES.items():
+        rule_service, _, suffix = route.partition("/")
+        if rule_service != service:
+            continue
+        if not suffix or path == suffix or path.endswith("/" + suffix):
+            return priority
+    return Priority.normal
+
+
+class ConcurrencyLimitExceeded(Exception):
+    def __init__(self, name: str, retry_after: float, reason: str):
+        super().__init__(f"Concurrency limit exceeded for {name} ({reason})")
+        self.name = name
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "future", "granted", "cancelled")
+
+    def __init__(self, priority: Priority, seq: int, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.future = future
+        self.granted = False
+        self.cancelled = False
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class AdaptiveLimiter:
+    # 장기 평균 지연 EWMA 계수 / 감소 배수
+    RTT_ALPHA = 0.05
+    BACKOFF_RATIO = 0.9
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        queue_timeout: Optional[float] = None,
+        latency_tolerance: Optional[float] = None,
+    ):
+        self.name = name
+        self.min_limit = min_limit or int(os.getenv("GATEWAY_CONCURRENCY_MIN", 4))
+        self.max_limit = max_limit or int(os.getenv("GATEWAY_CONCURRENCY_MAX", 200))
+        self.limit = float(initial_limit or int(os.getenv("GATEWAY_CONCURRENCY_INITIAL", 50)))
+        self.limit = min(max(self.limit, self.min_limit), self.max_limit)
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("GATEWAY_CONCURRENCY_QUEUE", 50))
+        self.queue_timeout = queue_timeout or float(os.getenv("GATEWAY_CONCURRENCY_QUEUE_TIMEOUT", 1.0))
+        self.latency_tolerance = latency_tolerance or float(os.getenv("GATEWAY_CONCURRENCY_LATENCY_TOLERANCE", 2.0))
+
+        self.in_flight = 0
+        self.long_rtt = 0.0
+        self._samples = 0
+        self._last_decrease = 0.0
+        self._queue: List[_Waiter] = []
+        self._queued = 0
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.shed: Dict[str, int] = {p.name: 0 for p in Priority}
+
+    def _capacity(self, priority: Priority) -> float:
+        return self.limit * PRIORITY_SHARES[priority]
+
+    def _top(self) -> Optional[_Waiter]:
+        while self._queue and self._queue[0].cancelled:
+            heapq.heappop(self._queue)
+        return self._queue[0] if self._queue else None
+
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.long_rtt))
+
+    def _reject(self, priority: Priority, reason: str) -> ConcurrencyLimitExceeded:
+        self.shed[priority.name] += 1
+        return ConcurrencyLimitExceeded(self.name, self.retry_after(), reason)
+
+    async def acquire(self, priority: Priority = Priority.normal) -> None:
+        """슬롯 확보. 대기열이 차거나 대기 시간이 지나면 ConcurrencyLimitExceeded"""
+        top = self._top()
+        if self.in_flight < self._capacity(priority) and (top is None or top.priority > priority):
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self._queued >= self.max_queue:
+            # 대기열이 가득 차면 가장 낮은 우선순위(그중 최신) 대기 요청을 밀어냄
+            worst = max((w for w in self._queue if not w.cancelled), default=None)
+            if worst is None or worst.priority <= priority:
+                raise self._reject(priority, "queue full")
+            worst.cancelled = True
+            self._queued -= 1
+            worst.future.set_exception(self._reject(worst.priority, "preempted"))
+
+        waiter = _Waiter(priority, next(self._seq), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, waiter)
+        self._queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not waiter.granted:
+                if not waiter.cancelled:
+                    waiter.cancelled = True
+                    self._queued -= 1
+                    raise self._reject(priority, "queue timeout")
+                # 밀려난 경우 future에 담긴 예외를 그대로 전달
+                raise waiter.future.exception()
+        except asyncio.CancelledError:
+            if waiter.granted:
+                self._release_slot()
+            elif not waiter.cancelled:
+                waiter.cancelled = True
+                self._queued -= 1
+            raise
+
+    def _release_slot(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        """우선순위 순으로 여유 슬롯만큼 대기 요청 깨우기"""
+        while True:
+            top = self._top()
+            if top is None or self.in_flight >= self._capacity(top.priority):
+                return
+            heapq.heappop(self._queue)
+            self._queued -= 1
+            top.granted = True
+            self.in_flight += 1
+            self.admitted += 1
+            top.future.set_result(None)
+
+    def release(self, success: bool, latency: Optional[float]) -> None:
+        """호출 종료. latency가 None이면(취소 등) limit 조절 없이 슬롯만 반환"""
+        if latency is not None:
+            self._adjust(success, latency)
+        self._release_slot()
+
+    def _adjust(self, success: bool, latency: float) -> None:
+        overloaded = not success or (
+            self._samples >= 10 and latency > self.long_rtt * self.latency_tolerance
+        )
+        if success:
+            self._samples += 1
+            if self.long_rtt == 0.0:
+                self.long_rtt = latency
+            else:
+                self.long_rtt += self.RTT_ALPHA * (latency - self.long_rtt)
+
+        now = time.monotonic()
+        if overloaded:
+            # 한 번의 과부하 구간에 연속으로 줄이지 않도록 평균 지연만큼 간격을 둠
+            if now - self._last_decrease >= max(self.long_rtt, 0.05):
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.BACKOFF_RATIO)
+        elif self.in_flight >= self.limit / 2:
+            # 실제로 limit 가까이 쓰고 있을 때만 증가 (한 RTT에 약 +1)
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self._queued,
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "long_rtt_ms": round(self.long_rtt * 1000, 2),
+        }
+
+
+class GlobalLimit:
+    """게이트웨이 전체 동시 요청 상한 (대기 없이 즉시 차단, 우선순위별 비율 적용)"""
+
+    def __init__(self, max_in_flight: Optional[int] = None):
+        self.max_in_flight = max_in_flight or int(os.getenv("GATEWAY_MAX_IN_FLIGHT", 500))
+        self.in_flight = 0
+        self.shed: Dict[str, int] = {p.name: 0 for p in Priority}
+
+    def acquire(self, priority: Priority) -> None:
+        if self.in_flight >= self.max_in_flight * PRIORITY_SHARES[priority]:
+            self.shed[priority.name] += 1
+            raise ConcurrencyLimitExceeded("gateway", 1, "gateway overloaded")
+        self.in_flight += 1
+
+    def release(self) -> None:
+        self.in_flight = max(0, self.in_flight - 1)
+
+    def snapshot(self) -> Dict[str, object]:
+        return {"max_in_flight": self.max_in_flight, "in_flight": self.in_flight, "shed": dict(self.shed)}
+
+
+class ConcurrencyLimiterRegistry:
+    def __init__(self):
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+        self.global_limit = GlobalLimit()
+
+    def get(self, name: str) -> AdaptiveLimiter:
+        limiter = self._limiters.get(name)
+        if limiter is None:
+            limiter = self._limiters[name] = AdaptiveLimiter(name)
+        return limiter
+
+    async def acquire(self, name: str, priority: Priority) -> AdaptiveLimiter:
+        """전체 상한 → 서비스 limiter 순으로 슬롯 확보"""
+        self.global_limit.acquire(priority)
+        limiter = self.get(name)
+        try:
+            await limiter.acquire(priority)
+        except BaseException:
+            self.global_limit.release()
+            raise
+        return limiter
+
+    def release(self, limiter: AdaptiveLimiter, success: bool, latency: Optional[float]) -> None:
+        limiter.release(success, latency)
+        self.global_limit.release()
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "gateway": self.global_limit.snapshot(),
+            "services": {name: limiter.snapshot() for name, limiter in self._limiters.items()},
+        }
+
+
+# 게이트웨이 전역 동시성 제한기 (키: ServiceType 값)
+concurrency_limiters = ConcurrencyLimiterRegistry()
@@ -0,0 +1,228 @@
+"""
+서비스별 멀티 레플리카 로드밸런서
+
+{SERVICE}_SERVICE_URL에 레플리카 URL을 콤마로 여러 개 지정하면(가중치는 "url|3")
+정책에 따라 레플리카를 고른다. 레플리카별 처리 중 요청 수와 지연(EWMA)을 추적해
+느린 레플리카에는 부하를 덜 보내고, 연속 실패한 레플리카는 일정 시간 제외(outlier ejection)한다.
+헬스체크에서 모든 레플리카가 비정상이면(레플리카가 하나뿐인 경우 포함) 업스트림을 기다리지 않고 NoHealthyReplica.
+
+정책({SERVICE}_LB_POLICY)
+- p2c: 무작위 두 레플리카 중 (처리 중 요청 수 + 1) × 지연이 작은 쪽 (기본값)
+- least_outstanding: 처리 중 요청 수가 가장 적은 레플리카
+- weighted: 가중치 비례 무작위
+- sticky: 세션 키 기반 rendezvous 해싱 (chatbot 기본값)
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+import hashlib
+import os
+import random
+import time
+import logging
+
+logger = logging.getLogger("gateway_api")
+
+LB_POLICIES = ("p2c", "least_outstanding", "weighted", "sticky")
+DEFAULT_POLICIES = {"chatbot": "sticky"}
+STICKY_HEADER = os.getenv("GATEWAY_LB_STICKY_HEADER", "x-session-id").lower()
+# 정상 레플리카가 없을 때 Retry-After (다음 헬스체크 주기)
+HEALTH_RETRY_AFTER = float(os.getenv("GATEWAY_HEALTH_INTERVAL", 10))
+
+
+@dataclass(frozen=True)
+class ReplicaSpec:
+    url: str
+    weight: float = 1.0
+
+
+def parse_replicas(raw: str) -> Tuple[ReplicaSpec, ...]:
+    """"http://a:8008|2,http://b:8008" → (ReplicaSpec(a, 2), ReplicaSpec(b, 1))"""
+    specs = []
+    for item in raw.split(","):
+        url, _, weight = item.strip().partition("|")
+        url = url.strip().rstrip("/")
+        if not url:
+            continue
+        try:
+            specs.append(ReplicaSpec(url, max(float(weight), 0.0) if weight.strip() else 1.0))
+        except ValueError:
+            logger.warning(f"⚠️ 잘못된 레플리카 가중치 무시: {item}")
+            specs.append(ReplicaSpec(url))
+    return tuple(specs)
+
+
+class NoHealthyReplica(LookupError):
+    """헬스체크 기준 정상 레플리카가 없음 (호출하지 않고 503)"""
+
+    def __init__(self, name: str, retry_after: float = HEALTH_RETRY_AFTER):
+        super().__init__(f"No healthy replicas for {name}")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class Replica:
+    """레플리카 하나의 런타임 상태"""
+
+    EWMA_ALPHA = 0.3
+    # 실패한 호출은 빠르게 끝나도(연결 거부 등) 이 지연으로 간주해 선택 확률을 낮춤
+    FAILURE_PENALTY = 1.0
+
+    def __init__(self, url: str, weight: float = 1.0):
+        self.url = url
+        self.weight = weight
+        self.in_flight = 0
+        self.ewma_latency = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        # 액티브 헬스체크 결과 (헬스체커가 갱신)
+        self.healthy = True
+
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.ejected_until and self.weight > 0
+
+    def cost(self) -> float:
+        # 측정 전 레플리카는 1ms로 간주해 먼저 시도되도록 함
+        return (self.in_flight + 1) * max(self.ewma_latency, 0.001)
+
+    def snapshot(self, now: float) -> Dict[str, object]:
+        return {
+            "url": self.url,
+            "weight": self.weight,
+            "healthy": self.healthy,
+            "ejected": now < self.ejected_until,
+            "in_flight": self.in_flight,
+            "ewma_latency_ms": round(self.ewma_latency * 1000, 2),
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class LoadBalancer:
+    def __init__(
+        self,
+        name: str,
+        policy: str = "p2c",
+        eject_after_failures: Optional[int] = None,
+        eject_seconds: Optional[float] = None,
+    ):
+        if policy not in LB_POLICIES:
+            logger.warning(f"⚠️ 알 수 없는 LB 정책 '{policy}' → p2c 사용 ({name})")
+            policy = "p2c"
+        self.name = name
+        self.policy = policy
+        self.eject_after_failures = eject_after_failures or int(os.getenv("GATEWAY_LB_EJECT_AFTER_FAILURES", 5))
+        self.eject_seconds = eject_seconds or float(os.getenv("GATEWAY_LB_EJECT_SECONDS", 30))
+        self.replicas: List[Replica] = []
+
+    def sync(self, specs: Iterable[ReplicaSpec]) -> None:
+        """레플리카 목록 갱신 (기존 레플리카의 통계는 URL 기준으로 유지)"""
+        current = {replica.url: replica for replica in self.replicas}
+        replicas = []
+        for spec in specs:
+            replica = current.get(spec.url) or Replica(spec.url, spec.weight)
+            replica.weight = spec.weight
+            replicas.append(replica)
+        # 리스트 자체를 교체해 선택 중인 요청과 충돌하지 않도록 함
+        self.replicas = replicas
+
+    def sticky_key(self, headers: Optional[Mapping[str, str]]) -> Optional[str]:
+        if self.policy != "sticky" or not headers:
+            return None
+        return headers.get(STICKY_HEADER) or headers.get("authorization") or headers.get("cookie")
+
+    def choose(self, sticky_key: Optional[str] = None) -> Replica:
+        replicas = self.replicas
+        if not replicas:
+            raise LookupError(f"No replicas configured for {self.name}")
+
+        now = time.monotonic()
+        candidates = [r for r in replicas if r.available(now)]
+        if not candidates:
+            healthy = [r for r in replicas if r.healthy]
+            if not healthy:
+                # 헬스체크상 모두 비정상 → 타임아웃까지 기다리지 않고 바로 실패
+                raise NoHealthyReplica(self.name)
+            # 정상이지만 전부 제외(ejection)된 경우에도 요청은 보내야 하므로 정상 레플리카 전체에서 선택
+            candidates = [r for r in healthy if r.weight > 0] or healthy
+        if len(candidates) == 1:
+            return candidates[0]
+
+        if self.policy == "sticky" and sticky_key:
+            return self._rendezvous(candidates, sticky_key)
+        if self.policy == "least_outstanding":
+            return min(candidates, key=lambda r: (r.in_flight, r.ewma_latency))
+        if self.policy == "weighted" and any(r.weight > 0 for r in candidates):
+            return random.choices(candidates, weights=[r.weight for r in candidates])[0]
+        a, b = random.sample(candidates, 2)
+        # 가중치가 클수록 비용을 낮게 봄
+        return a if a.cost() / max(a.weight, 1e-6) <= b.cost() / max(b.weight, 1e-6) else b
+
+    @staticmethod
+    def _rendezvous(candidates: List[Replica], key: str) -> Replica:
+        """레플리카 구성이 바뀌어도 대부분의 세션이 같은 레플리카에 남는 HRW 해싱"""
+        def score(replica: Replica) -> float:
+            digest = hashlib.blake2b(f"{key}|{replica.url}".encode(), digest_size=8).digest()
+            return replica.weight * (int.from_bytes(digest, "big") + 1)
+        return max(candidates, key=score)
+
+    def start(self, replica: Replica) -> None:
+        replica.in_flight += 1
+        replica.requests += 1
+
+    def finish(self, replica: Replica, success: bool, latency: Optional[float]) -> None:
+        replica.in_flight = max(0, replica.in_flight - 1)
+        if latency is not None and not success:
+            latency = max(latency, Replica.FAILURE_PENALTY)
+        if latency is not None:
+            if replica.ewma_latency == 0.0:
+                replica.ewma_latency = latency
+            else:
+                replica.ewma_latency += Replica.EWMA_ALPHA * (latency - replica.ewma_latency)
+        if success:
+            replica.consecutive_failures = 0
+            return
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.eject_after_failures and len(self.replicas) > 1:
+            # 제외될 때마다 제외 시간을 늘림 (최대 10배)
+            replica.ejections += 1
+            duration = self.eject_seconds * min(replica.ejections, 10)
+            replica.ejected_until = time.monotonic() + duration
+            replica.consecutive_failures = 0
+            logger.warning(f"🚫 [{self.name}] 레플리카 제외 {duration:.0f}s: {replica.url}")
+
+    def snapshot(self) -> Dict[str, object]:
+        now = time.monotonic()
+        return {
+            "policy": self.policy,
+            "replicas": [replica.snapshot(now) for replica in self.replicas],
+        }
+
+
+class LoadBalancerRegistry:
+    def __init__(self):
+        self._balancers: Dict[str, LoadBalancer] = {}
+
+    def sync(self, replicas_by_service: Mapping[str, Iterable[ReplicaSpec]]) -> None:
+        for name, specs in replicas_by_service.items():
+            balancer = self._balancers.get(name)
+            if balancer is None:
+                policy = os.getenv(f"{name.upper()}_LB_POLICY", DEFAULT_POLICIES.get(name, "p2c")).lower()
+                balancer = self._balancers[name] = LoadBalancer(name, policy)
+            balancer.sync(specs)
+
+    def get(self, name: str) -> Optional[LoadBalancer]:
+        return self._balancers.get(name)
+
+    def items(self):
+        return self._balancers.items()
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {name: balancer.snapshot() for name, balancer in self._balancers.items()}
+
+
+# 게이트웨이 전역 로드밸런서 (라우팅 테이블 컴파일 시 동기화)
+load_balancers = LoadBalancerRegistry()
@@ -0,0 +1,258 @@
+"""
+트래픽 미러링 (섀도 업스트림으로 요청 복제)
+
+tcfd/auth 새 빌드를 배포하기 전에 실제 트래픽으로 지연/응답 차이를 보기 위해
+서비스별로 일부(표본) 요청을 섀도 업스트림에 한 번 더 보낸다.
+- 원 요청의 응답을 클라이언트에 보낸 뒤(BackgroundTask) 크기가 제한된 큐에 넣기만 하고,
+  큐가 가득 차면 버림 → 원 요청 경로는 느려지지 않음
+- 섀도 호출은 전용 워커와 전용 커넥션 풀로 수행 (서비스 풀/동시성 제한/서킷 브레이커와 분리)
+- 섀도 응답은 클라이언트에 전달하지 않고 원 응답과 상태 코드/본문(JSON은 키 순서 무시)을 비교해 기록
+- 섀도 요청에는 X-Shadow-Request: true 헤더를 붙이며, 부작용이 있는 메서드는 GATEWAY_MIRROR_METHODS로 명시해야 복제
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+import logging
+
+import httpx
+
+from app.common.utility.metrics import metrics
+from app.domain.model.timeout_budget import TIMEOUT_HEADER
+
+logger = logging.getLogger("gateway_api")
+
+SHADOW_HEADER = "x-shadow-request"
+
+# 섀도 업스트림에 전달하지 않는 요청 헤더
+_DROPPED_HEADERS = {
+    "host", "content-length", "transfer-encoding", "connection", "keep-alive", "accept-encoding", TIMEOUT_HEADER,
+}
+
+
+def parse_mirror_targets(raw: str) -> Dict[str, Tuple[str, float]]:
+    """"tcfd=http://tcfd-canary:8005|0.1,auth=http://auth-v2:8008" → {서비스: (URL, 표본 비율)} (비율 기본 1.0)"""
+    targets = {}
+    for item in raw.split(","):
+        service, _, target = item.partition("=")
+        url, _, fraction = target.strip().partition("|")
+        service, url = service.strip().lower(), url.strip().rstrip("/")
+        if not service or not url:
+            continue
+        try:
+            ratio = min(max(float(fraction), 0.0), 1.0) if fraction.strip() else 1.0
+        except ValueError:
+            logger.warning(f"⚠️ 잘못된 미러링 비율 무시: {item}")
+            ratio = 1.0
+        targets[service] = (url, ratio)
+    return targets
+
+
+@dataclass
+class MirrorJob:
+    service: str
+    method: str
+    path: str
+    params: List[Tuple[str, str]]
+    headers: Dict[str, str]
+    body: Optional[bytes]
+    primary_status: int
+    primary_body: bytes
+    primary_content_type: str
+    primary_latency: float
+
+
+def _normalize(body: bytes, content_type: str) -> Any:
+    """비교용 본문: JSON은 파싱한 값(키 순서 무관), 그 외는 해시"""
+    if "json" in content_type:
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class LatencyWindow:
+    """최근 지연 시간 표본 (백분위 계산용)"""
+
+    def __init__(self, size: int = 1000):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, value: float) -> None:
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return round(ordered[min(int(len(ordered) * q), len(ordered) - 1)] * 1000, 2)
+
+
+class TrafficMirror:
+    def __init__(
+        self,
+        targets: Optional[Dict[str, Tuple[str, float]]] = None,
+        methods: Optional[str] = None,
+        queue_size: Optional[int] = None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_connections: Optional[int] = None,
+        max_body_bytes: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.targets = targets if targets is not None else parse_mirror_targets(os.getenv("GATEWAY_MIRROR_TARGETS", ""))
+        # 기본은 읽기 요청만 복제 (POST 등은 섀도 서비스에서 데이터가 두 번 쓰일 수 있으므로 명시적으로 켬)
+        self.methods = {
+            m.strip().upper() for m in (methods or os.getenv("GATEWAY_MIRROR_METHODS", "GET")).split(",") if m.strip()
+        }
+        self.queue_size = queue_size or int(os.getenv("GATEWAY_MIRROR_QUEUE", 1000))
+        self.workers = workers or int(os.getenv("GATEWAY_MIRROR_WORKERS", 4))
+        self.timeout = timeout or float(os.getenv("GATEWAY_MIRROR_TIMEOUT", 10))
+        self.max_connections = max_connections or int(os.getenv("GATEWAY_MIRROR_MAX_CONNECTIONS", 20))
+        # 이보다 큰 요청/응답 본문은 복제하지 않음 (큐 메모리 상한)
+        self.max_body_bytes = max_body_bytes or int(os.getenv("GATEWAY_MIRROR_MAX_BODY_BYTES", 1024 * 1024))
+        # 섀도 클라이언트 전송 계층 (None이면 httpx 기본, 테스트에서는 MockTransport)
+        self.transport = transport
+        self._queue: Optional[asyncio.Queue] = None
+        self._client: Optional[httpx.AsyncClient] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._latency: Dict[Tuple[str, str], LatencyWindow] = {}
+        self.recent_diffs: Deque[Dict[str, Any]] = deque(maxlen=50)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.targets)
+
+    def wants(self, service: str, method: str) -> bool:
+        """표본 추출: 이 요청을 섀도로 복제할지 (큐가 없으면 항상 False)"""
+        target = self.targets.get(service)
+        return (
+            self._queue is not None
+            and target is not None
+            and method.upper() in self.methods
+            and random.random() < target[1]
+        )
+
+    def _count(self, service: str, name: str) -> None:
+        counts = self._stats.setdefault(
+            service, {"queued": 0, "dropped": 0, "mirrored": 0, "errors": 0, "status_diffs": 0, "body_diffs": 0}
+        )
+        counts[name] += 1
+
+    async def submit(self, job: MirrorJob) -> None:
+        """원 응답 전송 후(BackgroundTask) 호출. 큐가 가득 차면 기다리지 않고 버림"""
+        if self._queue is None:
+            return
+        if len(job.primary_body) > self.max_body_bytes or len(job.body or b"") > self.max_body_bytes:
+            return
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._count(job.service, "dropped")
+            metrics.mirror_requests.inc(job.service, "dropped")
+            return
+        self._count(job.service, "queued")
+
+    async def start(self) -> None:
+        if not self.enabled or self._queue is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        # 서비스 요청용 풀과 분리된 전용 클라이언트 (섀도가 느려도 원 요청의 커넥션을 차지하지 않음)
+        self._client = httpx.AsyncClient(
+            transport=self.transport,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+        )
+        self._tasks = [asyncio.get_running_loop().create_task(self._worker()) for _ in range(self.workers)]
+        targets = ", ".join(f"{service}→{url} ({ratio:.0%})" for service, (url, ratio) in self.targets.items())
+        logger.info(f"🪞 트래픽 미러링 시작: {targets}, methods={','.join(sorted(self.methods))}")
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._queue = None
+        client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+            logger.info("🪞 트래픽 미러링 종료")
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._mirror(job)
+            except Exception as e:
+                logger.warning(f"⚠️ 미러링 처리 중 오류: {e}")
+
+    async def _mirror(self, job: MirrorJob) -> None:
+        url, _ = self.targets[job.service]
+        headers = {k: v for k, v in job.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        headers[SHADOW_HEADER] = "true"
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(
+                job.method, f"{url}{job.path}", params=job.params, headers=headers, content=job.body
+            )
+        except httpx.HTTPError as e:
+            self._count(job.service, "errors")
+            metrics.observe_mirror(job.service, job.primary_latency, None, False, False)
+            logger.debug(f"🪞 [{job.service}] 섀도 호출 실패: {job.method} {job.path} ({type(e).__name__})")
+            return
+        shadow_latency = time.perf_counter() - started
+
+        status_diff = response.status_code != job.primary_status
+        body_diff = not status_diff and (
+            _normalize(response.content, response.headers.get("content-type", ""))
+            != _normalize(job.primary_body, job.primary_content_type)
+        )
+        self._count(job.service, "mirrored")
+        self._latency.setdefault((job.service, "primary"), LatencyWindow()).add(job.primary_latency)
+        self._latency.setdefault((job.service, "shadow"), LatencyWindow()).add(shadow_latency)
+        metrics.observe_mirror(job.service, job.primary_latency, shadow_latency, status_diff, body_diff)
+        if status_diff or body_diff:
+            self._count(job.service, "status_diffs" if status_diff else "body_diffs")
+            self.recent_diffs.append({
+                "service": job.service,
+                "method": job.method,
+                "path": job.path,
+                "kind": "status" if status_diff else "body",
+                "primary_status": job.primary_status,
+                "shadow_status": response.status_code,
+                "primary_ms": round(job.primary_latency * 1000, 2),
+                "shadow_ms": round(shadow_latency * 1000, 2),
+                "at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        services = {}
+        for service, (url, ratio) in self.targets.items():
+            latency = {}
+            for target in ("primary", "shadow"):
+                window = self._latency.get((service, target))
+                latency[target] = {
+                    "p50_ms": window.percentile(0.5) if window else None,
+                    "p95_ms": window.percentile(0.95) if window else None,
+                    "p99_ms": window.percentile(0.99) if window else None,
+                }
+            services[service] = {"target": url, "sample_ratio": ratio, **self._stats.get(service, {}), "latency": latency}
+        return {
+            "enabled": self.enabled,
+            "running": self._queue is not None,
+            "methods": sorted(self.methods),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "services": services,
+            "recent_diffs": list(self.recent_diffs),
+        }
+
+
+# 게이트웨이 전역 트래픽 미러 (GATEWAY_MIRROR_TARGETS 설정 시 main.lifespan에서 start/stop)
+traffic_mirror = TrafficMirror()
@@ -0,0 +1,62 @@
+"""
+POST 프록시 라우트별 선택적 스키마 검증
+
+게이트웨이는 기본적으로 POST 본문을 파싱하지 않고 원본 바이트를 그대로 전달한다.
+GATEWAY_VALIDATE_POST_ROUTES에 지정된 라우트만 업스트림 호출 전에 스키마를 검증한다.
+"""
+from typing import Dict, Optional, Tuple, Type
+import json
+import os
+
+from fastapi import HTTPException
+from pydantic import BaseModel, Field, ValidationError
+
+from app.domain.model.service_factory import ServiceType
+
+
+# ========= auth-service 입력 스키마 (auth-service user_schema.py와 동일) =========
+class SignupIn(BaseModel):
+    id: Optional[int] = Field(default=None)
+    company_id: Optional[str] = None
+    industry: Optional[str] = None
+    email: Optional[str] = None
+    name: Optional[str] = None
+    age: Optional[str] = None
+    auth_id: str = Field(..., min_length=3, max_length=64)
+    auth_pw: str = Field(..., min_length=4, max_length=128)
+
+
+class LoginIn(BaseModel):
+    auth_id: str = Field(..., min_length=3, max_length=64)
+    auth_pw: str = Field(..., min_length=4, max_length=128)
+
+
+# (서비스, 경로) → 검증 스키마
+POST_SCHEMAS: Dict[Tuple[ServiceType, str], Type[BaseModel]] = {
+    (ServiceType.auth, "login"): LoginIn,
+    (ServiceType.auth, "signup"): SignupIn,
+}
+
+# 검증을 켤 라우트 목록 (예: "auth/login,auth/signup")
+VALIDATED_POST_ROUTES = frozenset(
+    r.strip().strip("/") for r in os.getenv("GATEWAY_VALIDATE_POST_ROUTES", "").split(",") if r.strip()
+)
+
+
+def get_post_schema(service_type: ServiceType, path: str) -> Optional[Type[BaseModel]]:
+    """검증이 켜진 라우트면 스키마 반환, 아니면 None"""
+    route = path.strip("/")
+    if f"{service_type.value}/{route}" not in VALIDATED_POST_ROUTES:
+        return None
+    return POST_SCHEMAS.get((service_type, route))
+
+
+def validate_post_body(service_type: ServiceType, path: str, body: bytes) -> None:
+    """검증이 켜진 라우트면 본문을 스키마로 검증 (실패 시 422, 단일 POST와 배치 항목이 함께 사용)"""
+    schema = get_post_schema(service_type, path)
+    if schema is None:
+        return
+    try:
+        schema.model_validate_json(body)
+    except ValidationError as ve:
+        raise HTTPException(status_code=422, detail=json.loads(ve.json(include_url=False, include_input=False)))
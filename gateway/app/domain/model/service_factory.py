@@ -1,12 +1,28 @@
-from typing import Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Tuple, Union
 from enum import Enum
+import math
 import os
+import time
 import logging
 from fastapi import HTTPException
 import httpx
 
+from app.common.utility.access_log import add_timing, annotate
+from app.common.utility.tracing import get_tracer
+from app.domain.model.client_registry import client_registry, parse_http_version
+from app.domain.model.circuit_breaker import CircuitOpenError, circuit_breakers
+from app.domain.model.concurrency_limiter import ConcurrencyLimitExceeded, classify_priority, concurrency_limiters
+from app.domain.model.load_balancer import NoHealthyReplica, ReplicaSpec, load_balancers, parse_replicas
+from app.domain.model.timeout_budget import TIMEOUT_HEADER, timeout_budget_for
+
 logger = logging.getLogger("gateway_api")
 
+# Railway 프로덕션 환경 URL (기본값)
+DEFAULT_SERVICE_URL = "https://disciplined-imagination-production-df5c.up.railway.app"
+
 
 class ServiceType(str, Enum):
     chatbot = "chatbot"
@@ -16,132 +32,286 @@ class ServiceType(str, Enum):
     grireport = "grireport"
     tcfdreport = "tcfdreport"
     auth = "auth"
+    survey = "survey"
+
+
+@lru_cache(maxsize=4096)
+def rewrite_upstream_path(prefix: str, path: str) -> str:
+    """서비스별 업스트림 접두사(/v1/{service}) 자동 부착 (결과는 LRU 메모이즈)"""
+    path = "/" + path.lstrip("/")
+    if not prefix:
+        return path
+
+    # 이미 접두사가 포함된 경우(예: /v1/auth/...)는 중복 방지
+    if path == prefix or path.startswith(prefix + "/"):
+        return path
+
+    # /api/v1/auth/login → /v1/auth/login으로 변환
+    if path.startswith("/api/v1/"):
+        return path[4:]  # /api 제거
+
+    # /login → /v1/auth/login
+    return f"{prefix}{path}"
+
+
+@dataclass(frozen=True)
+class UpstreamRoute:
+    """서비스 하나의 업스트림 라우팅 정보 (불변)"""
+    service_type: ServiceType
+    replicas: Tuple[ReplicaSpec, ...]
+    prefix: str
+    # "1.1" / "h2" / "h2c" ({SERVICE}_SERVICE_HTTP_VERSION, 없으면 GATEWAY_UPSTREAM_HTTP_VERSION)
+    http_version: Optional[str] = None
+
+    @property
+    def base_url(self) -> str:
+        """대표(첫 번째) 레플리카 URL"""
+        return self.replicas[0].url if self.replicas else ""
+
+    def upstream_path(self, path: str) -> str:
+        return rewrite_upstream_path(self.prefix, path)
+
+
+RouteTable = Mapping[ServiceType, UpstreamRoute]
+
+
+def build_route_table() -> RouteTable:
+    """환경변수({SERVICE}_SERVICE_URL, 콤마로 여러 레플리카)를 한 번 읽어 불변 라우팅 테이블 생성"""
+    return MappingProxyType({
+        service_type: UpstreamRoute(
+            service_type=service_type,
+            replicas=parse_replicas(os.getenv(f"{service_type.name.upper()}_SERVICE_URL", DEFAULT_SERVICE_URL)),
+            prefix=f"/v1/{service_type.value}",
+            http_version=parse_http_version(os.getenv(f"{service_type.name.upper()}_SERVICE_HTTP_VERSION"), None),
+        )
+        for service_type in ServiceType
+    })
+
+
+_route_table: Optional[RouteTable] = None
+
+
+def _install_route_table(table: RouteTable) -> RouteTable:
+    global _route_table
+    _route_table = table
+    load_balancers.sync({service_type.value: route.replicas for service_type, route in table.items()})
+    client_registry.set_protocols({
+        service_type.value: route.http_version for service_type, route in table.items() if route.http_version
+    })
+    return table
+
+
+def get_route_table() -> RouteTable:
+    if _route_table is None:
+        return _install_route_table(build_route_table())
+    return _route_table
+
+
+def compile_route_table() -> RouteTable:
+    """게이트웨이 시작 시(.env 로드 후) 라우팅 테이블을 컴파일해 교체"""
+    _install_route_table(build_route_table())
+    env = "Railway" if os.getenv("RAILWAY_ENVIRONMENT") in ["true", "production"] else "로컬"
+    for route in _route_table.values():
+        urls = ", ".join(replica.url for replica in route.replicas)
+        protocol = client_registry.protocol_for(route.service_type)
+        logger.info(f"🗺️ [{env}] {route.service_type.value} → [{urls}]{route.prefix} (HTTP {protocol})")
+    return _route_table
 
 
 class ServiceProxyFactory:
+    _instances: Dict[ServiceType, "ServiceProxyFactory"] = {}
+
     def __init__(self, service_type: ServiceType):
         self.service_type = service_type
-        
-        # Railway 프로덕션 환경 URL 설정 (기본값)
-        self.base_urls = {
-            ServiceType.chatbot: os.getenv("CHATBOT_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-            ServiceType.gri: os.getenv("GRI_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-            ServiceType.materiality: os.getenv("MATERIALITY_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-            ServiceType.tcfd: os.getenv("TCFD_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-            ServiceType.grireport: os.getenv("GRIREPORT_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-            ServiceType.tcfdreport: os.getenv("TCFDREPORT_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-            ServiceType.auth: os.getenv("AUTH_SERVICE_URL", "https://disciplined-imagination-production-df5c.up.railway.app"),
-        }
-        
-        # Railway 환경 감지
-        self.is_railway = os.getenv("RAILWAY_ENVIRONMENT") in ["true", "production"]
-        if self.is_railway:
-            logger.info(f"🌐 Railway 환경에서 {service_type} 서비스 연결 시도")
-        else:
-            logger.info(f"💻 로컬 환경에서 {service_type} 서비스 연결 시도")
-        
-        logger.info(f"👩🏻 Service URL: {self.base_urls.get(service_type)}")
+
+    @classmethod
+    def for_service(cls, service_type: ServiceType) -> "ServiceProxyFactory":
+        """서비스별 싱글톤 팩토리 반환 (요청마다 생성하지 않음)"""
+        factory = cls._instances.get(service_type)
+        if factory is None:
+            factory = cls._instances[service_type] = cls(service_type)
+        return factory
+
+    @property
+    def route(self) -> UpstreamRoute:
+        return get_route_table()[self.service_type]
+
+    @property
+    def base_urls(self) -> Dict[ServiceType, str]:
+        return {service_type: route.base_url for service_type, route in get_route_table().items()}
 
     def upstream_path(self, path: str) -> str:
         """서비스별 업스트림 접두사(/v1/{service}) 자동 부착"""
-        path = "/" + path.lstrip("/")
-        prefixes = {
-            ServiceType.auth: "/v1/auth",
-            ServiceType.chatbot: "/v1/chatbot",
-            ServiceType.gri: "/v1/gri",
-            ServiceType.materiality: "/v1/materiality",
-            ServiceType.tcfd: "/v1/tcfd",
-            ServiceType.grireport: "/v1/grireport",
-            ServiceType.tcfdreport: "/v1/tcfdreport",
-        }
-        prefix = prefixes.get(self.service_type, "")
-        if not prefix:
-            return path
-        
-        # 이미 접두사가 포함된 경우(예: /v1/auth/...)는 중복 방지
-        if path == prefix or path.startswith(prefix + "/"):
-            return path
-        
-        # /api/v1/auth/login → /v1/auth/login으로 변환
-        if path.startswith("/api/v1/"):
-            return path[4:]  # /api 제거
-        
-        # auth 서비스의 경우 /login → /v1/auth/login으로 변환
-        if self.service_type == ServiceType.auth:
-            return f"/v1/auth{path}"  # /v1/auth + /login = /v1/auth/login
-        
-        return f"{prefix}{path}"
+        return self.route.upstream_path(path)
 
     async def request(
         self,
         method: str,
         path: str,
         headers: Optional[dict] = None,
-        body: Optional[bytes] = None,
-        files: Optional[dict] = None,
-        params: Optional[dict] = None,
+        body: Optional[Union[bytes, AsyncIterator[bytes]]] = None,
+        files: Optional[Union[dict, List[tuple]]] = None,
+        params: Optional[Union[dict, List[Tuple[str, str]]]] = None,
         data: Optional[dict] = None,
+        stream: bool = False,
+        timeout: Optional[float] = None,
+        stream_idle_timeout: Optional[float] = None,
     ) -> httpx.Response:
-        base_url = self.base_urls.get(self.service_type)
-        if not base_url:
+        route = get_route_table().get(self.service_type)
+        balancer = load_balancers.get(self.service_type.value)
+        if route is None or not route.replicas or balancer is None:
             raise HTTPException(status_code=404, detail=f"Service {self.service_type} not found")
 
-        full_path = self.upstream_path(path)  # ✅ 접두사 포함 경로
-        url = f"{base_url}{full_path}"
-        
-        print(f"🎯🎯🎯 Requesting URL: {url}")
-        logger.info(f"🎯 Requesting URL: {url}")
-        logger.info(f"🔍 Path 변환 과정: {path} → {full_path} → {url}")
-        logger.info(f"🔍 Base URL: {base_url}")
-        logger.info(f"🔍 Service Type: {self.service_type}")
+        full_path = route.upstream_path(path)  # ✅ 접두사 포함 경로
+
+        # 라우트별 타임아웃 예산 (호출자가 더 짧은 시간을 주면 그 값) → 게이트웨이 로컬 deadline
+        budget = timeout_budget_for(self.service_type.value, path, upload=bool(files))
+        if timeout is not None:
+            budget = min(budget, timeout)
+        deadline = time.monotonic() + budget
 
         # 업스트림에 보낼 헤더 정리
         fwd_headers = dict(headers or {})
         fwd_headers.pop("host", None)  # ✅ Host 제거
+        # 클라이언트가 보낸 예산 헤더는 신뢰하지 않음 (아래에서 남은 예산으로 다시 설정)
+        fwd_headers.pop(TIMEOUT_HEADER, None)
+        if not stream:
+            # 버퍼링 응답은 httpx가 디코딩한 뒤 게이트웨이가 다시 압축하므로
+            # 클라이언트 Accept-Encoding 대신 httpx가 풀 수 있는 인코딩만 요청 (httpx 기본값)
+            fwd_headers.pop("accept-encoding", None)
+        elif "accept-encoding" not in {name.lower() for name in fwd_headers}:
+            # 스트리밍 응답은 업스트림 바이트(aiter_raw)를 content-encoding째 그대로 전달하므로
+            # 클라이언트 Accept-Encoding을 그대로 보내고, 없으면 httpx 기본값(gzip, deflate) 대신 무압축 요청
+            fwd_headers["Accept-Encoding"] = "identity"
         
-        # 기본 헤더 설정
-        if not fwd_headers.get('Content-Type'):
+        # 기본 헤더 설정 (multipart는 경계(boundary)와 길이를 httpx가 다시 만들므로 클라이언트 값을 버림)
+        # 헤더 이름은 대소문자 구분 없이 확인 (클라이언트 값이 있으면 기본값을 덧붙이지 않음)
+        present = {name.lower() for name in fwd_headers}
+        if files:
+            for name in ("content-type", "content-length", "transfer-encoding"):
+                fwd_headers.pop(name, None)
+        elif "content-type" not in present:
             fwd_headers['Content-Type'] = 'application/json'
-        if not fwd_headers.get('Accept'):
+        if "accept" not in present:
             fwd_headers['Accept'] = 'application/json'
 
-        async with httpx.AsyncClient() as client:
+        # ✅ 요청마다 새 클라이언트를 만들지 않고 서비스별 풀 클라이언트 재사용
+        client = client_registry.get(self.service_type)
+        try:
+            m = method.upper()
+            if m not in ("GET", "POST", "PUT", "DELETE", "PATCH"):
+                raise HTTPException(status_code=405, detail=f"Method {method} not allowed")
+
+            send_kwargs = {}
+            if m == "POST" and files:
+                # 파일 객체는 httpx가 청크 단위로 읽어 전송 (업로드 전체를 메모리에 올리지 않음)
+                send_kwargs["files"] = files
+                if data:
+                    send_kwargs["data"] = data
+            elif m == "POST" and data is not None:
+                send_kwargs["json"] = data
+            elif m in ("POST", "PUT", "PATCH"):
+                # ✅ bytes 또는 request.stream() 같은 async iterator를 재직렬화 없이 그대로 전달
+                send_kwargs["content"] = body
+
+            # 서비스별 동시성 제한: 슬롯이 없으면 우선순위 대기열에서 잠깐 기다리거나 즉시 차단
+            priority = classify_priority(self.service_type.value, path)
+            tracer = get_tracer()
             try:
-                m = method.upper()
-                if m == "GET":
-                    response = await client.get(url, headers=fwd_headers, params=params)
-                elif m == "POST":
-                    if files:
-                        response = await client.post(url, headers=fwd_headers, files=files, params=params)
-                    elif data is not None:
-                        response = await client.post(url, headers=fwd_headers, json=data, params=params)
-                    else:
-                        # body가 bytes인 경우 json으로 변환 시도
-                        try:
-                            import json
-                            body_json = json.loads(body.decode("utf-8")) if body else {}
-                            response = await client.post(url, headers=fwd_headers, json=body_json, params=params)
-                        except (json.JSONDecodeError, AttributeError, UnicodeDecodeError):
-                            response = await client.post(url, headers=fwd_headers, content=body, params=params)
-                elif m == "PUT":
-                    response = await client.put(url, headers=fwd_headers, content=body, params=params)
-                elif m == "DELETE":
-                    response = await client.delete(url, headers=fwd_headers, params=params)
-                elif m == "PATCH":
-                    response = await client.patch(url, headers=fwd_headers, content=body, params=params)
+                queue_started = time.perf_counter()
+                with tracer.span("gateway.admission", attributes={"priority": priority.name}):
+                    limiter = await concurrency_limiters.acquire(self.service_type.value, priority)
+                add_timing("queue_ms", time.perf_counter() - queue_started)
+            except ConcurrencyLimitExceeded as e:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"Service {self.service_type.value} overloaded ({e.reason})",
+                    headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+                )
+
+            started = None
+            outcome = None
+            try:
+                # 정책에 따라 레플리카 선택 (sticky 정책이면 세션 키 기준)
+                try:
+                    replica = balancer.choose(balancer.sticky_key(headers))
+                except NoHealthyReplica as e:
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"Service {self.service_type.value} unavailable (no healthy replicas)",
+                        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+                    )
+                url = f"{replica.url}{full_path}"
+                annotate(service=self.service_type.value, upstream=replica.url, priority=priority.name)
+                # 대기열에서 쓴 시간을 뺀 남은 예산만 업스트림에 허용
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise HTTPException(
+                        status_code=504,
+                        detail=f"Service {self.service_type.value} timeout budget exhausted ({budget:g}s)",
+                    )
+                if stream_idle_timeout is None:
+                    # 남은 예산을 상대값으로 전달 (서비스는 받은 시점부터 이 시간이 지나면 작업 중단)
+                    fwd_headers[TIMEOUT_HEADER] = str(max(1, int(remaining * 1000)))
                 else:
-                    raise HTTPException(status_code=405, detail=f"Method {method} not allowed")
-                
-                print(f"Response status: {response.status_code}")
-                print(f"Request URL: {url}")
-                print(f"Request body: {body}")
-                logger.info(f"✅ Response status: {response.status_code}")
-                
-                return response
-            except httpx.RequestError as e:
-                logger.error(f"Request error: {e}")
-                raise HTTPException(status_code=503, detail=f"Service {self.service_type} unavailable")
-            except Exception as e:
-                print(f"Request failed: {str(e)}")
-                logger.error(f"Request failed: {str(e)}")
-                raise HTTPException(status_code=500, detail=str(e))
+                    # 장수명 스트림(SSE)은 예산을 응답 헤더까지만 적용하고 서비스가 중간에 끊지 않도록 미전달
+                    # 이벤트 사이 간격은 예산 대신 유휴 한도로 제한
+                    remaining = httpx.Timeout(remaining, read=stream_idle_timeout)
+                upstream_request = client.build_request(
+                    m, url, headers=fwd_headers, params=params, timeout=remaining, **send_kwargs
+                )
+
+                # 서킷이 열려 있으면 업스트림을 기다리지 않고 즉시 실패
+                # (half-open probe 슬롯을 잡으므로 여기부터는 반드시 record/abandon 으로 끝나야 함 → 호출 직전에 확인)
+                breaker = circuit_breakers.get(self.service_type.value)
+                try:
+                    breaker.before_call()
+                except CircuitOpenError as e:
+                    raise HTTPException(
+                        status_code=503,
+                        detail=f"Service {self.service_type.value} temporarily unavailable (circuit open)",
+                        headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))},
+                    )
+
+                started = time.perf_counter()
+                balancer.start(replica)
+                try:
+                    # 업스트림 호출 client span + traceparent 전파
+                    with tracer.outbound_span(m, url, upstream_request.headers) as span:
+                        # stream=True면 헤더만 받고 본문은 호출자가 aiter_raw()로 읽은 뒤 aclose() 해야 함
+                        response = await client.send(upstream_request, stream=stream)
+                        if span is not None:
+                            span.set_attribute("http.status_code", response.status_code)
+                            span.set_attribute("service", self.service_type.value)
+                    outcome = (response.status_code < 500, time.perf_counter() - started)
+                except httpx.RequestError:
+                    outcome = (False, time.perf_counter() - started)
+                    raise
+                finally:
+                    if outcome is not None:
+                        add_timing("upstream_ms", outcome[1])
+                        breaker.record(*outcome)
+                        balancer.finish(replica, *outcome)
+                    else:
+                        breaker.abandon()
+                        balancer.finish(replica, True, None)
+            finally:
+                # 스트리밍 응답도 헤더 수신 시점에 슬롯 반환 (본문 전송은 제한 대상 아님)
+                concurrency_limiters.release(limiter, *(outcome or (True, None)))
+
+            annotate(upstream_status=response.status_code)
+            return response
+        except HTTPException:
+            raise
+        except httpx.TimeoutException as e:
+            logger.warning(f"⏱️ {self.service_type.value} 타임아웃 예산 초과 ({budget:g}s): {type(e).__name__}")
+            raise HTTPException(
+                status_code=504,
+                detail=f"Service {self.service_type.value} timed out ({budget:g}s)",
+            )
+        except httpx.RequestError as e:
+            logger.error(f"Request error: {e}")
+            raise HTTPException(status_code=503, detail=f"Service {self.service_type} unavailable")
+        except Exception as e:
+            logger.error(f"Request failed: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
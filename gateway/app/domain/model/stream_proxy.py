@@ -0,0 +1,416 @@
+"""
+장수명 스트림 프록시 (SSE / WebSocket)
+
+챗봇 토큰 스트리밍, 리포트 생성 진행 상황, 설문 실시간 집계처럼 응답이 끝날 때까지 기다리지 않고
+조금씩 받아야 하는 스트림을 게이트웨이를 통과시켜 전달한다.
+- SSE: 업스트림 풀 연결(client_registry)로 받아 크기가 제한된 큐를 거쳐 전달.
+  큐가 차면 업스트림 읽기를 멈춰(백프레셔) 느린 클라이언트 때문에 게이트웨이 메모리가 늘지 않음
+- 일정 시간 이벤트가 없으면 SSE 주석(": keepalive")을 보내 중간 프록시/브라우저의 유휴 연결 종료 방지
+- WebSocket: 업스트림과 연결을 맺고 양방향 프레임 중계 (수신 큐 크기 제한, ping으로 유휴 연결 유지)
+- 서비스별 동시 스트림 수 상한 (초과 시 SSE는 503, WebSocket은 1013으로 거부)
+- WebSocket은 CORS 허용 Origin만 수락하고(쿠키 인증을 다른 사이트가 쓰지 못하도록), 세션 동안 서비스 동시성 슬롯을 점유.
+  서킷이 열려 있으면 업스트림에 연결하지 않고 1013으로 거부
+- 단일 프로세스 모드의 서비스는 WebSocket을 네트워크 연결 없이 마운트된 서비스 ASGI 앱에 바로 넘김 (local_app)
+
+websockets 패키지가 없으면 WebSocket 프록시만 비활성화된다.
+"""
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+import asyncio
+import os
+import logging
+import time
+
+import httpx
+from fastapi import HTTPException, WebSocket
+from starlette.websockets import WebSocketDisconnect
+
+from app.domain.model.circuit_breaker import CircuitOpenError, circuit_breakers
+from app.domain.model.concurrency_limiter import ConcurrencyLimitExceeded, classify_priority, concurrency_limiters
+from app.domain.model.load_balancer import NoHealthyReplica, load_balancers
+from app.domain.model.service_factory import ServiceProxyFactory, ServiceType
+from app.domain.model.timeout_budget import timeout_budget_for
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+    from websockets.exceptions import ConnectionClosed
+except ImportError:  # websockets 미설치 시 WebSocket 프록시 비활성화
+    ws_connect = None
+    ConnectionClosed = Exception
+
+logger = logging.getLogger("gateway_api")
+
+EVENT_STREAM = "text/event-stream"
+KEEPALIVE_COMMENT = b": keepalive\n\n"
+# WebSocket 핸드셰이크 중 업스트림에 전달할 헤더 (인증/세션/언어/추적용, 서비스도 Origin을 확인할 수 있도록 origin 포함)
+WS_FORWARD_HEADERS = (
+    "authorization", "cookie", "origin", "accept-language", "x-request-id", "traceparent", "tracestate",
+)
+# 정책 위반 (허용되지 않은 Origin)
+WS_POLICY_VIOLATION = 1008
+# 상대에게 보낼 수 없는 종료 코드 (상태 없음/비정상 종료)
+_RESERVED_CLOSE_CODES = (1005, 1006, 1015)
+
+
+def parse_stream_limits(raw: str) -> Dict[str, int]:
+    """"chatbot=200,survey=100" 형식 파싱"""
+    limits = {}
+    for item in raw.split(","):
+        service, _, limit = item.partition("=")
+        service = service.strip().lower()
+        if not service or not limit.strip():
+            continue
+        try:
+            limits[service] = int(limit)
+        except ValueError:
+            logger.warning(f"⚠️ 잘못된 스트림 상한 설정 무시: {item}")
+    return limits
+
+
+def wants_event_stream(headers: Mapping[str, str]) -> bool:
+    return EVENT_STREAM in headers.get("accept", "").lower()
+
+
+def _ws_url(base_url: str) -> str:
+    if base_url.startswith("https://"):
+        return "wss://" + base_url[len("https://"):]
+    if base_url.startswith("http://"):
+        return "ws://" + base_url[len("http://"):]
+    return base_url
+
+
+def _sendable_close_code(code: Optional[int], fallback: int) -> int:
+    if code is None or code in _RESERVED_CLOSE_CODES:
+        return fallback
+    return code
+
+
+class StreamLimitExceeded(Exception):
+    pass
+
+
+class StreamProxy:
+    def __init__(
+        self,
+        max_streams: Optional[int] = None,
+        buffer_size: Optional[int] = None,
+        keepalive_interval: Optional[float] = None,
+        idle_timeout: Optional[float] = None,
+        limits: Optional[Dict[str, int]] = None,
+    ):
+        # HTTP/1.1 업스트림에서는 SSE 하나가 풀 연결 하나를 계속 점유하므로 풀 크기(기본 100)보다 작게 둠
+        self.max_streams = max_streams or int(os.getenv("GATEWAY_STREAM_MAX_PER_SERVICE", 50))
+        self.buffer_size = buffer_size or int(os.getenv("GATEWAY_STREAM_BUFFER", 64))
+        self.keepalive_interval = keepalive_interval or float(os.getenv("GATEWAY_STREAM_KEEPALIVE", 15.0))
+        self.idle_timeout = idle_timeout or float(os.getenv("GATEWAY_STREAM_IDLE_TIMEOUT", 300.0))
+        self.limits = parse_stream_limits(os.getenv("GATEWAY_STREAM_LIMITS", "")) if limits is None else limits
+        # 서비스 → 종류(sse/websocket)별 진행 중 스트림 수
+        self.active: Dict[str, Dict[str, int]] = {}
+        self.opened: Dict[str, int] = {"sse": 0, "websocket": 0}
+        self.rejected: Dict[str, int] = {}
+        self.messages = 0
+        self.bytes = 0
+        self.keepalives = 0
+        # 서비스 → 프로세스 내부 ASGI 앱 (단일 프로세스 모드, main.lifespan에서 설정). None이면 업스트림 연결
+        self.local_app: Optional[Callable[[str], Optional[Any]]] = None
+        # WebSocket을 허용할 브라우저 Origin (main에서 CORS 허용 목록으로 설정). None이면 확인하지 않음
+        self.allowed_origins: Optional[Tuple[str, ...]] = None
+
+    def set_allowed_origins(self, origins: Iterable[str]) -> None:
+        self.allowed_origins = tuple(origin.rstrip("/") for origin in origins)
+
+    def origin_allowed(self, origin: Optional[str]) -> bool:
+        """Origin 헤더가 없는 요청(브라우저가 아닌 클라이언트)은 허용, 있으면 CORS 허용 목록과 비교"""
+        if not origin or self.allowed_origins is None:
+            return True
+        return origin.rstrip("/") in self.allowed_origins
+
+    def limit_for(self, service: str) -> int:
+        return self.limits.get(service, self.max_streams)
+
+    def acquire(self, service: str, kind: str) -> None:
+        counts = self.active.setdefault(service, {"sse": 0, "websocket": 0})
+        if sum(counts.values()) >= self.limit_for(service):
+            self.rejected[service] = self.rejected.get(service, 0) + 1
+            raise StreamLimitExceeded(f"Service {service} stream limit reached ({self.limit_for(service)})")
+        counts[kind] += 1
+        self.opened[kind] += 1
+
+    def release(self, service: str, kind: str) -> None:
+        counts = self.active.get(service)
+        if counts is not None:
+            counts[kind] = max(0, counts[kind] - 1)
+
+    # ---------- SSE ----------
+    async def open_event_stream(
+        self,
+        service: ServiceType,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: Optional[bytes] = None,
+        params: Optional[Union[dict, List[Tuple[str, str]]]] = None,
+    ) -> Tuple[httpx.Response, Optional[AsyncIterator[bytes]]]:
+        """업스트림 스트림을 연다. 응답이 SSE면 (응답, 중계 이터레이터), 아니면 (응답, None)"""
+        try:
+            self.acquire(service.value, "sse")
+        except StreamLimitExceeded as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+        try:
+            factory = ServiceProxyFactory.for_service(service)
+            # keepalive 주석을 이벤트 사이에 끼워 넣으므로 업스트림에는 무압축으로 요청
+            fwd_headers = {k: v for k, v in headers.items() if k.lower() != "accept-encoding"}
+            resp = await factory.request(
+                method=method,
+                path=path,
+                headers=fwd_headers,
+                body=body,
+                params=params,
+                stream=True,
+                stream_idle_timeout=self.idle_timeout,
+            )
+        except BaseException:
+            self.release(service.value, "sse")
+            raise
+        if not resp.headers.get("content-type", "").lower().startswith(EVENT_STREAM):
+            # 오류 응답 등 일반 응답은 호출자가 그대로 전달
+            self.release(service.value, "sse")
+            return resp, None
+        logger.info(f"📡 {service.value} SSE 스트림 시작: /{path}")
+        return resp, self._relay_events(service.value, resp)
+
+    async def _relay_events(self, service: str, response: httpx.Response) -> AsyncIterator[bytes]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.buffer_size)
+
+        async def pump():
+            try:
+                async for chunk in response.aiter_bytes():
+                    # 큐가 차면 여기서 대기 → 업스트림 소켓 읽기도 멈춤
+                    await queue.put(chunk)
+            except httpx.HTTPError as e:
+                logger.warning(f"⚠️ {service} SSE 업스트림 읽기 종료: {type(e).__name__}")
+            await queue.put(None)
+
+        pump_task = asyncio.ensure_future(pump())
+        getter: Optional[asyncio.Future] = None
+        # 마지막으로 보낸 청크가 이벤트 경계(빈 줄)에서 끝났는지. 이벤트 중간에는 keepalive를 끼워 넣지 않음
+        at_boundary = True
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait((getter,), timeout=self.keepalive_interval)
+                if not done:
+                    if at_boundary:
+                        self.keepalives += 1
+                        yield KEEPALIVE_COMMENT
+                    continue
+                chunk, getter = getter.result(), None
+                if chunk is None:
+                    break
+                self.messages += 1
+                self.bytes += len(chunk)
+                at_boundary = chunk.endswith((b"\n\n", b"\r\n\r\n", b"\r\r"))
+                yield chunk
+        finally:
+            # 클라이언트가 끊으면(취소) 업스트림 읽기를 멈추고 풀 연결 반환
+            if getter is not None:
+                getter.cancel()
+            pump_task.cancel()
+            self.release(service, "sse")
+            logger.info(f"📡 {service} SSE 스트림 종료")
+            await response.aclose()
+
+    # ---------- WebSocket ----------
+    async def relay_websocket(self, service: ServiceType, path: str, websocket: WebSocket) -> None:
+        """Origin/스트림 상한/동시성 슬롯을 확인한 뒤 업스트림(또는 프로세스 내부 서비스 앱)으로 세션 중계"""
+        origin = websocket.headers.get("origin")
+        if not self.origin_allowed(origin):
+            # 핸드셰이크 수락 전에 닫으면 클라이언트는 403을 받음
+            logger.warning(f"🚫 {service.value} WebSocket 연결 거부: 허용되지 않은 Origin {origin}")
+            await websocket.close(code=WS_POLICY_VIOLATION)
+            return
+        local_app = self.local_app(service.value) if self.local_app is not None else None
+        if local_app is None and ws_connect is None:
+            logger.error("🚨 websockets 패키지가 없어 WebSocket 프록시를 사용할 수 없습니다")
+            await websocket.close(code=1011)
+            return
+        try:
+            self.acquire(service.value, "websocket")
+        except StreamLimitExceeded as e:
+            logger.warning(f"🚦 {e}")
+            await websocket.close(code=1013)
+            return
+
+        limiter = None
+        try:
+            # 세션 전체 동안 서비스 동시성 슬롯 점유 (세션 길이는 지연 시간이 아니므로 limit 조절에는 반영하지 않음)
+            try:
+                limiter = await concurrency_limiters.acquire(service.value, classify_priority(service.value, path))
+            except ConcurrencyLimitExceeded as e:
+                logger.warning(f"🚦 {service.value} WebSocket 연결 거부 ({e.reason})")
+                await websocket.close(code=1013)
+                return
+            if local_app is not None:
+                await self._dispatch_local(service, path, websocket, local_app)
+            else:
+                await self._relay_upstream(service, path, websocket)
+        finally:
+            if limiter is not None:
+                concurrency_limiters.release(limiter, True, None)
+            self.release(service.value, "websocket")
+
+    async def _relay_upstream(self, service: ServiceType, path: str, websocket: WebSocket) -> None:
+        """업스트림 WebSocket에 연결한 뒤 클라이언트 핸드셰이크를 수락하고 양방향 중계"""
+        factory = ServiceProxyFactory.for_service(service)
+        balancer = load_balancers.get(service.value)
+        try:
+            replica = balancer.choose(balancer.sticky_key(websocket.headers))
+        except NoHealthyReplica as e:
+            # 1013 Try Again Later
+            logger.warning(f"⚠️ {service.value} WebSocket 연결 거부: {e}")
+            await websocket.close(code=1013)
+            return
+        url = _ws_url(replica.url) + factory.upstream_path(path)
+        if websocket.url.query:
+            url += "?" + websocket.url.query
+        headers = {name: websocket.headers[name] for name in WS_FORWARD_HEADERS if name in websocket.headers}
+        subprotocols = [
+            p.strip() for p in websocket.headers.get("sec-websocket-protocol", "").split(",") if p.strip()
+        ]
+
+        # 서킷이 열려 있으면 업스트림에 연결하지 않음. 서킷에는 핸드셰이크 결과만 기록
+        breaker = circuit_breakers.get(service.value)
+        try:
+            breaker.before_call()
+        except CircuitOpenError as e:
+            logger.warning(f"⚠️ {service.value} WebSocket 연결 거부: {e}")
+            await websocket.close(code=1013)
+            return
+
+        balancer.start(replica)
+        started = time.perf_counter()
+        handshake = None
+        success = True
+        try:
+            async with ws_connect(
+                url,
+                additional_headers=headers,
+                subprotocols=subprotocols or None,
+                open_timeout=timeout_budget_for(service.value, path),
+                ping_interval=self.keepalive_interval,
+                max_queue=self.buffer_size,
+                proxy=None,
+            ) as upstream:
+                handshake = (True, time.perf_counter() - started)
+                breaker.record(*handshake)
+                await websocket.accept(subprotocol=upstream.subprotocol)
+                logger.info(f"🔌 {service.value} WebSocket 중계 시작: /{path}")
+                await self._relay_frames(websocket, upstream)
+        except (OSError, asyncio.TimeoutError, ConnectionClosed) as e:
+            success = False
+            logger.warning(f"⚠️ {service.value} WebSocket 업스트림 연결 실패: {type(e).__name__}: {e}")
+            await _close_quietly(websocket, 1011)
+        except Exception as e:
+            # 핸드셰이크 거부(InvalidStatus 등)
+            success = False
+            logger.warning(f"⚠️ {service.value} WebSocket 업스트림 핸드셰이크 실패: {e}")
+            await _close_quietly(websocket, 1011)
+        finally:
+            if handshake is None:
+                # 핸드셰이크 전에 끝남: 실패면 기록, 취소(클라이언트 이탈)면 probe 슬롯만 반환
+                if success:
+                    breaker.abandon()
+                else:
+                    breaker.record(False, time.perf_counter() - started)
+            balancer.finish(replica, success, None)
+
+    async def _dispatch_local(self, service: ServiceType, path: str, websocket: WebSocket, local_app) -> None:
+        """단일 프로세스 모드: 클라이언트 WebSocket 세션을 서비스 앱에 그대로 넘김 (핸드셰이크/프레임은 서비스가 처리)"""
+        upstream_path = ServiceProxyFactory.for_service(service).upstream_path(path)
+        # 게이트웨이 라우터가 채운 값은 빼고 서비스 경로로 바꾼 scope
+        scope = {
+            key: value for key, value in websocket.scope.items()
+            if key not in ("app", "router", "route", "endpoint", "path_params")
+        }
+        scope.update(path=upstream_path, raw_path=upstream_path.encode("utf-8"), root_path="")
+        logger.info(f"🔌 {service.value} WebSocket 프로세스 내부 연결: /{path}")
+        try:
+            # WebSocket.receive/send는 ASGI 메시지를 그대로 주고받음
+            await local_app(scope, websocket.receive, websocket.send)
+        except Exception as e:
+            logger.warning(f"⚠️ {service.value} 프로세스 내부 WebSocket 처리 실패: {type(e).__name__}: {e}")
+            await _close_quietly(websocket, 1011)
+
+    async def _relay_frames(self, websocket: WebSocket, upstream) -> None:
+        async def client_to_upstream() -> Tuple[str, int, str]:
+            try:
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        return "client", message.get("code", 1000), message.get("reason") or ""
+                    data = message.get("text")
+                    if data is None:
+                        data = message.get("bytes") or b""
+                    self.messages += 1
+                    self.bytes += len(data)
+                    # 업스트림 쓰기 버퍼가 차면 여기서 대기 (클라이언트 읽기도 멈춤)
+                    await upstream.send(data)
+            except WebSocketDisconnect as e:
+                return "client", e.code, e.reason or ""
+            except ConnectionClosed:
+                return "upstream", upstream.close_code, upstream.close_reason or ""
+
+        async def upstream_to_client() -> Tuple[str, int, str]:
+            try:
+                async for data in upstream:
+                    self.messages += 1
+                    self.bytes += len(data)
+                    if isinstance(data, str):
+                        await websocket.send_text(data)
+                    else:
+                        await websocket.send_bytes(data)
+            except ConnectionClosed:
+                pass
+            except (WebSocketDisconnect, RuntimeError):
+                return "client", 1000, ""
+            return "upstream", upstream.close_code, upstream.close_reason or ""
+
+        tasks = [asyncio.ensure_future(client_to_upstream()), asyncio.ensure_future(upstream_to_client())]
+        try:
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        closed_by, code, reason = next(iter(done)).result()
+
+        # 먼저 닫힌 쪽의 종료 코드를 반대쪽에 전달
+        if closed_by == "client":
+            await upstream.close(_sendable_close_code(code, 1000), reason)
+        else:
+            await _close_quietly(websocket, _sendable_close_code(code, 1011), reason)
+        logger.info(f"🔌 WebSocket 중계 종료 ({closed_by}, code={code})")
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "active": {service: dict(counts) for service, counts in self.active.items()},
+            "limits": {service: self.limit_for(service) for service in self.active},
+            "opened": dict(self.opened),
+            "rejected": dict(self.rejected),
+            "messages": self.messages,
+            "bytes": self.bytes,
+            "keepalives": self.keepalives,
+            "websocket_available": ws_connect is not None,
+        }
+
+
+async def _close_quietly(websocket: WebSocket, code: int, reason: str = "") -> None:
+    try:
+        await websocket.close(code=code, reason=reason or None)
+    except RuntimeError:
+        # 이미 닫힌 연결
+        pass
+
+
+# 게이트웨이 전역 스트림 프록시
+stream_proxy = StreamProxy()
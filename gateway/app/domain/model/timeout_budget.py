@@ -0,0 +1,67 @@
+"""
+라우트별 타임아웃 예산 + deadline 전파
+
+빠른 인증 호출과 느린 리포트 생성이 같은 타임아웃을 쓰지 않도록 라우트별 예산(초)을 두고,
+게이트웨이는 업스트림 호출 직전에 남은 예산을 X-Request-Timeout-Ms 헤더(상대값, ms)로 전달한다.
+서비스는 받은 시점의 monotonic 시계로 deadline을 계산해 지나면 처리(DB 쿼리 포함)를 중단한다.
+(절대 시각을 보내면 게이트웨이와 서비스 호스트의 시계 차이만큼 예산이 늘거나 줄어듦)
+
+규칙 형식: "{service}" 또는 "{service}/{경로 끝부분}" (경로 규칙이 서비스 규칙보다 우선)
+파일 업로드는 서비스에서 파일을 파싱/저장하는 시간이 길어 GATEWAY_UPLOAD_TIMEOUT 이상을 보장한다.
+"""
+from typing import Dict, Optional
+import os
+import logging
+
+logger = logging.getLogger("gateway_api")
+
+TIMEOUT_HEADER = "x-request-timeout-ms"
+
+# 기본 예산(초). 규칙이 없으면 GATEWAY_UPSTREAM_TIMEOUT
+DEFAULT_TIMEOUT_BUDGETS: Dict[str, float] = {
+    "auth": 5,
+    "auth/login": 3,
+    "chatbot": 30,
+    "grireport/generate": 60,
+    "tcfdreport/generate": 60,
+}
+
+
+def parse_timeout_budgets(raw: str) -> Dict[str, float]:
+    """"auth/login=3,grireport/generate=60" 형식 파싱"""
+    rules = {}
+    for item in raw.split(","):
+        route, _, seconds = item.partition("=")
+        route = route.strip().strip("/")
+        if not route or not seconds.strip():
+            continue
+        try:
+            rules[route] = float(seconds)
+        except ValueError:
+            logger.warning(f"⚠️ 잘못된 타임아웃 예산 설정 무시: {item}")
+    return rules
+
+
+TIMEOUT_BUDGETS = {**DEFAULT_TIMEOUT_BUDGETS, **parse_timeout_budgets(os.getenv("GATEWAY_TIMEOUT_BUDGETS", ""))}
+DEFAULT_TIMEOUT = float(os.getenv("GATEWAY_UPSTREAM_TIMEOUT", 5.0))
+UPLOAD_TIMEOUT = float(os.getenv("GATEWAY_UPLOAD_TIMEOUT", 60.0))
+
+
+def timeout_budget_for(service: str, path: str, upload: bool = False) -> float:
+    """게이트웨이 경로(login, v1/auth/login 등) 끝부분으로 예산 판정 (업로드는 최소 UPLOAD_TIMEOUT)"""
+    budget = _route_budget(service, path)
+    return max(budget, UPLOAD_TIMEOUT) if upload else budget
+
+
+def _route_budget(service: str, path: str) -> float:
+    path = path.strip("/")
+    service_budget: Optional[float] = None
+    for route, budget in TIMEOUT_BUDGETS.items():
+        rule_service, _, suffix = route.partition("/")
+        if rule_service != service:
+            continue
+        if not suffix:
+            service_budget = budget
+        elif path == suffix or path.endswith("/" + suffix):
+            return budget
+    return service_budget if service_budget is not None else DEFAULT_TIMEOUT
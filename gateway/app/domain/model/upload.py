@@ -0,0 +1,172 @@
+"""
+멀티파트 파일 업로드 프록시 (메모리 임계값 초과 시 임시 파일로 스풀)
+
+ESG 증빙 자료(엑셀, PDF) 업로드가 게이트웨이 메모리에 통째로 쌓이지 않도록 한다.
+- Content-Length가 한도를 넘으면 본문을 읽기 전에 413, 길이를 모르는 청크 전송도 누적 크기가 넘는 즉시 413
+- 클라이언트 본문은 스풀에 기록하는 속도만큼만 읽음 (백프레셔). 파일 파트는
+  GATEWAY_UPLOAD_SPOOL_BYTES까지 메모리, 넘으면 임시 파일(SpooledTemporaryFile)에 기록
+- 업스트림에는 스풀한 파일을 청크 단위로 읽어 multipart로 다시 스트리밍
+  (느린 클라이언트 업로드가 업스트림 연결/동시성 슬롯을 붙잡지 않고, 잘린 업로드는 서비스에 도달하지 않음)
+- 수신/전달 시간과 처리량은 Prometheus 메트릭(gateway_upload_*)과 /gateway/uploads 통계로 노출
+"""
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import os
+import time
+import logging
+
+import httpx
+from fastapi import HTTPException, Request
+from starlette.datastructures import FormData, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from app.common.utility.access_log import annotate
+from app.common.utility.metrics import metrics
+from app.domain.model.service_factory import ServiceProxyFactory, ServiceType
+
+logger = logging.getLogger("gateway_api")
+
+
+class UploadTooLarge(MultiPartException):
+    """누적 크기 초과 (MultiPartException을 상속해 파서가 스풀 파일을 정리하도록 함)"""
+
+
+class UploadProxy:
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_files: Optional[int] = None,
+        spool_bytes: Optional[int] = None,
+    ):
+        self.max_bytes = max_bytes or int(os.getenv("GATEWAY_UPLOAD_MAX_BYTES", 50 * 1024 * 1024))
+        self.max_files = max_files or int(os.getenv("GATEWAY_UPLOAD_MAX_FILES", 10))
+        self.spool_bytes = spool_bytes or int(os.getenv("GATEWAY_UPLOAD_SPOOL_BYTES", 1024 * 1024))
+        self.uploads = 0
+        self.files = 0
+        self.bytes = 0
+        self.spilled = 0
+        self.rejected = 0
+        self.receive_seconds = 0.0
+
+    def _reject(self, service: str, reason: str, status_code: int, detail: str) -> HTTPException:
+        self.rejected += 1
+        metrics.upload_rejected.inc(service, reason)
+        logger.warning(f"📤 {service} 업로드 거부 ({reason}): {detail}")
+        return HTTPException(status_code=status_code, detail=detail)
+
+    async def receive(self, service: str, request: Request) -> Tuple[FormData, int, float]:
+        """요청 본문을 파싱해 스풀. (폼 데이터, 수신 바이트, 수신 시간) 반환"""
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            # 본문을 한 바이트도 읽지 않고 거부
+            raise self._reject(service, "too_large", 413, f"Upload exceeds {self.max_bytes} bytes")
+
+        received = 0
+
+        async def limited() -> AsyncIterator[bytes]:
+            # 길이를 모르는(chunked) 본문도 한도를 넘는 순간 중단
+            nonlocal received
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > self.max_bytes:
+                    raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+                yield chunk
+
+        parser = MultiPartParser(request.headers, limited(), max_files=self.max_files)
+        parser.spool_max_size = self.spool_bytes
+        started = time.perf_counter()
+        form = None
+        try:
+            form = await parser.parse()
+        except UploadTooLarge as e:
+            raise self._reject(service, "too_large", 413, str(e))
+        except MultiPartException as e:
+            raise self._reject(service, "invalid", 400, e.message)
+        except ValueError as e:
+            # python-multipart 파싱 오류 (경계 불일치, 잘린 본문 등)
+            raise self._reject(service, "invalid", 400, f"Malformed multipart body: {e}")
+        finally:
+            if form is None:
+                # 파서는 MultiPartException일 때만 스풀 파일을 닫으므로
+                # 그 밖의 실패(파싱 오류, 클라이언트 연결 끊김)에도 이미 만든 임시 파일을 정리
+                for file in parser._files_to_close_on_error:
+                    file.close()
+        return form, received, time.perf_counter() - started
+
+    @staticmethod
+    def _split(form: FormData) -> Tuple[Dict[str, List[str]], List[tuple], int]:
+        """httpx multipart 인자로 변환: 일반 필드, (필드명, (파일명, 내용, 타입)) 목록, 디스크로 넘어간 파일 수"""
+        data: Dict[str, List[str]] = {}
+        files: List[tuple] = []
+        spilled = 0
+        for name, value in form.multi_items():
+            if isinstance(value, UploadFile):
+                if getattr(value.file, "_rolled", False):
+                    content = value.file
+                    spilled += 1
+                else:
+                    # 메모리에 있는 작은 파일은 바이트로 전달 (httpx가 길이 계산 시 fileno()로 디스크에 옮기지 않도록)
+                    content = value.file.read()
+                files.append((name, (value.filename, content, value.content_type or "application/octet-stream")))
+            else:
+                data.setdefault(name, []).append(value)
+        return data, files, spilled
+
+    async def forward(
+        self,
+        service: ServiceType,
+        path: str,
+        request: Request,
+        stream: bool = False,
+    ) -> httpx.Response:
+        form, received, receive_seconds = await self.receive(service.value, request)
+        try:
+            data, files, spilled = self._split(form)
+            if not files:
+                raise self._reject(service.value, "no_files", 400, "Multipart upload must contain at least one file")
+            self.uploads += 1
+            self.files += len(files)
+            self.bytes += received
+            self.spilled += spilled
+            self.receive_seconds += receive_seconds
+            annotate(upload_bytes=received, upload_files=len(files), upload_receive_ms=round(receive_seconds * 1000, 3))
+
+            factory = ServiceProxyFactory.for_service(service)
+            forward_started = time.perf_counter()
+            forward_seconds = None
+            try:
+                resp = await factory.request(
+                    method="POST",
+                    path=path,
+                    headers=dict(request.headers),
+                    files=files,
+                    data=data,
+                    params=request.query_params.multi_items() or None,
+                    stream=stream,
+                )
+                forward_seconds = time.perf_counter() - forward_started
+            finally:
+                metrics.observe_upload(service.value, received, receive_seconds, forward_seconds)
+            logger.info(
+                f"📤 {service.value} 업로드 전달: 파일 {len(files)}개, {received / 1024:.0f}KB "
+                f"(수신 {received / max(receive_seconds, 1e-6) / 1024 ** 2:.1f}MB/s, 디스크 스풀 {spilled}개)"
+            )
+            return resp
+        finally:
+            # 요청 본문은 factory.request가 반환되기 전에 모두 전송되므로 바로 정리
+            await form.close()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "uploads": self.uploads,
+            "files": self.files,
+            "bytes": self.bytes,
+            "spilled_files": self.spilled,
+            "rejected": self.rejected,
+            "avg_receive_bytes_per_second": round(self.bytes / self.receive_seconds) if self.receive_seconds else 0,
+            "max_bytes": self.max_bytes,
+            "spool_bytes": self.spool_bytes,
+        }
+
+
+# 게이트웨이 전역 업로드 프록시
+upload_proxy = UploadProxy()
@@ -4,36 +4,92 @@
 from typing import Optional, List, Dict, Any
 import os
 import sys
+import time
 import json
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from fastapi import (
-    APIRouter, FastAPI, Request, UploadFile, Query, HTTPException, Body
+    APIRouter, FastAPI, Request, UploadFile, Query, HTTPException, WebSocket
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
 
 from dotenv import load_dotenv
-from app.domain.model.service_factory import ServiceProxyFactory, ServiceType
+from app.domain.model.service_factory import ServiceProxyFactory, ServiceType, compile_route_table
+from app.domain.model.client_registry import client_registry
+from app.domain.model.proxy_schema import validate_post_body
+from app.domain.model.circuit_breaker import circuit_breakers
+from app.domain.model.load_balancer import load_balancers
+from app.domain.model.concurrency_limiter import concurrency_limiters
+from app.domain.model.batch import batch_executor
+from app.domain.model.upload import upload_proxy
+from app.domain.model.stream_proxy import stream_proxy, wants_event_stream
+from app.domain.model.colocated import colocated_services
+from app.domain.model.mirror import MirrorJob, traffic_mirror
+from app.domain.discovery.health_checker import health_checker
+from app.domain.discovery.discovery_controller import DISCOVERY_ENABLED, discovery_router, service_discovery
+from app.common.utility.response_cache import CachedResponse, etag_matches, response_cache
+from app.common.utility.compression import CompressionMiddleware, negotiate, variant_etag
+from app.common.utility import shared_cache as shared_cache_module
+from app.common.utility.single_flight import coalesce_key, request_coalescer
+from app.common.utility.idempotency import (
+    IDEMPOTENCY_HEADER, REPLAYED_HEADER, StoredResponse, idempotency_store
+)
+from app.common.utility.access_log import (
+    AccessLogMiddleware, annotate, current_request_id, default_timing, dropped_records, setup_logging
+)
+from app.common.utility.tracing import init_tracing
+from app.common.utility.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, gauge, metrics
 
 load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)],
-)
+# 로그는 큐에 넣기만 하고 stdout 쓰기는 백그라운드 스레드에서 수행
+setup_logging()
 logger = logging.getLogger("gateway_api")
 
+HEALTH_CHECK_ENABLED = os.getenv("GATEWAY_HEALTH_CHECK", "true").lower() in ("1", "true", "yes")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("🚀 Gateway API 서비스 시작")
-    yield
-    logger.info("🛑 Gateway API 서비스 종료")
+    # 업스트림 라우팅 테이블은 시작 시 한 번만 컴파일
+    compile_route_table()
+    # 단일 프로세스 모드: 서비스 앱을 직접 올리고 해당 서비스는 프로세스 내부 ASGI 전송으로 호출
+    if colocated_services.enabled:
+        colocated_services.load()
+        await colocated_services.start()
+        client_registry.transport_factory = colocated_services.transport_for
+        stream_proxy.local_app = colocated_services.apps.get
+        health_checker.transport = colocated_services.health_transport()
+    # 서비스 레지스트리 watcher: 등록된 인스턴스가 바뀔 때만 라우팅 테이블 교체
+    if DISCOVERY_ENABLED:
+        await service_discovery.start(colocated_services.apply_routes if colocated_services.enabled else None)
+    # 서비스별 장수명 커넥션 풀 생성 (keep-alive 재사용)
+    await client_registry.start(ServiceType)
+    app.state.client_registry = client_registry
+    # 섀도 업스트림 미러링 (GATEWAY_MIRROR_TARGETS 설정 시, 전용 풀/워커)
+    await traffic_mirror.start()
+    # Redis 공유 캐시 (REDIS_URL 설정 시) → 응답 캐시의 2차 계층
+    response_cache.shared = shared_cache_module.init_shared_cache()
+    # 업스트림 /health 백그라운드 조회 → 비정상 레플리카는 라우팅에서 제외
+    if HEALTH_CHECK_ENABLED:
+        await health_checker.start()
+    try:
+        yield
+    finally:
+        await health_checker.stop()
+        await service_discovery.stop()
+        response_cache.shared = None
+        await shared_cache_module.close_shared_cache()
+        await traffic_mirror.stop()
+        await client_registry.aclose()
+        await colocated_services.stop()
+        logger.info("🛑 Gateway API 서비스 종료")
 
 
 app = FastAPI(
@@ -76,6 +132,9 @@ async def lifespan(app: FastAPI):
     ]
     logger.info("💻 로컬 개발 환경 CORS 설정 적용")
 
+# CORS 미들웨어는 WebSocket 핸드셰이크를 검사하지 않으므로 같은 허용 목록으로 Origin 확인
+stream_proxy.set_allowed_origins(cors_origins)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -84,48 +143,175 @@ async def lifespan(app: FastAPI):
     allow_headers=["*"],
 )
 
+# Accept-Encoding 협상 후 br/zstd/gzip 압축 (작은 응답/이미 압축된 응답은 그대로)
+app.add_middleware(CompressionMiddleware)
+
+def _link_trace_to_access_log(span):
+    """액세스 로그와 trace를 서로 찾을 수 있도록 ID 교차 기록"""
+    annotate(trace_id=span.trace_id)
+    span.set_attribute("request_id", current_request_id())
+
+
+# W3C traceparent 전파 + server span (TRACE_EXPORT_FILE / OTEL_EXPORTER_OTLP_ENDPOINT 설정 시)
+init_tracing("gateway", app, on_span=_link_trace_to_access_log, route_names=False)
+# 요청당 JSON 액세스 로그 한 줄 (X-Request-ID 부여, 2xx 샘플링)
+app.add_middleware(AccessLogMiddleware)
+
 gateway_router = APIRouter(prefix="/api/v1", tags=["Gateway API"])
 
-# 파일필수 서비스(없다면 빈 세트 유지)
-FILE_REQUIRED_SERVICES: set[str] = set()
+# 파일 업로드(multipart/form-data POST)를 받는 서비스 (GATEWAY_UPLOAD_SERVICES)
+FILE_REQUIRED_SERVICES: set[str] = {
+    s.strip().lower()
+    for s in os.getenv("GATEWAY_UPLOAD_SERVICES", "gri,grireport,materiality,tcfd,tcfdreport").split(",")
+    if s.strip()
+}
+
+# 스트리밍 프록시 모드: 전역 on/off + 대용량 다운로드/내보내기 경로는 항상 스트리밍
+STREAMING_PROXY_ENABLED = os.getenv("GATEWAY_STREAMING_PROXY", "false").lower() in ("1", "true", "yes")
+STREAMING_PATH_KEYWORDS = tuple(
+    k.strip().lower() for k in os.getenv("GATEWAY_STREAMING_PATHS", "download,export").split(",") if k.strip()
+)
+
+
+def use_streaming(path: str) -> bool:
+    """업스트림 본문을 버퍼링하지 않고 흘려보낼지 여부"""
+    if STREAMING_PROXY_ENABLED:
+        return True
+    lowered = path.lower()
+    return any(keyword in lowered for keyword in STREAMING_PATH_KEYWORDS)
 
 
 # ServiceType과 ServiceDiscovery 클래스는 service_factory.py로 이동됨
 
 
+def mirror_after(
+    response: Response,
+    service: ServiceType,
+    method: str,
+    path: str,
+    request: Request,
+    upstream,
+    params=None,
+    body: Optional[bytes] = None,
+) -> Response:
+    """표본으로 뽑힌 요청은 응답 전송 후 섀도 업스트림 큐에 넣음 (원 요청 경로에서는 아무것도 기다리지 않음)"""
+    if not traffic_mirror.wants(service.value, method):
+        return response
+    job = MirrorJob(
+        service=service.value,
+        method=method,
+        path=ServiceProxyFactory.for_service(service).upstream_path(path),
+        params=list(params or []),
+        headers=dict(request.headers),
+        body=body,
+        primary_status=upstream.status_code,
+        primary_body=upstream.content,
+        primary_content_type=upstream.headers.get("content-type", ""),
+        primary_latency=upstream.elapsed.total_seconds(),
+    )
+    response.background = BackgroundTask(traffic_mirror.submit, job)
+    return response
+
+
 class ResponseFactory:
+    # 업스트림 헤더 중 hop-by-hop/충돌 유발 헤더
+    HOP_BY_HOP_HEADERS = {"transfer-encoding", "connection", "keep-alive", "date", "server"}
+
     @staticmethod
-    def create_response(response):
-        # 업스트림 헤더 중 hop-by-hop/충돌 유발 헤더 제거
-        unsafe_headers = {
-            "content-length", "transfer-encoding", "content-encoding",
-            "connection", "date", "server"
-        }
+    def create_response(response, rewrite_errors: bool = True):
+        # httpx가 본문을 디코딩했으므로 길이/인코딩 헤더도 제거
+        unsafe_headers = ResponseFactory.HOP_BY_HOP_HEADERS | {"content-length", "content-encoding"}
         safe_headers = {k: v for k, v in response.headers.items() if k.lower() not in unsafe_headers}
-
-        # 콘텐츠 타입에 따라 JSON/바이너리 분기
         content_type = response.headers.get("content-type", "")
-        try:
-            if content_type.startswith("application/json"):
+
+        # 본문 파싱은 에러 응답 재작성처럼 게이트웨이 기능이 필요할 때만 수행
+        if rewrite_errors and response.status_code >= 400 and content_type.startswith("application/json"):
+            try:
+                json.loads(response.content)
+            except ValueError:
+                # JSON 파싱 실패 시 텍스트로 감싸서 전달
                 return JSONResponse(
-                    content=response.json(),
-                    status_code=response.status_code,
-                    headers=safe_headers
-                )
-            else:
-                return Response(
-                    content=response.content,
+                    content={"detail": response.text},
                     status_code=response.status_code,
-                    media_type=content_type or None,
                     headers=safe_headers
                 )
-        except Exception:
-            # JSON 파싱 실패 시 텍스트로 감싸서 전달
-            return JSONResponse(
-                content={"detail": response.text},
-                status_code=response.status_code,
-                headers=safe_headers
-            )
+
+        # ✅ JSON 포함 모든 응답은 파싱/재직렬화 없이 업스트림 바이트와 content-type 그대로 전달
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=content_type or None,
+            headers=safe_headers
+        )
+
+    @staticmethod
+    def create_streaming_response(response):
+        """stream=True로 받은 업스트림 응답을 버퍼링 없이 그대로 흘려보냄"""
+        # aiter_raw()는 디코딩 전 바이트이므로 content-encoding/length는 그대로 유지
+        safe_headers = {
+            k: v for k, v in response.headers.items()
+            if k.lower() not in ResponseFactory.HOP_BY_HOP_HEADERS
+        }
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers=safe_headers,
+            background=BackgroundTask(response.aclose),
+        )
+
+    @staticmethod
+    def create_event_stream_response(response, events):
+        """SSE: 이벤트 중계 이터레이터를 그대로 전송 (keepalive 주석을 끼워 넣으므로 길이/인코딩 헤더 제거)"""
+        unsafe_headers = ResponseFactory.HOP_BY_HOP_HEADERS | {"content-length", "content-encoding"}
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in unsafe_headers}
+        headers.setdefault("cache-control", "no-cache")
+        # nginx 등 앞단 프록시의 응답 버퍼링 해제
+        headers["x-accel-buffering"] = "no"
+        return StreamingResponse(events, status_code=response.status_code, headers=headers)
+
+    @staticmethod
+    def create_cached_response(entry: CachedResponse, request_headers, hit: bool):
+        """캐시 항목으로 응답 생성 (If-None-Match 일치 시 304, 사전 압축본이 있으면 그대로 전송)"""
+        headers = dict(entry.headers)
+        headers["x-cache"] = "HIT" if hit else "MISS"
+        body = entry.body
+        encoding = negotiate(request_headers.get("accept-encoding"), entry.encoded) if entry.encoded else None
+        if encoding is not None:
+            body = entry.encoded[encoding]
+            headers["etag"] = variant_etag(entry.etag, encoding)
+            headers["content-encoding"] = encoding
+        vary = headers.get("vary")
+        if entry.encoded and "accept-encoding" not in (vary or "").lower():
+            headers["vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+        if_none_match = request_headers.get("if-none-match")
+        if etag_matches(if_none_match, entry.etag) or etag_matches(if_none_match, headers["etag"]):
+            headers.pop("content-type", None)
+            headers.pop("content-encoding", None)
+            return Response(status_code=304, headers=headers)
+        return Response(
+            content=body,
+            status_code=entry.status_code,
+            media_type=entry.media_type,
+            headers=headers,
+        )
+
+    @staticmethod
+    def create_stored_response(entry: StoredResponse):
+        """Idempotency-Key 재시도: 저장된 응답을 업스트림 호출 없이 그대로 재전송"""
+        headers = dict(entry.headers)
+        headers[REPLAYED_HEADER] = "true"
+        return Response(
+            content=entry.body,
+            status_code=entry.status_code,
+            media_type=entry.media_type,
+            headers=headers,
+        )
+
+    @staticmethod
+    def create(response, streaming: bool):
+        if streaming:
+            return ResponseFactory.create_streaming_response(response)
+        return ResponseFactory.create_response(response)
 
 
 @gateway_router.get("/health", summary="게이트웨이 헬스체크")
@@ -138,96 +324,313 @@ async def health_check():
     }
 
 
+@gateway_router.get("/health/upstreams", summary="업스트림 헬스체크 집계")
+async def upstream_health():
+    # 백그라운드 헬스체커가 모아둔 상태만 반환 (요청 시 업스트림을 조회하지 않음)
+    return {
+        **health_checker.snapshot(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/pools", summary="업스트림 커넥션 풀 상태")
+async def pool_stats():
+    return {
+        "pools": client_registry.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/cache", summary="게이트웨이 응답 캐시 상태")
+async def cache_stats():
+    shared = shared_cache_module.shared_cache
+    return {
+        "cache": response_cache.stats(),
+        "shared": shared.stats() if shared is not None else None,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/coalescing", summary="GET 요청 병합 통계")
+async def coalescing_stats():
+    return {
+        "coalescing": request_coalescer.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/breakers", summary="업스트림 서킷 브레이커 상태")
+async def breaker_stats():
+    return {
+        "breakers": circuit_breakers.snapshot(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/replicas", summary="업스트림 레플리카 부하 분산 상태")
+async def replica_stats():
+    return {
+        "services": load_balancers.snapshot(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/limits", summary="업스트림 동시성 제한 상태")
+async def limiter_stats():
+    return {
+        **concurrency_limiters.snapshot(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+# ---------- Batch ----------
+@gateway_router.post(
+    "/batch",
+    summary="배치 프록시 (여러 서비스 하위 요청 동시 실행)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "object"},
+                    "example": {
+                        "timeout_ms": 3000,
+                        "requests": [
+                            {"id": "standards", "service": "gri", "method": "GET", "path": "standards"},
+                            {"id": "pillars", "service": "tcfdreport", "path": "pillars", "timeout_ms": 1000},
+                        ],
+                    },
+                }
+            },
+        }
+    },
+)
+async def proxy_batch(request: Request):
+    """하위 요청을 동시에 실행해 항목별 status/body를 한 번에 반환 (Accept: application/x-ndjson 또는 ?stream=true면 완료 순 NDJSON)"""
+    try:
+        items, timeout = batch_executor.parse(await request.body())
+    except HTTPException as he:
+        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code)
+
+    headers = batch_executor.forward_headers(request.headers)
+    annotate(service="batch", batch_items=len(items))
+    ndjson = (
+        "application/x-ndjson" in request.headers.get("accept", "")
+        or request.query_params.get("stream", "").lower() in ("1", "true", "yes")
+    )
+    if ndjson:
+        return StreamingResponse(batch_executor.stream(items, headers, timeout), media_type="application/x-ndjson")
+    return Response(content=await batch_executor.run(items, headers, timeout), media_type="application/json")
+
+
+@gateway_router.get("/gateway/batch", summary="배치 프록시 통계")
+async def batch_stats():
+    return {
+        "batch": batch_executor.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/streams", summary="SSE/WebSocket 스트림 프록시 통계")
+async def stream_stats():
+    return {
+        "streams": stream_proxy.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/colocated", summary="단일 프로세스 모드 서비스 상태")
+async def colocated_stats():
+    return {
+        "colocated": colocated_services.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/idempotency", summary="Idempotency-Key 저장소 상태")
+async def idempotency_stats():
+    return {
+        "idempotency": idempotency_store.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/mirror", summary="섀도 트래픽 미러링 통계 (지연/응답 차이)")
+async def mirror_stats():
+    return {
+        "mirror": traffic_mirror.stats(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+@gateway_router.get("/gateway/uploads", summary="파일 업로드 프록시 통계")
+async def upload_stats():
+    return {
+        "uploads": upload_proxy.stats(),
+        "services": sorted(FILE_REQUIRED_SERVICES),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+# ---------- Streams (SSE / WebSocket) ----------
+async def proxy_event_stream(
+    service: ServiceType, method: str, path: str, request: Request, body: Optional[bytes] = None
+) -> Response:
+    """Accept: text/event-stream 요청: 이벤트를 버퍼링 없이 중계 (서비스별 동시 스트림 상한 적용)"""
+    resp, events = await stream_proxy.open_event_stream(
+        service,
+        method,
+        path,
+        headers=dict(request.headers),
+        body=body,
+        params=request.query_params.multi_items() or None,
+    )
+    if events is None:
+        return ResponseFactory.create_streaming_response(resp)
+    return ResponseFactory.create_event_stream_response(resp, events)
+
+
+@gateway_router.websocket("/{service}/{path:path}")
+async def proxy_websocket(websocket: WebSocket, service: ServiceType, path: str):
+    """WebSocket 프록시: 업스트림 연결 후 양방향 프레임 중계"""
+    await stream_proxy.relay_websocket(service, path, websocket)
+
+
 # ---------- Proxy ----------
 @gateway_router.get("/{service}/{path:path}", summary="GET 프록시")
 async def proxy_get(service: ServiceType, path: str, request: Request):
     try:
-        factory = ServiceProxyFactory(service_type=service)
+        # SSE 구독은 캐시/요청 병합 없이 스트림으로 중계
+        if wants_event_stream(request.headers):
+            return await proxy_event_stream(service, "GET", path, request)
+
+        factory = ServiceProxyFactory.for_service(service)
         headers = dict(request.headers)
-        params = dict(request.query_params)
-        resp = await factory.request(
-            method="GET",
-            path=path,
-            headers=headers,
-            params=params,
+        params = request.query_params.multi_items()
+        streaming = use_streaming(path)
+
+        # 카탈로그성 GET은 라우트별 TTL 동안 게이트웨이 캐시에서 응답
+        cache_ttl = None if streaming else response_cache.ttl_for(service.value, path)
+        if cache_ttl:
+            cache_key = response_cache.base_key(service.value, path, request.query_params.multi_items())
+            cached = response_cache.lookup(cache_key, request.headers)
+            if cached is not None:
+                annotate(service=service.value, cache="HIT")
+                return ResponseFactory.create_cached_response(cached, request.headers, hit=True)
+
+        if streaming:
+            resp = await factory.request(
+                method="GET",
+                path=path,
+                headers=headers,
+                params=params,
+                stream=True,
+            )
+        else:
+            # 동시에 들어온 동일 GET은 업스트림 호출 하나를 공유
+            flight_key = coalesce_key(
+                service.value, factory.upstream_path(path), request.query_params.multi_items(), request.headers
+            )
+            fetch = lambda: request_coalescer.do(
+                flight_key,
+                lambda: factory.request(method="GET", path=path, headers=headers, params=params),
+            )
+            flight_started = time.perf_counter()
+            if cache_ttl:
+                # 로컬 미스: 공유 캐시 조회, 거기서도 미스면 레플리카 간 한 곳만 업스트림 호출 (stampede 방지)
+                cached, resp = await response_cache.fetch(cache_key, request.headers, cache_ttl, fetch)
+            else:
+                resp = await fetch()
+            if resp is not None:
+                # 진행 중인 호출에 합류한 요청은 기다린 시간을 업스트림 시간으로 집계
+                default_timing("upstream_ms", time.perf_counter() - flight_started)
+        if cache_ttl and cached is not None:
+            if resp is None:
+                # 공유 캐시(다른 레플리카가 채운 항목) 적중
+                annotate(service=service.value, cache="HIT")
+                return ResponseFactory.create_cached_response(cached, request.headers, hit=True)
+            annotate(cache="MISS")
+            response = ResponseFactory.create_cached_response(cached, request.headers, hit=False)
+            return mirror_after(response, service, "GET", path, request, resp, params=params)
+        if streaming:
+            return ResponseFactory.create_streaming_response(resp)
+        return mirror_after(
+            ResponseFactory.create_response(resp), service, "GET", path, request, resp, params=params
         )
-        return ResponseFactory.create_response(resp)
     except HTTPException as he:
-        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code)
+        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code, headers=he.headers)
     except Exception as e:
         logger.error(f"Error in GET proxy: {str(e)}")
         return JSONResponse(content={"detail": f"Error processing request: {str(e)}"}, status_code=500)
 
 
-@gateway_router.post("/{service}/{path:path}", summary="POST 프록시 (JSON 전용)")
-async def proxy_post_json(
-    service: ServiceType,
-    path: str,
-    request: Request,
-    # ✅ JSON 전용 바디 선언 → Swagger에 JSON 에디터 표시
-    payload: Dict[str, Any] = Body(
-        ...,  # required
-        example={"auth_id": "test@example.com", "auth_pw": "****"}
-    ),
-):
-    logger.info(f"🚀 POST 프록시(JSON) 시작: service={service}, path={path}")
-    logger.info(f"🚀 요청 URL: {request.url}")
-    logger.info(f"🔍 받은 payload: {payload}")
-
+async def proxy_upload(service: ServiceType, path: str, request: Request) -> Response:
+    """multipart/form-data POST: 업로드 허용 서비스만 받아 스풀한 뒤 업스트림으로 스트리밍"""
+    if service.value not in FILE_REQUIRED_SERVICES:
+        return JSONResponse(
+            content={"detail": f"Service {service.value} does not accept file uploads"},
+            status_code=415,
+        )
+    streaming = use_streaming(path)
+    resp = await upload_proxy.forward(service, path, request, stream=streaming)
+    return ResponseFactory.create(resp, streaming)
+
+
+@gateway_router.post(
+    "/{service}/{path:path}",
+    summary="POST 프록시 (JSON / 파일 업로드)",
+    # ✅ 본문은 직접 읽지만 Swagger에는 JSON 에디터/파일 선택이 보이도록 스키마만 선언
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "object"},
+                    "example": {"auth_id": "test@example.com", "auth_pw": "****"},
+                },
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    },
+                },
+            },
+        }
+    },
+)
+async def proxy_post_json(service: ServiceType, path: str, request: Request):
     try:
-        factory = ServiceProxyFactory(service_type=service)
+        # JSON 전용: 파싱 대신 content-type만 확인 (multipart는 파일 업로드 프록시로)
+        content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+        if content_type == "multipart/form-data":
+            return await proxy_upload(service, path, request)
+        if content_type != "application/json" and not content_type.endswith("+json"):
+            return JSONResponse(
+                content={"detail": "Content-Type must be application/json"},
+                status_code=415,
+            )
+
+        # ✅ 원본 요청 바이트를 dict 변환/재직렬화 없이 그대로 전달
+        body = await request.body()
+        if not body:
+            return JSONResponse(content={"detail": "Request body is required"}, status_code=422)
+
+        # 라우트별로 켜진 경우에만 스키마 검증 (GATEWAY_VALIDATE_POST_ROUTES)
+        validate_post_body(service, path, body)
+
+        # 챗봇 답변처럼 POST 응답을 SSE로 받는 경우
+        if wants_event_stream(request.headers):
+            return await proxy_event_stream(service, "POST", path, request, body=body)
+
+        factory = ServiceProxyFactory.for_service(service)
         headers = dict(request.headers)
-        headers["content-type"] = "application/json"
-        
-        # Content-Length 헤더 제거 (자동 계산되도록)
-        if "content-length" in headers:
-            del headers["content-length"]
-        
-        # payload를 JSON 문자열로 변환하여 body 생성
-        body = json.dumps(payload).encode('utf-8')
-        
-        # Auth 서비스 요청에 대한 상세 로깅(민감정보 마스킹)
-        if service == ServiceType.auth:
-            logger.info(f"🔍 === Auth 서비스 요청 로깅 시작 ===")
-            logger.info(f"🔍 Payload 타입: {type(payload)}")
-            logger.info(f"🔍 Payload 내용: {payload}")
-            logger.info(f"🔍 Body 길이: {len(body)} bytes")
-            
-            try:
-                if path == "login":
-                    logger.info("=== 로그인 Alert 데이터 (Gateway Generic Proxy) ===")
-                    logger.info(f"Auth ID: {payload.get('auth_id')}")
-                    pw = payload.get("auth_pw")
-                    masked_pw = "*" * len(pw) if isinstance(pw, str) else None
-                    logger.info(f"Auth PW: {masked_pw}")
-                    logger.info("=== Alert 데이터 끝 (Gateway Generic Proxy) ===")
-                elif path == "signup":
-                    logger.info("=== 회원가입 Alert 데이터 (Gateway Generic Proxy) ===")
-                    logger.info(f"ID: {payload.get('id')}")
-                    logger.info(f"Company ID: {payload.get('company_id')}")
-                    logger.info(f"Industry: {payload.get('industry')}")
-                    logger.info(f"Email: {payload.get('email')}")
-                    logger.info(f"Name: {payload.get('name')}")
-                    logger.info(f"Age: {payload.get('age')}")
-                    logger.info(f"Auth ID: {payload.get('auth_id')}")
-                    pw = payload.get("auth_pw")
-                    masked_pw = "*" * len(pw) if isinstance(pw, str) else None
-                    logger.info(f"Auth PW: {masked_pw}")
-                    logger.info("=== Alert 데이터 끝 (Gateway Generic Proxy) ===")
-                    
-            except Exception as e:
-                logger.error(f"❌ Auth 서비스 요청 로깅 중 예외 발생: {e}")
-                logger.error(f"❌ Exception type: {type(e)}")
-                import traceback
-                logger.error(f"❌ Traceback: {traceback.format_exc()}")
-            
-            logger.info(f"🔍 === Auth 서비스 요청 로깅 끝 ===")
-
-        logger.info(f"🔗 {service} 서비스로 요청 전달 중...")
-        logger.info(f"🔍 요청 경로: {path}")
-        logger.info(f"🔍 변환된 경로: {factory.upstream_path(path)}")
-        logger.info(f"🔍 최종 URL: {factory.base_urls.get(service)}{factory.upstream_path(path)}")
-        
+
+        streaming = use_streaming(path)
+        # 재시도 POST는 한 번만 실행하고 저장된 결과를 재전송 (스트리밍 응답은 저장하지 않음)
+        idempotency_key = request.headers.get(IDEMPOTENCY_HEADER)
+        if idempotency_key is not None and not streaming:
+            return await proxy_idempotent_post(service, factory, path, request, body, idempotency_key)
+
         resp = await factory.request(
             method="POST",
             path=path,
@@ -236,14 +639,14 @@ async def proxy_post_json(
             files=None,
             params=None,
             data=None,
+            stream=streaming,
         )
-        
-        logger.info(f"✅ {service} 서비스 응답 수신 완료")
-        logger.info("🚀 === Gateway POST 요청 완료 ===")
-        return ResponseFactory.create_response(resp)
+        if streaming:
+            return ResponseFactory.create_streaming_response(resp)
+        return mirror_after(ResponseFactory.create_response(resp), service, "POST", path, request, resp, body=body)
 
     except HTTPException as he:
-        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code)
+        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code, headers=he.headers)
     except Exception as e:
         logger.error(f"🚨 POST(JSON) 처리 중 오류: {e}", exc_info=True)
         return JSONResponse(
@@ -252,23 +655,53 @@ async def proxy_post_json(
         )
 
 
+async def proxy_idempotent_post(
+    service: ServiceType, factory: ServiceProxyFactory, path: str, request: Request, body: bytes, idempotency_key: str
+) -> Response:
+    """Idempotency-Key POST: 처리 중이면 합류, 완료된 결과가 있으면 재전송, 없으면 실행 후 저장"""
+    upstream_path = factory.upstream_path(path)
+    key = idempotency_store.scope_key(service.value, upstream_path, idempotency_key, request.headers)
+    fingerprint = idempotency_store.fingerprint("POST", upstream_path, request.query_params.multi_items(), body)
+    headers = dict(request.headers)
+    result, outcome = await idempotency_store.execute(
+        key,
+        fingerprint,
+        lambda: factory.request(method="POST", path=path, headers=headers, body=body),
+    )
+    annotate(idempotency=outcome)
+    if isinstance(result, StoredResponse):
+        return ResponseFactory.create_stored_response(result)
+    response = ResponseFactory.create_response(result)
+    if outcome == "joined":
+        response.headers[REPLAYED_HEADER] = "true"
+    return response
+
+
 @gateway_router.put("/{service}/{path:path}", summary="PUT 프록시")
 async def proxy_put(service: ServiceType, path: str, request: Request):
     try:
-        factory = ServiceProxyFactory(service_type=service)
+        factory = ServiceProxyFactory.for_service(service)
         headers = dict(request.headers)
-        body = await request.body()
-        params = dict(request.query_params)
+        streaming = use_streaming(path)
+        # 스트리밍 모드에서는 요청 본문도 메모리에 모으지 않고 바로 업스트림으로 전달
+        body = request.stream() if streaming else await request.body()
+        params = request.query_params.multi_items()
         resp = await factory.request(
             method="PUT",
             path=path,
             headers=headers,
             body=body,
             params=params,
+            stream=streaming,
+        )
+        if streaming:
+            return ResponseFactory.create_streaming_response(resp)
+        return mirror_after(
+            ResponseFactory.create_response(resp), service, "PUT", path, request, resp,
+            params=params, body=body,
         )
-        return ResponseFactory.create_response(resp)
     except HTTPException as he:
-        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code)
+        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code, headers=he.headers)
     except Exception as e:
         logger.error(f"Error in PUT proxy: {str(e)}")
         return JSONResponse(content={"detail": f"Error processing request: {str(e)}"}, status_code=500)
@@ -277,18 +710,25 @@ async def proxy_put(service: ServiceType, path: str, request: Request):
 @gateway_router.delete("/{service}/{path:path}", summary="DELETE 프록시")
 async def proxy_delete(service: ServiceType, path: str, request: Request):
     try:
-        factory = ServiceProxyFactory(service_type=service)
+        factory = ServiceProxyFactory.for_service(service)
         headers = dict(request.headers)
-        params = dict(request.query_params)
+        params = request.query_params.multi_items()
+        streaming = use_streaming(path)
         resp = await factory.request(
             method="DELETE",
             path=path,
             headers=headers,
             params=params,
+            stream=streaming,
+        )
+        if streaming:
+            return ResponseFactory.create_streaming_response(resp)
+        return mirror_after(
+            ResponseFactory.create_response(resp), service, "DELETE", path, request, resp,
+            params=params,
         )
-        return ResponseFactory.create_response(resp)
     except HTTPException as he:
-        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code)
+        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code, headers=he.headers)
     except Exception as e:
         logger.error(f"Error in DELETE proxy: {str(e)}")
         return JSONResponse(content={"detail": f"Error processing request: {str(e)}"}, status_code=500)
@@ -297,25 +737,124 @@ async def proxy_delete(service: ServiceType, path: str, request: Request):
 @gateway_router.patch("/{service}/{path:path}", summary="PATCH 프록시")
 async def proxy_patch(service: ServiceType, path: str, request: Request):
     try:
-        factory = ServiceProxyFactory(service_type=service)
+        factory = ServiceProxyFactory.for_service(service)
         headers = dict(request.headers)
-        body = await request.body()
-        params = dict(request.query_params)
+        streaming = use_streaming(path)
+        # 스트리밍 모드에서는 요청 본문도 메모리에 모으지 않고 바로 업스트림으로 전달
+        body = request.stream() if streaming else await request.body()
+        params = request.query_params.multi_items()
         resp = await factory.request(
             method="PATCH",
             path=path,
             headers=headers,
             body=body,
             params=params,
+            stream=streaming,
+        )
+        if streaming:
+            return ResponseFactory.create_streaming_response(resp)
+        return mirror_after(
+            ResponseFactory.create_response(resp), service, "PATCH", path, request, resp,
+            params=params, body=body,
         )
-        return ResponseFactory.create_response(resp)
     except HTTPException as he:
-        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code)
+        return JSONResponse(content={"detail": he.detail}, status_code=he.status_code, headers=he.headers)
     except Exception as e:
         logger.error(f"Error in PATCH proxy: {str(e)}")
         return JSONResponse(content={"detail": f"Error processing request: {str(e)}"}, status_code=500)
 
 
+_BREAKER_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def _collect_runtime_metrics():
+    """/metrics 조회 시점의 풀/캐시/브레이커/동시성 제한/레플리카 상태"""
+    pools = client_registry.stats()
+    yield gauge("gateway_upstream_pool_connections", "Upstream pool connections by state", [
+        ({"service": svc, "state": state}, pool[state])
+        for svc, pool in pools.items() for state in ("active", "idle")
+    ])
+    yield gauge("gateway_upstream_pool_utilization", "Active upstream connections / max_connections", [
+        ({"service": svc}, pool["active"] / pool["max_connections"] if pool["max_connections"] else 0.0)
+        for svc, pool in pools.items()
+    ])
+
+    cache = response_cache.stats()
+    yield gauge("gateway_cache_lookups_total", "Response cache lookups by result", [
+        ({"result": "hit"}, cache["hits"]),
+        ({"result": "shared_hit"}, cache["shared_hits"]),
+        ({"result": "miss"}, cache["misses"] - cache["shared_hits"]),
+    ], metric_type="counter")
+    yield gauge("gateway_cache_hit_ratio", "Response cache hit ratio (local + shared)", [({}, cache["hit_ratio"])])
+    yield gauge("gateway_cache_bytes", "Bytes held by the response cache", [({}, cache["bytes"])])
+    coalescing = request_coalescer.stats()
+    yield gauge("gateway_coalesced_requests_total", "GET requests served by joining an in-flight call", [
+        ({}, coalescing["coalesced"]),
+    ], metric_type="counter")
+
+    yield gauge("gateway_circuit_breaker_state", "Circuit state (0=closed, 1=half_open, 2=open)", [
+        ({"service": svc}, _BREAKER_STATE_VALUES[snap["state"]])
+        for svc, snap in circuit_breakers.snapshot().items()
+    ])
+
+    limits = concurrency_limiters.snapshot()
+    services = limits["services"]
+    yield gauge("gateway_concurrency_limit", "Adaptive concurrency limit", [
+        ({"service": svc}, snap["limit"]) for svc, snap in services.items()
+    ])
+    yield gauge("gateway_upstream_in_flight", "Upstream calls in flight", [
+        ({"service": svc}, snap["in_flight"]) for svc, snap in services.items()
+    ])
+    yield gauge("gateway_concurrency_queued", "Requests waiting for a concurrency slot", [
+        ({"service": svc}, snap["queued"]) for svc, snap in services.items()
+    ])
+    yield gauge("gateway_shed_requests_total", "Requests rejected by load shedding", [
+        ({"service": svc, "priority": priority}, count)
+        for svc, snap in [*services.items(), ("gateway", limits["gateway"])]
+        for priority, count in snap["shed"].items()
+    ], metric_type="counter")
+
+    replicas = [(svc, replica) for svc, balancer in load_balancers.items() for replica in balancer.replicas]
+    yield gauge("gateway_replica_in_flight", "Requests in flight per upstream replica", [
+        ({"service": svc, "replica": replica.url}, replica.in_flight) for svc, replica in replicas
+    ])
+    yield gauge("gateway_replica_latency_ewma_seconds", "EWMA upstream latency per replica", [
+        ({"service": svc, "replica": replica.url}, replica.ewma_latency) for svc, replica in replicas
+    ])
+    yield gauge("gateway_upstream_up", "Active health check result per replica (1=routable)", [
+        ({"service": svc, "replica": replica.url}, 1 if replica.healthy else 0) for svc, replica in replicas
+    ])
+    streams = stream_proxy.stats()
+    yield gauge("gateway_streams_active", "Long-lived SSE/WebSocket streams in progress", [
+        ({"service": svc, "kind": kind}, count)
+        for svc, counts in streams["active"].items() for kind, count in counts.items()
+    ])
+    yield gauge("gateway_streams_rejected_total", "Streams rejected by the per-service stream limit", [
+        ({"service": svc}, count) for svc, count in streams["rejected"].items()
+    ], metric_type="counter")
+    yield gauge("gateway_stream_keepalives_total", "SSE keepalive comments sent to idle clients", [
+        ({}, streams["keepalives"]),
+    ], metric_type="counter")
+    idempotency = idempotency_store.stats()
+    yield gauge("gateway_idempotency_requests_total", "Idempotency-Key POSTs by outcome", [
+        ({"result": result}, idempotency[result]) for result in ("executed", "replayed", "joined", "mismatched")
+    ], metric_type="counter")
+    yield gauge("gateway_idempotency_entries", "Completed responses held for Idempotency-Key replay", [
+        ({}, idempotency["entries"]),
+    ])
+    yield gauge("gateway_log_records_dropped_total", "Log records dropped because the log queue was full", [
+        ({}, dropped_records()),
+    ], metric_type="counter")
+
+
+metrics.register_collector(_collect_runtime_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc):
     return JSONResponse(content={"detail": "Service not found"}, status_code=404)
@@ -330,32 +869,10 @@ async def root():
     }
 
 # 라우터를 앱에 포함 (generic proxy만 사용)
+# /api/v1/{service}/{path} 프록시 라우트보다 먼저 매칭되도록 먼저 등록
+app.include_router(discovery_router)
 app.include_router(gateway_router)
 
-# 모든 요청 로깅 미들웨어 추가
-@app.middleware("http")
-async def log_all_requests(request: Request, call_next):
-    start_time = datetime.now()
-    client_host = request.client.host if request.client else "unknown"
-    
-    logger.info(f"🌐 === Gateway 요청 수신 ===")
-    logger.info(f"📅 시간: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    logger.info(f"🌐 클라이언트: {client_host}")
-    logger.info(f"📋 메서드: {request.method}")
-    logger.info(f"📍 경로: {request.url.path}")
-    logger.info(f"🔗 전체 URL: {request.url}")
-    logger.info(f"📋 User-Agent: {request.headers.get('user-agent', 'N/A')}")
-    logger.info(f"🌐 === 요청 로깅 끝 ===")
-    
-    try:
-        response = await call_next(request)
-        process_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"✅ 응답 완료: {response.status_code} ({process_time:.3f}s)")
-        return response
-    except Exception as e:
-        logger.error(f"❌ 요청 처리 중 오류: {str(e)}")
-        raise
-
 # ✅ uvicorn 실행 경로 단순화
 if __name__ == "__main__":
     import uvicorn
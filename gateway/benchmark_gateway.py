@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+게이트웨이 오버헤드 벤치마크 스크립트
+
+업스트림을 httpx.MockTransport로 대체해 네트워크 비용 없이
+게이트웨이 자체의 요청 처리 비용(라우팅/헤더 정리/응답 생성)만 측정한다.
+
+사용법: python benchmark_gateway.py [요청 수] [동시성]
+"""
+
+import asyncio
+import sys
+import os
+import time
+import logging
+import timeit
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx
+
+from app.main import app
+from app.domain.model.client_registry import client_registry
+from app.domain.model.service_factory import ServiceType, get_route_table
+
+UPSTREAM_BODY = b'{"standards": [{"code": "GRI-101", "name": "Foundation", "version": "2016"}]}'
+
+
+def mock_upstream(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, content=UPSTREAM_BODY, headers={"content-type": "application/json"})
+
+
+async def run_load(client: httpx.AsyncClient, method: str, url: str, total: int, concurrency: int, **kwargs):
+    latencies = []
+    queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    async def worker():
+        while not queue.empty():
+            queue.get_nowait()
+            start = time.perf_counter()
+            resp = await client.request(method, url, **kwargs)
+            latencies.append(time.perf_counter() - start)
+            assert resp.status_code == 200, resp.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1e6
+    print(f"  {method:<5} {url:<32} {total / elapsed:>9.0f} req/s  p50={p50:>7.0f}µs  p99={p99:>7.0f}µs")
+
+
+def bench_route_lookup():
+    """라우팅 테이블 조회 + 경로 변환만 따로 측정"""
+    table = get_route_table()
+    n = 200_000
+    sec = timeit.timeit(lambda: table[ServiceType.auth].upstream_path("login"), number=n)
+    print(f"  route lookup + upstream_path: {sec / n * 1e9:.0f} ns/op")
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    logging.disable(logging.INFO)
+    client_registry.transport_factory = lambda service_type: httpx.MockTransport(mock_upstream)
+
+    print(f"🧪 게이트웨이 오버헤드 벤치마크 (요청 {total}개, 동시성 {concurrency})")
+    bench_route_lookup()
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://gateway") as client:
+            await run_load(client, "GET", "/api/v1/gri/standards", total, concurrency)
+            await run_load(
+                client, "POST", "/api/v1/auth/login", total, concurrency,
+                content=b'{"auth_id": "test@example.com", "auth_pw": "****"}',
+                headers={"content-type": "application/json"},
+            )
+
+    print("🎉 벤치마크 완료!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
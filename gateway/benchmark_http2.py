@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+업스트림 HTTP/1.1 vs HTTP/2 비교 벤치마크
+
+게이트웨이와 같은 UpstreamClientRegistry 설정(풀 크기, 스트림 제한)으로
+실제 업스트림에 동시 요청을 보내 처리량/지연/사용한 연결 수를 비교한다.
+h2c를 비교하려면 업스트림이 평문 HTTP/2를 지원해야 한다 (예: hypercorn app.main:app).
+
+사용법: python benchmark_http2.py URL [요청 수] [동시성] [비교할 버전들]
+  python benchmark_http2.py http://127.0.0.1:8080/health 5000 200 1.1,h2c
+"""
+
+import asyncio
+import sys
+import os
+import time
+import logging
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.domain.model.client_registry import HTTP2_AVAILABLE, UpstreamClientRegistry
+
+
+async def run_load(registry: UpstreamClientRegistry, url: str, total: int, concurrency: int):
+    client = registry.get("bench")
+    latencies = []
+    peak_connections = 0
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                resp = await client.get(url)
+                if resp.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    async def sample_connections():
+        nonlocal peak_connections
+        while True:
+            stats = registry.stats().get("bench", {})
+            peak_connections = max(peak_connections, stats.get("connections", 0))
+            await asyncio.sleep(0.01)
+
+    sampler = asyncio.create_task(sample_connections())
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+
+    stats = registry.stats()["bench"]
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000
+    print(
+        f"  {stats['http_version']:<15} {total / elapsed:>8.0f} req/s  p50={p50:>7.2f}ms  p99={p99:>7.2f}ms  "
+        f"peak_connections={peak_connections:<4} errors={errors}"
+    )
+    await registry.aclose()
+
+
+async def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    url = sys.argv[1]
+    total = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+    versions = (sys.argv[4] if len(sys.argv) > 4 else "1.1,h2c" if url.startswith("http://") else "1.1,h2").split(",")
+
+    logging.disable(logging.INFO)
+    if not HTTP2_AVAILABLE:
+        print("⚠️ h2 패키지가 없어 HTTP/2 비교를 할 수 없습니다 (pip install 'httpx[http2]')")
+        versions = ["1.1"]
+
+    print(f"🧪 업스트림 HTTP 버전 비교 ({url}, 요청 {total}개, 동시성 {concurrency})")
+    for version in versions:
+        registry = UpstreamClientRegistry(http_version=version)
+        # 워밍업 (연결 수립/h2c 폴백 판정)
+        await registry.get("bench").get(url)
+        await run_load(registry, url, total, concurrency)
+
+    print("🎉 벤치마크 완료!")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
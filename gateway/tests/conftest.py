@@ -0,0 +1,79 @@
+"""
+게이트웨이 테스트 공통 fixture
+
+업스트림 서비스는 httpx.MockTransport로 대체하고(client_registry.transport_factory),
+게이트웨이 앱은 lifespan 없이 httpx.ASGITransport로 직접 호출한다.
+서킷 브레이커/동시성 제한/캐시/Idempotency 저장소 같은 전역 상태는 테스트마다 새로 만든다.
+pytest-asyncio 없이 동작하도록 비동기 시나리오는 asyncio.run으로 실행한다.
+"""
+from typing import Awaitable, Callable, List, Union
+import inspect
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GATEWAY_HEALTH_CHECK", "false")
+
+from app.main import app as gateway_app  # noqa: E402
+from app import main as main_module  # noqa: E402
+from app.domain.model import service_factory as service_factory_module  # noqa: E402
+from app.domain.model import stream_proxy as stream_proxy_module  # noqa: E402
+from app.domain.model.service_factory import compile_route_table  # noqa: E402
+from app.domain.model.client_registry import client_registry  # noqa: E402
+from app.domain.model.circuit_breaker import CircuitBreakerRegistry  # noqa: E402
+from app.domain.model.concurrency_limiter import ConcurrencyLimiterRegistry  # noqa: E402
+from app.common.utility.idempotency import idempotency_store  # noqa: E402
+from app.common.utility.response_cache import response_cache  # noqa: E402
+from app.common.utility.single_flight import SingleFlight  # noqa: E402
+
+Handler = Callable[[httpx.Request], Union[httpx.Response, Awaitable[httpx.Response]]]
+
+
+class Upstream:
+    """받은 요청을 기록하고 handler가 만든 응답을 돌려주는 가짜 업스트림"""
+
+    def __init__(self):
+        self.requests: List[httpx.Request] = []
+        self.handler: Handler = lambda request: httpx.Response(200, json={"ok": True})
+
+    @property
+    def calls(self) -> int:
+        return len(self.requests)
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.handler(request)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+
+@pytest.fixture
+def upstream(monkeypatch) -> Upstream:
+    upstream = Upstream()
+    monkeypatch.setattr(client_registry, "transport_factory", lambda service_type: httpx.MockTransport(upstream))
+    circuit_breakers, concurrency_limiters = CircuitBreakerRegistry(), ConcurrencyLimiterRegistry()
+    for module in (service_factory_module, stream_proxy_module):
+        monkeypatch.setattr(module, "circuit_breakers", circuit_breakers)
+        monkeypatch.setattr(module, "concurrency_limiters", concurrency_limiters)
+    monkeypatch.setattr(main_module, "request_coalescer", SingleFlight())
+    monkeypatch.setattr(response_cache, "shared", None)
+    client_registry._clients.clear()
+    response_cache.clear()
+    idempotency_store.clear()
+    compile_route_table()
+    yield upstream
+    client_registry._clients.clear()
+    response_cache.clear()
+    idempotency_store.clear()
+
+
+@pytest.fixture
+def gateway(upstream) -> Callable[[], httpx.AsyncClient]:
+    """게이트웨이 앱을 호출하는 클라이언트 생성기 (asyncio.run 안에서 async with로 사용)"""
+    def client() -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=gateway_app), base_url="http://gateway")
+    return client
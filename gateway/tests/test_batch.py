@@ -0,0 +1,114 @@
+"""
+배치 프록시 테스트 (부분 실패, 잘못된 JSON 본문 격리, POST 항목 검증/Idempotency-Key, 항목 헤더 허용 목록)
+"""
+import asyncio
+import json
+
+import httpx
+
+from app.domain.model import proxy_schema
+
+BATCH = "/api/v1/batch"
+
+
+def run_batch(gateway, requests, **kwargs):
+    async def scenario():
+        async with gateway() as client:
+            return await client.post(BATCH, json={"requests": requests}, **kwargs)
+    return asyncio.run(scenario())
+
+
+def test_invalid_json_body_does_not_break_batch(upstream, gateway):
+    bodies = {
+        "/v1/gri/ok": b'{"ok": true}',
+        "/v1/gri/proxy-error": b"<html><body>502 Bad Gateway</body></html>",
+        "/v1/gri/truncated": b'{"items": [1, 2',
+    }
+
+    def handler(request):
+        status = 200 if request.url.path.endswith("ok") else 502
+        return httpx.Response(status, content=bodies[request.url.path], headers={"content-type": "application/json"})
+    upstream.handler = handler
+
+    response = run_batch(gateway, [
+        {"id": "ok", "service": "gri", "path": "ok"},
+        {"id": "proxy-error", "service": "gri", "path": "proxy-error"},
+        {"id": "truncated", "service": "gri", "path": "truncated"},
+    ])
+
+    assert response.status_code == 200
+    payload = json.loads(response.content)
+    results = {result["id"]: result for result in payload["results"]}
+    assert results["ok"]["body"] == {"ok": True}
+    assert results["proxy-error"]["status"] == 502
+    assert results["proxy-error"]["body"] == "<html><body>502 Bad Gateway</body></html>"
+    assert results["truncated"]["body"] == '{"items": [1, 2'
+    assert (payload["succeeded"], payload["failed"]) == (1, 2)
+
+
+def test_invalid_json_body_in_ndjson_stream(upstream, gateway):
+    upstream.handler = lambda request: httpx.Response(
+        200, content=b"not json\n{", headers={"content-type": "application/json"}
+    )
+
+    response = run_batch(gateway, [{"service": "gri", "path": "broken"}], params={"stream": "true"})
+    lines = response.content.decode().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["body"] == "not json\n{"
+
+
+def test_post_items_go_through_route_validation(upstream, gateway, monkeypatch):
+    monkeypatch.setattr(proxy_schema, "VALIDATED_POST_ROUTES", frozenset({"auth/login"}))
+
+    response = run_batch(gateway, [
+        {"id": "invalid", "service": "auth", "method": "POST", "path": "login", "body": {"auth_id": "a"}},
+        {"id": "missing", "service": "auth", "method": "POST", "path": "login"},
+        {"id": "valid", "service": "auth", "method": "POST", "path": "login",
+         "body": {"auth_id": "alice", "auth_pw": "secret"}},
+    ])
+
+    results = {result["id"]: result for result in response.json()["results"]}
+    assert results["invalid"]["status"] == 422
+    assert {error["loc"][-1] for error in results["invalid"]["body"]["detail"]} == {"auth_id", "auth_pw"}
+    assert results["missing"]["status"] == 422
+    assert results["valid"]["status"] == 200
+    assert upstream.calls == 1
+
+
+def test_post_items_honour_idempotency_key(upstream, gateway):
+    upstream.handler = lambda request: httpx.Response(201, json={"id": len(upstream.requests)})
+    item = {"service": "gri", "method": "POST", "path": "companies", "body": {"name": "acme"},
+            "headers": {"Idempotency-Key": "batch-1"}}
+
+    first = run_batch(gateway, [item]).json()["results"][0]
+    retry = run_batch(gateway, [item]).json()["results"][0]
+    mismatch = run_batch(gateway, [{**item, "body": {"name": "other"}}]).json()["results"][0]
+
+    assert first["status"] == retry["status"] == 201
+    assert retry["body"] == first["body"] == {"id": 1}
+    assert mismatch["status"] == 422
+    assert upstream.calls == 1
+
+
+def test_item_headers_are_filtered(upstream, gateway):
+    response = run_batch(gateway, [{
+        "service": "gri",
+        "path": "companies",
+        "headers": {
+            "Host": "evil.example",
+            "X-Request-Timeout-Ms": "99999999",
+            "Connection": "close",
+            "X-Internal-Admin": "true",
+            "Accept": "text/csv",
+            "Authorization": "Bearer item-token",
+        },
+    }], headers={"authorization": "Bearer batch-token"})
+
+    assert response.json()["results"][0]["status"] == 200
+    sent = upstream.requests[0].headers
+    assert sent["host"] != "evil.example"
+    assert int(sent["x-request-timeout-ms"]) <= 5000
+    assert "x-internal-admin" not in sent
+    assert sent.get("connection") != "close"
+    assert sent["accept"] == "text/csv"
+    assert sent["authorization"] == "Bearer item-token"
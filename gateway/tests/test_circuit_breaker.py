@@ -0,0 +1,160 @@
+"""
+서킷 브레이커 테스트 (closed → open → half-open → closed, probe 슬롯 계산)
+"""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.domain.model import service_factory as service_factory_module
+from app.domain.model.circuit_breaker import BreakerState, CircuitBreaker, CircuitOpenError
+from app.domain.model.load_balancer import load_balancers
+
+COMPANIES = "/api/v1/gri/companies"
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    options = dict(
+        window_seconds=30, min_requests=4, error_rate_threshold=0.5, slow_call_seconds=1.0,
+        slow_call_rate_threshold=0.8, open_seconds=0.05, half_open_probes=2,
+    )
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def trip(breaker: CircuitBreaker) -> None:
+    for success in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(success, 0.01)
+
+
+def test_opens_when_error_rate_crosses_threshold():
+    breaker = make_breaker()
+    for success in (True, False, True):
+        breaker.before_call()
+        breaker.record(success, 0.01)
+    # 최소 요청 수 전에는 에러율이 높아도 닫힌 상태 유지
+    assert breaker.state == BreakerState.closed
+
+    breaker.before_call()
+    breaker.record(False, 0.01)
+    assert breaker.state == BreakerState.open
+    with pytest.raises(CircuitOpenError) as exc:
+        breaker.before_call()
+    assert 0 < exc.value.retry_after <= breaker.open_seconds
+
+
+def test_opens_on_slow_calls():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.before_call()
+        breaker.record(True, 2.0)
+    assert breaker.state == BreakerState.open
+
+
+def test_half_open_limits_probes_and_closes_after_successes():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(0.06)
+
+    breaker.before_call()
+    assert breaker.state == BreakerState.half_open
+    breaker.before_call()
+    assert breaker._probes_in_flight == 2
+    # probe 슬롯이 모두 사용 중이면 추가 호출은 거절
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record(True, 0.01)
+    assert breaker.state == BreakerState.half_open
+    breaker.record(True, 0.01)
+    assert breaker.state == BreakerState.closed
+    assert breaker._probes_in_flight == 0
+    breaker.before_call()
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    trip(breaker)
+    time.sleep(0.06)
+
+    breaker.before_call()
+    breaker.record(False, 0.01)
+    assert breaker.state == BreakerState.open
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_abandoned_probe_returns_slot():
+    breaker = make_breaker(half_open_probes=1)
+    trip(breaker)
+    time.sleep(0.06)
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.abandon()
+    assert breaker._probes_in_flight == 0
+    breaker.before_call()
+
+
+@pytest.fixture
+def fast_breaker(upstream, monkeypatch):
+    monkeypatch.setenv("CIRCUIT_BREAKER_MIN_REQUESTS", "4")
+    monkeypatch.setenv("CIRCUIT_BREAKER_ERROR_RATE", "0.5")
+    monkeypatch.setenv("CIRCUIT_BREAKER_OPEN_SECONDS", "0.05")
+    monkeypatch.setenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", "1")
+    return service_factory_module.circuit_breakers.get("gri")
+
+
+def test_open_circuit_sheds_without_calling_upstream(upstream, gateway, fast_breaker):
+    upstream.handler = lambda request: httpx.Response(500, json={"detail": "boom"})
+
+    async def scenario():
+        async with gateway() as client:
+            failures = [await client.get(COMPANIES) for _ in range(4)]
+            return failures, await client.get(COMPANIES)
+
+    failures, shed = asyncio.run(scenario())
+    assert [r.status_code for r in failures] == [500] * 4
+    assert fast_breaker.state == BreakerState.open
+    assert shed.status_code == 503
+    assert int(shed.headers["retry-after"]) >= 1
+    assert upstream.calls == 4
+
+
+def test_probe_closes_circuit_through_gateway(upstream, gateway, fast_breaker):
+    trip(fast_breaker)
+    time.sleep(0.06)
+
+    async def scenario():
+        async with gateway() as client:
+            return await client.get(COMPANIES)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert fast_breaker.state == BreakerState.closed
+    assert upstream.calls == 1
+
+
+def test_rejected_before_upstream_does_not_leak_probe_slot(upstream, gateway, fast_breaker, monkeypatch):
+    trip(fast_breaker)
+    time.sleep(0.06)
+    replica = load_balancers.get("gri").replicas[0]
+    monkeypatch.setattr(replica, "healthy", False)
+
+    async def scenario():
+        async with gateway() as client:
+            # 레플리카 선택 단계에서 실패한 요청은 probe 슬롯을 잡지 않아야 함
+            unavailable = [await client.get(COMPANIES) for _ in range(3)]
+            replica.healthy = True
+            return unavailable, await client.get(COMPANIES)
+
+    unavailable, probe = asyncio.run(scenario())
+    assert [r.status_code for r in unavailable] == [503] * 3
+    assert all("no healthy replicas" in r.json()["detail"] for r in unavailable)
+    assert fast_breaker._probes_in_flight == 0
+    assert probe.status_code == 200
+    assert fast_breaker.state == BreakerState.closed
+    assert upstream.calls == 1
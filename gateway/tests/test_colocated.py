@@ -0,0 +1,95 @@
+"""
+단일 프로세스(co-located) 모드 테스트 (서비스별 `app` 패키지 분리, 게이트웨이 → 프로세스 내부 서비스 호출)
+"""
+import asyncio
+import sys
+import textwrap
+from pathlib import Path
+
+import httpx
+import pytest
+
+from app.domain.model.client_registry import client_registry
+from app.domain.model.colocated import ColocatedServices, DEFAULT_SERVICES_DIR, service_package
+from app.domain.model.service_factory import compile_route_table
+
+GATEWAY_APP = sys.modules["app"]
+
+
+def write_service(root: Path, service: str, name: str) -> None:
+    """요청 처리 중에 `app...`을 지연 import하는 최소 서비스"""
+    package = root / f"{service}-service" / "app"
+    (package / "domain").mkdir(parents=True)
+    (package / "domain" / "__init__.py").write_text("")
+    (package / "domain" / "names.py").write_text(f"NAME = {name!r}\n")
+    (package / "main.py").write_text(textwrap.dedent("""
+        from fastapi import FastAPI
+
+        app = FastAPI()
+
+
+        @app.get("/whoami")
+        async def whoami():
+            from app.domain.names import NAME
+            import app.domain.names
+            import app.domain.names as names
+            return {"name": NAME, "module": app.domain.names.__name__, "same": names.NAME == NAME}
+    """))
+
+
+def call(services, service, path):
+    async def scenario():
+        transport = services.transport_for(service)
+        async with httpx.AsyncClient(transport=transport, base_url=f"http://{service}") as client:
+            return await client.get(path)
+    return asyncio.run(scenario())
+
+
+def test_services_named_app_are_loaded_side_by_side(tmp_path):
+    write_service(tmp_path, "gri", "gri-local")
+    write_service(tmp_path, "survey", "survey-local")
+    services = ColocatedServices(enabled=True, services=["gri", "survey"], root=str(tmp_path))
+    services.load()
+
+    assert sorted(services.apps) == ["gri", "survey"]
+    # 게이트웨이의 `app` 패키지는 그대로
+    assert sys.modules["app"] is GATEWAY_APP
+    gri = call(services, "gri", "/v1/gri/whoami").json()
+    survey = call(services, "survey", "/v1/survey/whoami").json()
+    assert gri == {"name": "gri-local", "module": f"{service_package('gri')}.app.domain.names", "same": True}
+    assert survey == {"name": "survey-local", "module": f"{service_package('survey')}.app.domain.names", "same": True}
+
+
+def test_failed_import_keeps_http_routing(tmp_path):
+    (tmp_path / "gri-service" / "app").mkdir(parents=True)
+    (tmp_path / "gri-service" / "app" / "main.py").write_text("from app.missing import nothing\n")
+    services = ColocatedServices(enabled=True, services=["gri"], root=str(tmp_path))
+    services.load()
+
+    assert services.apps == {}
+    assert "ModuleNotFoundError" in services.failed["gri"]
+    assert not any(name.startswith(service_package("gri")) for name in sys.modules)
+
+
+@pytest.mark.skipif(not (DEFAULT_SERVICES_DIR / "gri-service").is_dir(), reason="service/ 디렉터리 없음")
+def test_gateway_routes_to_colocated_services(upstream, gateway, monkeypatch):
+    services = ColocatedServices(enabled=True, services=["gri", "survey"])
+    services.load()
+    monkeypatch.setattr(client_registry, "transport_factory", services.transport_for)
+
+    async def scenario():
+        await services.start()
+        try:
+            async with gateway() as client:
+                return await client.get("/api/v1/gri/health"), await client.get("/api/v1/survey/health")
+        finally:
+            await services.stop()
+
+    try:
+        gri, survey = asyncio.run(scenario())
+    finally:
+        compile_route_table()
+    assert gri.status_code == survey.status_code == 200
+    assert gri.json()["service"] == "gri-service"
+    assert survey.json()["service"] == "survey-service"
+    assert upstream.calls == 0
@@ -0,0 +1,137 @@
+"""
+응답 압축 테스트 (Accept-Encoding 협상, 최소 크기/타입 제외, Vary, 스트리밍 증분 압축)
+"""
+import asyncio
+import gzip
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from app.common.utility.compression import CompressionMiddleware, MIN_BYTES, negotiate
+
+COMPANIES = "/api/v1/gri/companies"
+LARGE = {"items": [{"id": i, "name": f"company-{i}"} for i in range(200)]}
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "br"),
+    ("gzip;q=0.5, br", "br"),
+    ("br;q=0.2, zstd;q=0.8, gzip;q=0.5", "zstd"),
+    ("gzip;q=abc, deflate", None),
+])
+def test_negotiate_respects_q_values_and_server_order(accept_encoding, expected):
+    assert negotiate(accept_encoding, ("br", "zstd", "gzip")) == expected
+
+
+def test_negotiate_uses_only_offered_encodings():
+    assert negotiate("br, gzip;q=0.1", ("gzip",)) == "gzip"
+    assert negotiate("br", ("gzip",)) is None
+
+
+def proxied(upstream, gateway, accept_encoding, **response):
+    upstream.handler = lambda request: httpx.Response(200, **response)
+
+    async def scenario():
+        async with gateway() as client:
+            return await client.get(COMPANIES, headers={"accept-encoding": accept_encoding})
+    return asyncio.run(scenario())
+
+
+def test_large_json_is_gzipped_with_vary(upstream, gateway):
+    response = proxied(upstream, gateway, "gzip", json=LARGE)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == LARGE
+
+
+def test_identity_client_gets_uncompressed_body(upstream, gateway):
+    response = proxied(upstream, gateway, "identity", json=LARGE)
+
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
+
+
+def test_small_body_is_not_compressed(upstream, gateway):
+    response = proxied(upstream, gateway, "gzip", json={"ok": True})
+
+    assert len(response.content) < MIN_BYTES
+    assert "content-encoding" not in response.headers
+
+
+def test_binary_type_is_not_compressed(upstream, gateway):
+    response = proxied(upstream, gateway, "gzip", content=b"%PDF" + b"0" * 4096,
+                       headers={"content-type": "application/pdf"})
+
+    assert "content-encoding" not in response.headers
+    assert len(response.content) == 4100
+
+
+def stream_app(media_type="application/x-ndjson"):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware)
+
+    @app.get("/progress")
+    async def progress():
+        async def lines():
+            for i in range(3):
+                yield f'{{"step": {i}}}\n'.encode() * 100
+        return StreamingResponse(lines(), media_type=media_type)
+
+    return app
+
+
+def raw_stream(app, accept_encoding):
+    """ASGI 메시지를 직접 받아 (응답 헤더, 압축된 본문 청크 목록) 반환 (ASGITransport는 본문을 합쳐 버림)"""
+    messages = []
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/progress", "raw_path": b"/progress", "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"app"), (b"accept-encoding", accept_encoding.encode())],
+        "client": ("127.0.0.1", 1234), "server": ("app", 80),
+    }
+
+    requested = []
+
+    async def receive():
+        if requested:
+            # 연결 종료 대기 (StreamingResponse가 disconnect를 기다리는 동안 멈춰 있음)
+            await asyncio.Event().wait()
+        requested.append(True)
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    headers = httpx.Headers([(k.decode(), v.decode()) for k, v in messages[0]["headers"]])
+    return headers, [m["body"] for m in messages[1:] if m.get("body")]
+
+
+def test_streaming_response_is_compressed_chunk_by_chunk():
+    headers, chunks = raw_stream(stream_app(), "gzip")
+
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(chunks) >= 3
+    # 청크마다 flush하므로 첫 청크만으로도 그때까지의 내용을 풀 수 있음
+    first = zlib.decompressobj(31).decompress(chunks[0])
+    assert first == b'{"step": 0}\n' * 100
+    assert gzip.decompress(b"".join(chunks)).count(b"\n") == 300
+
+
+def test_event_stream_is_not_compressed():
+    headers, chunks = raw_stream(stream_app("text/event-stream"), "gzip")
+
+    assert "content-encoding" not in headers
+    assert chunks[0] == b'{"step": 0}\n' * 100
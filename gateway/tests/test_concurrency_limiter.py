@@ -0,0 +1,142 @@
+"""
+적응형 동시성 제한 테스트 (AIMD limit 조절, 대기열 초과/대기 시간 초과 시 503 + Retry-After)
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.domain.model.concurrency_limiter import AdaptiveLimiter, ConcurrencyLimitExceeded, Priority
+
+
+def make_limiter(**overrides) -> AdaptiveLimiter:
+    options = dict(initial_limit=20, min_limit=2, max_limit=100, max_queue=10, queue_timeout=1.0)
+    options.update(overrides)
+    return AdaptiveLimiter("test", **options)
+
+
+def test_failure_decreases_limit_once_per_interval():
+    limiter = make_limiter()
+
+    async def scenario():
+        await limiter.acquire()
+        await limiter.acquire()
+        limiter.release(False, 0.01)
+        # 같은 과부하 구간의 연속 실패는 한 번만 반영
+        limiter.release(False, 0.01)
+
+    asyncio.run(scenario())
+    assert limiter.limit == pytest.approx(18)
+    assert limiter.in_flight == 0
+
+
+def test_limit_never_drops_below_minimum():
+    limiter = make_limiter(initial_limit=2, min_limit=2)
+
+    async def scenario():
+        await limiter.acquire()
+        limiter.release(False, 0.01)
+
+    asyncio.run(scenario())
+    assert limiter.limit == 2
+
+
+def test_success_near_limit_increases_limit():
+    limiter = make_limiter(initial_limit=4)
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.acquire()
+        limiter.release(True, 0.01)
+
+    asyncio.run(scenario())
+    assert limiter.limit == pytest.approx(4.25)
+
+
+def test_full_queue_is_shed_with_retry_after():
+    limiter = make_limiter(initial_limit=1, min_limit=1, max_queue=0)
+
+    async def scenario():
+        await limiter.acquire()
+        with pytest.raises(ConcurrencyLimitExceeded) as exc:
+            await limiter.acquire()
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.reason == "queue full"
+    assert error.retry_after >= 1
+    assert limiter.shed["normal"] == 1
+
+
+def test_queued_request_times_out():
+    limiter = make_limiter(initial_limit=1, min_limit=1, max_queue=1, queue_timeout=0.05)
+
+    async def scenario():
+        await limiter.acquire()
+        with pytest.raises(ConcurrencyLimitExceeded) as exc:
+            await limiter.acquire()
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.reason == "queue timeout"
+    assert limiter.snapshot()["queued"] == 0
+
+
+def test_released_slot_goes_to_queued_request():
+    limiter = make_limiter(initial_limit=1, min_limit=1, max_queue=1)
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.release(True, 0.01)
+        await waiter
+
+    asyncio.run(scenario())
+    assert limiter.in_flight == 1
+    assert limiter.admitted == 2
+
+
+def test_higher_priority_preempts_queued_request():
+    limiter = make_limiter(initial_limit=1, min_limit=1, max_queue=1)
+
+    async def scenario():
+        await limiter.acquire(Priority.critical)
+        bulk = asyncio.ensure_future(limiter.acquire(Priority.bulk))
+        await asyncio.sleep(0)
+        critical = asyncio.ensure_future(limiter.acquire(Priority.critical))
+        await asyncio.sleep(0)
+        with pytest.raises(ConcurrencyLimitExceeded) as exc:
+            await bulk
+        limiter.release(True, 0.01)
+        await critical
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.reason == "preempted"
+    assert limiter.shed["bulk"] == 1
+
+
+def test_gateway_sheds_over_limit_requests(upstream, gateway, monkeypatch):
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_INITIAL", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_MIN", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_MAX", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_QUEUE", "0")
+
+    async def handler(request):
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"ok": True})
+    upstream.handler = handler
+
+    async def scenario():
+        async with gateway() as client:
+            # 경로를 달리해 single-flight 병합 없이 각각 슬롯을 요청
+            return await asyncio.gather(client.get("/api/v1/gri/companies"), client.get("/api/v1/gri/reports"))
+
+    responses = asyncio.run(scenario())
+    assert sorted(r.status_code for r in responses) == [200, 503]
+    shed = next(r for r in responses if r.status_code == 503)
+    assert "overloaded (queue full)" in shed.json()["detail"]
+    assert int(shed.headers["retry-after"]) >= 1
+    assert upstream.calls == 1
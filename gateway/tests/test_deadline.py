@@ -0,0 +1,141 @@
+"""
+타임아웃 예산/deadline 전파 테스트
+
+게이트웨이: 남은 예산을 X-Request-Timeout-Ms로 전달(클라이언트 값은 무시), 예산 소진/업스트림 타임아웃 시 504
+서비스: shared/common/deadline.py의 DeadlineMiddleware (만료된 요청 거부, 처리 중 deadline 초과 시 취소)
+"""
+from pathlib import Path
+import asyncio
+import importlib.util
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.domain.model import timeout_budget
+
+ROOT = Path(__file__).resolve().parents[2]
+COMPANIES = "/api/v1/gri/companies"
+
+
+def load_service_deadline():
+    """서비스들이 복사해 쓰는 원본 모듈을 그대로 로드"""
+    spec = importlib.util.spec_from_file_location("shared_common_deadline", ROOT / "shared" / "common" / "deadline.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def get(gateway, path=COMPANIES, **headers):
+    async def scenario():
+        async with gateway() as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(scenario())
+
+
+def test_remaining_budget_replaces_client_header(upstream, gateway):
+    response = get(gateway, "/api/v1/auth/login", **{"x-request-timeout-ms": "999999"})
+
+    assert response.status_code == 200
+    sent = int(upstream.requests[0].headers["x-request-timeout-ms"])
+    # auth/login 예산(3초) 중 남은 시간만 전달, 클라이언트가 보낸 값은 버림
+    assert 0 < sent <= 3000
+    assert upstream.requests[0].headers.get_list("x-request-timeout-ms") == [str(sent)]
+
+
+def test_route_budget_rules_override_service_budget():
+    assert timeout_budget.timeout_budget_for("auth", "login") == 3
+    assert timeout_budget.timeout_budget_for("auth", "v1/auth/login") == 3
+    assert timeout_budget.timeout_budget_for("auth", "me") == 5
+    assert timeout_budget.timeout_budget_for("gri", "evidence", upload=True) >= timeout_budget.UPLOAD_TIMEOUT
+    assert timeout_budget.parse_timeout_budgets("auth/login=2, gri=x,,survey=7") == {"auth/login": 2.0, "survey": 7.0}
+
+
+def test_upstream_timeout_returns_504(upstream, gateway):
+    def handler(request):
+        raise httpx.ReadTimeout("slow", request=request)
+    upstream.handler = handler
+
+    response = get(gateway)
+    assert response.status_code == 504
+    assert "timed out" in response.json()["detail"]
+
+
+def test_budget_spent_in_admission_queue_returns_504(upstream, gateway, monkeypatch):
+    monkeypatch.setitem(timeout_budget.TIMEOUT_BUDGETS, "gri", 0.05)
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_INITIAL", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_MIN", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_MAX", "1")
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"ok": True})
+    upstream.handler = handler
+
+    async def scenario():
+        async with gateway() as client:
+            # 경로를 달리해 single-flight 병합 없이 두 번째 요청이 대기열에서 예산을 다 씀
+            first = asyncio.ensure_future(client.get(COMPANIES))
+            await asyncio.sleep(0.01)
+            second = await client.get("/api/v1/gri/reports")
+            return await first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert second.status_code == 504
+    assert "budget exhausted" in second.json()["detail"]
+    assert upstream.calls == 1
+
+
+@pytest.fixture(scope="module")
+def deadline_module():
+    return load_service_deadline()
+
+
+def service_app(deadline_module, delay: float):
+    app = FastAPI()
+    app.add_middleware(deadline_module.DeadlineMiddleware)
+    seen = {}
+
+    @app.get("/work")
+    async def work():
+        seen["remaining"] = deadline_module.remaining()
+        await asyncio.sleep(delay)
+        seen["finished"] = True
+        return {"ok": True}
+
+    return app, seen
+
+
+def call_service(app, **headers):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://service") as client:
+            return await client.get("/work", headers=headers)
+    return asyncio.run(scenario())
+
+
+def test_service_rejects_already_expired_request(deadline_module):
+    app, seen = service_app(deadline_module, 0)
+
+    response = call_service(app, **{"x-request-timeout-ms": "0"})
+    assert response.status_code == 504
+    assert seen == {}
+
+
+def test_service_cancels_work_past_deadline(deadline_module):
+    app, seen = service_app(deadline_module, 1.0)
+
+    response = call_service(app, **{"x-request-timeout-ms": "50"})
+    assert response.status_code == 504
+    assert response.json() == {"detail": "Request deadline exceeded"}
+    assert 0 < seen["remaining"] <= 0.05
+    assert "finished" not in seen
+
+
+def test_service_without_header_is_not_limited(deadline_module):
+    app, seen = service_app(deadline_module, 0.01)
+
+    response = call_service(app)
+    assert response.status_code == 200
+    assert seen == {"remaining": None, "finished": True}
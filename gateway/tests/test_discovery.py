@@ -0,0 +1,164 @@
+"""
+서비스 디스커버리 테스트 (토큰/호스트 검증 실패 시 등록 거부, 등록 인스턴스 우선 라우팅, 서비스 측 등록/heartbeat/TTL 만료)
+"""
+import asyncio
+
+import pytest
+
+from app.domain.discovery.discovery_controller import (
+    InMemoryRegistry, ServiceDiscovery, ServiceInstance, service_discovery
+)
+from app.domain.model.colocated import ColocatedServices, DEFAULT_SERVICES_DIR
+from app.domain.model.service_factory import ServiceType, compile_route_table, get_route_table
+
+TOKEN = "s3cret"
+INSTANCE = {"service": "gri", "url": "http://gri-2.internal:8001", "instance_id": "gri-2"}
+
+
+@pytest.fixture
+def discovery(upstream, monkeypatch) -> InMemoryRegistry:
+    registry = InMemoryRegistry()
+    monkeypatch.setattr(service_discovery, "registry", registry)
+    monkeypatch.setattr(service_discovery, "token", TOKEN)
+    monkeypatch.setattr(service_discovery, "allowed_hosts", ())
+    return registry
+
+
+def call(gateway, method, path, **kwargs):
+    async def scenario():
+        async with gateway() as client:
+            return await client.request(method, f"/api/v1/discovery{path}", **kwargs)
+    return asyncio.run(scenario())
+
+
+def registered(registry):
+    return asyncio.run(registry.instances())
+
+
+def test_register_is_rejected_when_discovery_is_disabled(upstream, gateway, monkeypatch):
+    monkeypatch.setattr(service_discovery, "registry", None)
+    monkeypatch.setattr(service_discovery, "token", TOKEN)
+
+    response = call(gateway, "POST", "/register", json=INSTANCE, headers={"authorization": f"Bearer {TOKEN}"})
+    assert response.status_code == 503
+
+
+def test_register_is_rejected_without_configured_token(discovery, gateway, monkeypatch):
+    monkeypatch.setattr(service_discovery, "token", "")
+
+    response = call(gateway, "POST", "/register", json=INSTANCE)
+    assert response.status_code == 503
+    assert "GATEWAY_DISCOVERY_TOKEN" in response.json()["detail"]
+    assert registered(discovery) == []
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer wrong", f"Basic {TOKEN}", TOKEN])
+def test_register_requires_bearer_token(discovery, gateway, authorization):
+    headers = {"authorization": authorization} if authorization else {}
+
+    response = call(gateway, "POST", "/register", json=INSTANCE, headers=headers)
+    assert response.status_code == 401
+    assert registered(discovery) == []
+
+
+def test_heartbeat_and_deregister_require_token(discovery, gateway):
+    heartbeat = call(gateway, "PUT", "/gri/gri-2/heartbeat", json={})
+    deregister = call(gateway, "DELETE", "/gri/gri-2")
+    assert heartbeat.status_code == deregister.status_code == 401
+
+
+def test_register_rejects_host_outside_allowlist(discovery, gateway, monkeypatch):
+    monkeypatch.setattr(service_discovery, "allowed_hosts", ("*.internal",))
+    headers = {"authorization": f"Bearer {TOKEN}"}
+
+    rejected = call(gateway, "POST", "/register", json={**INSTANCE, "url": "http://attacker.example"}, headers=headers)
+    accepted = call(gateway, "POST", "/register", json=INSTANCE, headers=headers)
+    assert rejected.status_code == 403
+    assert accepted.status_code == 201
+    assert [instance.url for instance in registered(discovery)] == [INSTANCE["url"]]
+
+
+def test_registered_instances_replace_env_replicas_until_they_expire(upstream):
+    registry = InMemoryRegistry()
+    discovery = ServiceDiscovery(registry=registry, token=TOKEN)
+    env_urls = [replica.url for replica in get_route_table()[ServiceType.gri].replicas]
+
+    def urls(service_type):
+        return [replica.url for replica in get_route_table()[service_type].replicas]
+
+    async def scenario():
+        await registry.register(ServiceInstance(service="gri", instance_id="gri-2", url=INSTANCE["url"]), 30)
+        await discovery.refresh()
+        registered_urls = urls(ServiceType.gri), urls(ServiceType.auth)
+        await registry.deregister("gri", "gri-2")
+        await discovery.refresh()
+        return registered_urls, urls(ServiceType.gri)
+
+    try:
+        (gri_registered, auth_registered), gri_after = asyncio.run(scenario())
+    finally:
+        compile_route_table()
+    # 등록 인스턴스가 있으면 환경변수(기본 URL) 레플리카로는 보내지 않음
+    assert gri_registered == [INSTANCE["url"]]
+    # 등록이 없는 서비스와 등록이 모두 빠진 서비스는 환경변수 레플리카 사용
+    assert auth_registered == [replica.url for replica in get_route_table()[ServiceType.auth].replicas]
+    assert gri_after == env_urls
+
+
+@pytest.mark.skipif(not (DEFAULT_SERVICES_DIR / "survey-service").is_dir(), reason="service/ 디렉터리 없음")
+def test_service_registers_heartbeats_and_expires(discovery, gateway, monkeypatch):
+    monkeypatch.setenv("GATEWAY_DISCOVERY_URL", "http://gateway/api/v1/discovery")
+    monkeypatch.setenv("GATEWAY_DISCOVERY_TOKEN", TOKEN)
+    monkeypatch.setenv("GATEWAY_DISCOVERY_TTL", "1")
+    monkeypatch.setenv("SERVICE_ADVERTISE_URL", "http://survey-1.internal:8007")
+    monkeypatch.setenv("SERVICE_INSTANCE_ID", "survey-1")
+    services = ColocatedServices(enabled=True, services=["survey"])
+    services.load()
+    service_app = services._service_apps["survey"]
+    registration = service_app.state.gateway_registration
+    calls = []
+
+    async def via_gateway(method, path, body=None):
+        # 서비스의 HTTP 호출(urllib)만 게이트웨이 ASGI 앱 호출로 바꿈
+        headers = {"authorization": f"Bearer {registration.token}"}
+        async with gateway() as client:
+            response = await client.request(method, f"/api/v1/discovery{path}", json=body, headers=headers)
+        calls.append((method, path.rsplit("/", 1)[-1], response.status_code))
+        return response.status_code, response.json() if response.content else {}
+
+    monkeypatch.setattr(registration, "_request", via_gateway)
+
+    async def urls():
+        return [instance.url for instance in await discovery.instances()]
+
+    async def scenario():
+        lifespan = service_app.router.lifespan_context(service_app)
+        await lifespan.__aenter__()
+        await asyncio.sleep(0.2)
+        registered = await urls()
+        # TTL(1s)보다 오래 지나도 heartbeat로 유지
+        await asyncio.sleep(1.3)
+        kept_alive = await urls()
+        # 프로세스가 죽은 것처럼 heartbeat만 멈추면 TTL 뒤에 빠짐
+        registration._task.cancel()
+        await asyncio.sleep(1.2)
+        expired = await urls()
+        # 만료 후 heartbeat는 404 → 같은 instance_id로 다시 등록
+        recovered = await registration.heartbeat()
+        reregistered = await urls()
+        await lifespan.__aexit__(None, None, None)
+        return registered, kept_alive, expired, recovered, reregistered, await urls()
+
+    registered, kept_alive, expired, recovered, reregistered, stopped = asyncio.run(scenario())
+    url = "http://survey-1.internal:8007"
+    assert registered == kept_alive == [url]
+    assert registration.heartbeat_interval == pytest.approx(0.3)
+    assert calls[0] == ("POST", "register", 201)
+    assert ("PUT", "heartbeat", 200) in calls
+    assert expired == []
+    assert recovered is True
+    assert ("PUT", "heartbeat", 404) in calls
+    assert reregistered == [url]
+    # 정상 종료 시 등록 해제
+    assert calls[-1] == ("DELETE", "survey-1", 204)
+    assert stopped == []
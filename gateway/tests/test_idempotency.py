@@ -0,0 +1,91 @@
+"""
+Idempotency-Key POST 테스트 (재전송, 진행 중 합류, 다른 요청에 키 재사용 시 422)
+"""
+import asyncio
+
+import httpx
+
+COMPANIES = "/api/v1/gri/companies"
+
+
+def counting_upstream(upstream, status_code=201, delay=0.0):
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return httpx.Response(status_code, json={"id": len(upstream.requests)})
+    upstream.handler = handler
+
+
+def post(client, body, key="order-1", **headers):
+    return client.post(COMPANIES, json=body, headers={"idempotency-key": key, **headers})
+
+
+def test_retry_replays_stored_response(upstream, gateway):
+    counting_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            return await post(client, {"name": "acme"}), await post(client, {"name": "acme"})
+
+    first, retry = asyncio.run(scenario())
+    assert first.status_code == retry.status_code == 201
+    assert "idempotent-replayed" not in first.headers
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.json() == first.json() == {"id": 1}
+    assert upstream.calls == 1
+
+
+def test_concurrent_retry_joins_in_flight_call(upstream, gateway):
+    counting_upstream(upstream, delay=0.05)
+
+    async def scenario():
+        async with gateway() as client:
+            return await asyncio.gather(post(client, {"name": "acme"}), post(client, {"name": "acme"}))
+
+    responses = asyncio.run(scenario())
+    assert [r.json() for r in responses] == [{"id": 1}, {"id": 1}]
+    assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 1
+    assert upstream.calls == 1
+
+
+def test_key_reused_with_different_body_is_rejected(upstream, gateway):
+    counting_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            return await post(client, {"name": "acme"}), await post(client, {"name": "other"})
+
+    first, mismatch = asyncio.run(scenario())
+    assert first.status_code == 201
+    assert mismatch.status_code == 422
+    assert "Idempotency-Key" in mismatch.json()["detail"]
+    assert upstream.calls == 1
+
+
+def test_server_error_is_not_stored(upstream, gateway):
+    counting_upstream(upstream, status_code=503)
+
+    async def scenario():
+        async with gateway() as client:
+            return await post(client, {"name": "acme"}), await post(client, {"name": "acme"})
+
+    first, retry = asyncio.run(scenario())
+    assert first.status_code == retry.status_code == 503
+    assert "idempotent-replayed" not in retry.headers
+    assert upstream.calls == 2
+
+
+def test_keys_are_scoped_per_caller(upstream, gateway):
+    counting_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            return (
+                await post(client, {"name": "acme"}, authorization="Bearer alice"),
+                await post(client, {"name": "acme"}, authorization="Bearer bob"),
+            )
+
+    alice, bob = asyncio.run(scenario())
+    assert alice.json() == {"id": 1}
+    assert bob.json() == {"id": 2}
+    assert "idempotent-replayed" not in bob.headers
+    assert upstream.calls == 2
@@ -0,0 +1,34 @@
+"""
+Prometheus 메트릭 테스트 (메서드 레이블 카디널리티 제한)
+"""
+import asyncio
+
+from app.common.utility.metrics import GatewayMetrics, method_label
+
+
+def test_non_standard_methods_share_one_label():
+    assert [method_label(m) for m in ("GET", "patch", "OPTIONS", "PURGE", "X" * 200)] == [
+        "GET", "PATCH", "OPTIONS", "OTHER", "OTHER",
+    ]
+
+
+def test_request_metrics_use_bounded_method_label():
+    registry = GatewayMetrics()
+    for method in ("GET", "FOO", "BAR", "get"):
+        registry.observe_request("gri", method, 404, 0.01, None)
+
+    rendered = registry.render()
+    assert 'gateway_requests_total{service="gri",method="GET",status="404"} 2' in rendered
+    assert 'gateway_requests_total{service="gri",method="OTHER",status="404"} 2' in rendered
+    assert "FOO" not in rendered and "BAR" not in rendered
+
+
+def test_gateway_labels_unknown_method_as_other(upstream, gateway):
+    async def scenario():
+        async with gateway() as client:
+            await client.request("PURGE-ME", "/api/v1/gri/companies")
+            return await client.get("/metrics")
+
+    rendered = asyncio.run(scenario()).text
+    assert 'method="OTHER"' in rendered
+    assert "PURGE-ME" not in rendered
@@ -0,0 +1,222 @@
+"""
+트래픽 미러링 테스트 (큐가 가득 차면 버림, 섀도 응답 차이 기록, 게이트웨이 응답 후 복제)
+"""
+import asyncio
+
+import httpx
+
+from app import main as main_module
+from app.domain.model.mirror import MirrorJob, TrafficMirror, parse_mirror_targets
+
+SHADOW = "http://gri-canary:8001"
+
+
+def make_job(**overrides) -> MirrorJob:
+    job = dict(
+        service="gri", method="GET", path="/v1/gri/companies", params=[("page", "1")],
+        headers={"authorization": "Bearer t", "x-request-timeout-ms": "3000", "host": "gateway"}, body=None,
+        primary_status=200, primary_body=b'{"a": 1, "b": 2}', primary_content_type="application/json",
+        primary_latency=0.01,
+    )
+    job.update(overrides)
+    return MirrorJob(**job)
+
+
+def make_mirror(handler, **overrides) -> TrafficMirror:
+    options = dict(targets={"gri": (SHADOW, 1.0)}, methods="GET", queue_size=10, workers=1)
+    options.update(overrides)
+    return TrafficMirror(transport=httpx.MockTransport(handler), **options)
+
+
+async def drain(mirror: TrafficMirror, expected: int = 1) -> None:
+    """섀도 호출이 expected개 끝날 때까지 대기"""
+    for _ in range(100):
+        counts = mirror._stats.get("gri", {})
+        if counts.get("mirrored", 0) + counts.get("errors", 0) >= expected:
+            return
+        await asyncio.sleep(0.01)
+
+
+def test_parse_mirror_targets():
+    assert parse_mirror_targets("tcfd=http://tcfd-canary:8005/|0.1, auth=http://auth-v2:8008,bad,x=|1") == {
+        "tcfd": ("http://tcfd-canary:8005", 0.1),
+        "auth": ("http://auth-v2:8008", 1.0),
+    }
+    assert parse_mirror_targets("tcfd=http://t|2") == {"tcfd": ("http://t", 1.0)}
+
+
+def test_only_sampled_methods_are_mirrored():
+    mirror = make_mirror(lambda request: httpx.Response(200), targets={"gri": (SHADOW, 1.0), "auth": (SHADOW, 0.0)})
+
+    async def scenario():
+        stopped = mirror.wants("gri", "GET")
+        await mirror.start()
+        try:
+            return stopped, mirror.wants("gri", "get"), mirror.wants("gri", "POST"), mirror.wants("auth", "GET")
+        finally:
+            await mirror.stop()
+
+    # 시작 전(큐 없음), 설정되지 않은 메서드, 표본 비율 0은 복제하지 않음
+    assert asyncio.run(scenario()) == (False, True, False, False)
+
+
+def test_full_queue_drops_without_waiting():
+    release = asyncio.Event()
+
+    async def handler(request):
+        await release.wait()
+        return httpx.Response(200, json={"a": 1, "b": 2})
+
+    mirror = make_mirror(handler, queue_size=1)
+
+    async def scenario():
+        await mirror.start()
+        try:
+            # 워커가 꺼내기 전에 연달아 넣으면 두 번째부터 버림
+            for _ in range(3):
+                await mirror.submit(make_job())
+            counts = dict(mirror.stats()["services"]["gri"])
+            release.set()
+            await drain(mirror)
+            return counts, mirror.stats()["services"]["gri"]
+        finally:
+            await mirror.stop()
+
+    queued, done = asyncio.run(scenario())
+    assert queued["queued"] == 1
+    assert queued["dropped"] == 2
+    assert done["mirrored"] == 1
+
+
+def test_oversized_job_is_not_queued():
+    mirror = make_mirror(lambda request: httpx.Response(200), max_body_bytes=8)
+
+    async def scenario():
+        await mirror.start()
+        try:
+            await mirror.submit(make_job())
+            return mirror.stats()
+        finally:
+            await mirror.stop()
+
+    stats = asyncio.run(scenario())
+    assert stats["queue_depth"] == 0
+    assert "queued" not in stats["services"]["gri"]
+
+
+def test_shadow_differences_are_recorded():
+    shadow = []
+    responses = iter([
+        httpx.Response(200, json={"b": 2, "a": 1}),  # 키 순서만 다름 → 같음
+        httpx.Response(200, json={"a": 1, "b": 3}),  # 본문 다름
+        httpx.Response(500, json={"detail": "boom"}),  # 상태 코드 다름
+    ])
+
+    def handler(request):
+        shadow.append(request)
+        return next(responses)
+
+    mirror = make_mirror(handler)
+
+    async def scenario():
+        await mirror.start()
+        try:
+            for _ in range(3):
+                await mirror._mirror(make_job())
+            return mirror.stats()
+        finally:
+            await mirror.stop()
+
+    stats = asyncio.run(scenario())
+    counts = stats["services"]["gri"]
+    assert (counts["mirrored"], counts["body_diffs"], counts["status_diffs"]) == (3, 1, 1)
+    assert [(d["kind"], d["shadow_status"]) for d in stats["recent_diffs"]] == [("body", 200), ("status", 500)]
+    assert counts["latency"]["shadow"]["p50_ms"] is not None
+    request = shadow[0]
+    assert str(request.url) == f"{SHADOW}/v1/gri/companies?page=1"
+    assert request.headers["x-shadow-request"] == "true"
+    assert request.headers["authorization"] == "Bearer t"
+    # 원 요청의 deadline 헤더는 섀도에 전달하지 않음
+    assert "x-request-timeout-ms" not in request.headers
+
+
+def test_shadow_failure_is_counted():
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    mirror = make_mirror(handler)
+
+    async def scenario():
+        await mirror.start()
+        try:
+            await mirror._mirror(make_job())
+            return mirror.stats()["services"]["gri"]
+        finally:
+            await mirror.stop()
+
+    counts = asyncio.run(scenario())
+    assert counts["errors"] == 1
+    assert counts["mirrored"] == 0
+
+
+def test_gateway_mirrors_after_responding(upstream, gateway, monkeypatch):
+    shadow = []
+
+    def handler(request):
+        shadow.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    mirror = make_mirror(handler)
+    monkeypatch.setattr(main_module, "traffic_mirror", mirror)
+    # 실제 전송처럼 본문을 읽어야 하는 응답 (elapsed는 본문을 다 읽은 뒤에 정해짐)
+    upstream.handler = lambda request: httpx.Response(
+        200, stream=httpx.ByteStream(b'{"ok": true}'), headers={"content-type": "application/json"}
+    )
+
+    async def scenario():
+        await mirror.start()
+        try:
+            async with gateway() as client:
+                response = await client.get("/api/v1/gri/companies", params={"page": "2"})
+            await drain(mirror)
+            return response
+        finally:
+            await mirror.stop()
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert upstream.calls == 1
+    assert [str(request.url) for request in shadow] == [f"{SHADOW}/v1/gri/companies?page=2"]
+    assert mirror.stats()["services"]["gri"]["mirrored"] == 1
+
+
+def test_repeated_query_keys_reach_primary_and_shadow(upstream, gateway, monkeypatch):
+    shadow = []
+
+    def handler(request):
+        shadow.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    mirror = make_mirror(handler, methods="GET,PUT")
+    monkeypatch.setattr(main_module, "traffic_mirror", mirror)
+    upstream.handler = lambda request: httpx.Response(
+        200, stream=httpx.ByteStream(b'{"ok": true}'), headers={"content-type": "application/json"}
+    )
+    query = [("tag", "e"), ("tag", "s"), ("page", "1")]
+
+    async def scenario():
+        await mirror.start()
+        try:
+            async with gateway() as client:
+                await client.get("/api/v1/gri/companies", params=query)
+                await client.put("/api/v1/gri/companies/1", params=query, json={"name": "acme"})
+            await drain(mirror, expected=2)
+        finally:
+            await mirror.stop()
+
+    asyncio.run(scenario())
+    # 같은 이름의 쿼리 파라미터를 dict로 합치지 않고 순서대로 모두 전달
+    assert [request.url.query for request in upstream.requests] == [b"tag=e&tag=s&page=1"] * 2
+    assert sorted((request.method, request.url.query) for request in shadow) == [
+        ("GET", b"tag=e&tag=s&page=1"), ("PUT", b"tag=e&tag=s&page=1"),
+    ]
@@ -0,0 +1,89 @@
+"""
+JSON POST 프록시 테스트 (Content-Type 확인, 빈 본문 422, 원본 바이트 그대로 전달, 라우트별 선택적 스키마 검증)
+"""
+import asyncio
+
+import pytest
+
+from app.domain.model import proxy_schema
+
+LOGIN = "/api/v1/auth/login"
+
+
+def post(gateway, path, content=None, content_type="application/json", **headers):
+    async def scenario():
+        async with gateway() as client:
+            if content_type is not None:
+                headers["content-type"] = content_type
+            return await client.post(path, content=content, headers=headers)
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("content_type", ["text/plain", "application/x-www-form-urlencoded", None])
+def test_non_json_content_type_is_rejected(upstream, gateway, content_type):
+    response = post(gateway, LOGIN, b'{"auth_id": "alice"}', content_type=content_type)
+    assert response.status_code == 415
+    assert upstream.calls == 0
+
+
+def test_multipart_to_service_without_uploads_is_rejected(upstream, gateway):
+    response = post(gateway, LOGIN, b"--x--\r\n", content_type="multipart/form-data; boundary=x")
+    assert response.status_code == 415
+    assert "does not accept file uploads" in response.json()["detail"]
+    assert upstream.calls == 0
+
+
+def test_empty_body_is_rejected(upstream, gateway):
+    response = post(gateway, LOGIN, b"")
+    assert response.status_code == 422
+    assert response.json() == {"detail": "Request body is required"}
+    assert upstream.calls == 0
+
+
+@pytest.mark.parametrize("content_type", ["application/json; charset=utf-8", "application/vnd.api+json"])
+def test_body_is_forwarded_byte_for_byte(upstream, gateway, content_type):
+    # 키 순서/공백/유니코드 이스케이프가 재직렬화로 바뀌지 않아야 함
+    raw = b'{ "b": 1,\n  "a": "\\uac00", "auth_id": "alice" }'
+
+    response = post(gateway, LOGIN, raw, content_type=content_type)
+    assert response.status_code == 200
+    forwarded = upstream.requests[0]
+    assert forwarded.method == "POST"
+    assert forwarded.url.path == "/v1/auth/login"
+    assert forwarded.content == raw
+    assert forwarded.headers["content-type"] == content_type
+
+
+def test_invalid_json_is_forwarded_when_validation_is_off(upstream, gateway):
+    response = post(gateway, LOGIN, b"{not json")
+    assert response.status_code == 200
+    assert upstream.requests[0].content == b"{not json"
+
+
+@pytest.fixture
+def validated(monkeypatch):
+    monkeypatch.setattr(proxy_schema, "VALIDATED_POST_ROUTES", frozenset({"auth/login"}))
+
+
+def test_validated_route_rejects_invalid_body(upstream, gateway, validated):
+    short_password = post(gateway, LOGIN, b'{"auth_id": "alice", "auth_pw": "x"}')
+    malformed = post(gateway, LOGIN, b"{not json")
+
+    assert short_password.status_code == 422
+    assert short_password.json()["detail"][0]["loc"] == ["auth_pw"]
+    assert malformed.status_code == 422
+    assert upstream.calls == 0
+
+
+def test_validated_route_forwards_valid_body_unchanged(upstream, gateway, validated):
+    raw = b'{"auth_pw": "s3cret!", "auth_id": "alice"}'
+
+    response = post(gateway, LOGIN, raw)
+    assert response.status_code == 200
+    assert upstream.requests[0].content == raw
+
+
+def test_validation_applies_only_to_listed_routes(upstream, gateway, validated):
+    response = post(gateway, "/api/v1/auth/signup", b'{"auth_id": "a"}')
+    assert response.status_code == 200
+    assert upstream.calls == 1
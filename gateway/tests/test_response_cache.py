@@ -0,0 +1,131 @@
+"""
+응답 캐시 동작 테스트 (TTL, ETag/If-None-Match, 압축본 ETag)
+"""
+import asyncio
+import gzip
+import time
+
+import httpx
+
+from app.common.utility.response_cache import response_cache
+
+STANDARDS = "/api/v1/gri/standards"
+# 압축 최소 크기(GATEWAY_COMPRESSION_MIN_BYTES)를 넘는 JSON 본문
+PAYLOAD = {"standards": [{"code": f"GRI {i}", "title": "Economic Performance"} for i in range(100)]}
+
+
+def standards_upstream(upstream, headers=None):
+    upstream.handler = lambda request: httpx.Response(200, json=PAYLOAD, headers=headers or {"etag": '"v1"'})
+
+
+def test_hit_within_ttl_skips_upstream(upstream, gateway):
+    standards_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            first = await client.get(STANDARDS)
+            second = await client.get(STANDARDS)
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == second.status_code == 200
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.json() == PAYLOAD
+    assert upstream.calls == 1
+
+
+def test_entry_expires_after_ttl(upstream, gateway, monkeypatch):
+    standards_upstream(upstream)
+    monkeypatch.setitem(response_cache.ttl_rules, "gri/standards", 0.05)
+
+    async def scenario():
+        async with gateway() as client:
+            await client.get(STANDARDS)
+            await asyncio.sleep(0.1)
+            return await client.get(STANDARDS)
+
+    response = asyncio.run(scenario())
+    assert response.headers["x-cache"] == "MISS"
+    assert upstream.calls == 2
+
+
+def test_uncacheable_response_is_not_stored(upstream, gateway):
+    standards_upstream(upstream, headers={"cache-control": "no-store"})
+
+    async def scenario():
+        async with gateway() as client:
+            await client.get(STANDARDS)
+            return await client.get(STANDARDS)
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert "x-cache" not in response.headers
+    assert upstream.calls == 2
+
+
+def test_if_none_match_returns_304(upstream, gateway):
+    standards_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            first = await client.get(STANDARDS, headers={"accept-encoding": "identity"})
+            revalidated = await client.get(
+                STANDARDS, headers={"accept-encoding": "identity", "if-none-match": first.headers["etag"]}
+            )
+            changed = await client.get(STANDARDS, headers={"accept-encoding": "identity", "if-none-match": '"v0"'})
+        return first, revalidated, changed
+
+    first, revalidated, changed = asyncio.run(scenario())
+    assert first.headers["etag"] == '"v1"'
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == '"v1"'
+    assert changed.status_code == 200
+    assert upstream.calls == 1
+
+
+def test_compressed_variant_has_its_own_etag(upstream, gateway):
+    standards_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            await client.get(STANDARDS, headers={"accept-encoding": "identity"})
+            compressed = await client.get(STANDARDS, headers={"accept-encoding": "gzip"})
+            identity = await client.get(STANDARDS, headers={"accept-encoding": "identity"})
+            revalidated = await client.get(
+                STANDARDS, headers={"accept-encoding": "gzip", "if-none-match": compressed.headers["etag"]}
+            )
+            # 압축본 ETag로 비압축 응답을 재검증하면 다른 표현이므로 200
+            cross = await client.get(
+                STANDARDS, headers={"accept-encoding": "identity", "if-none-match": compressed.headers["etag"]}
+            )
+        return compressed, identity, revalidated, cross
+
+    compressed, identity, revalidated, cross = asyncio.run(scenario())
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] == '"v1-gzip"'
+    assert "accept-encoding" in compressed.headers["vary"].lower()
+    assert compressed.json() == PAYLOAD
+    assert "content-encoding" not in identity.headers
+    assert identity.headers["etag"] == '"v1"'
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == '"v1-gzip"'
+    assert cross.status_code == 200
+    assert upstream.calls == 1
+
+
+def test_precompressed_body_matches_cached_entry(upstream, gateway):
+    standards_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            await client.get(STANDARDS)
+        base_key = response_cache.base_key("gri", "standards", [])
+        return response_cache.lookup(base_key, {})
+
+    entry = asyncio.run(scenario())
+    assert entry is not None
+    assert entry.expires_at > time.monotonic()
+    assert "gzip" in entry.encoded
+    assert gzip.decompress(entry.encoded["gzip"]) == entry.body
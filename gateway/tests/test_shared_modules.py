@@ -0,0 +1,33 @@
+"""
+공용 모듈 복사본 검사 (shared/common 원본과 서비스/게이트웨이 복사본이 같아야 함)
+"""
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+SYNC_SCRIPT = Path(__file__).resolve().parents[2] / "shared" / "sync.py"
+
+
+@pytest.fixture(scope="module")
+def shared_sync():
+    if not SYNC_SCRIPT.exists():
+        pytest.skip("shared/ 디렉터리 없음 (게이트웨이 단독 체크아웃)")
+    spec = importlib.util.spec_from_file_location("shared_sync", SYNC_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_vendored_copies_match_source(shared_sync):
+    stale = [str(path.relative_to(shared_sync.ROOT)) for path in shared_sync.stale()]
+    assert stale == [], "python shared/sync.py 로 복사본을 갱신하세요"
+
+
+def test_every_service_gets_every_module(shared_sync):
+    paths = {path for path, _ in shared_sync.targets()}
+    services = sorted((shared_sync.ROOT / "service").glob("*-service"))
+    assert services
+    for service_dir in services:
+        for name in shared_sync.SERVICE_MODULES:
+            assert service_dir / "app" / "common" / name in paths
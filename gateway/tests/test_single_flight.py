@@ -0,0 +1,56 @@
+"""
+Single-flight 요청 병합 테스트 (동시 동일 GET → 업스트림 호출 1회)
+"""
+import asyncio
+
+import httpx
+
+COMPANIES = "/api/v1/gri/companies"
+CONCURRENCY = 20
+
+
+def slow_upstream(upstream, delay=0.05):
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"companies": ["acme"], "call": len(upstream.requests)})
+    upstream.handler = handler
+
+
+def test_concurrent_identical_gets_share_one_upstream_call(upstream, gateway):
+    slow_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            return await asyncio.gather(*(client.get(COMPANIES, params={"page": 1}) for _ in range(CONCURRENCY)))
+
+    responses = asyncio.run(scenario())
+    assert [r.status_code for r in responses] == [200] * CONCURRENCY
+    assert {r.json()["call"] for r in responses} == {1}
+    assert upstream.calls == 1
+
+
+def test_different_callers_are_not_coalesced(upstream, gateway):
+    slow_upstream(upstream)
+
+    async def scenario():
+        async with gateway() as client:
+            return await asyncio.gather(*(
+                client.get(COMPANIES, headers={"authorization": f"Bearer user-{i % 2}"}) for i in range(CONCURRENCY)
+            ))
+
+    responses = asyncio.run(scenario())
+    assert all(r.status_code == 200 for r in responses)
+    assert upstream.calls == 2
+
+
+def test_finished_call_is_not_reused(upstream, gateway):
+    slow_upstream(upstream, delay=0)
+
+    async def scenario():
+        async with gateway() as client:
+            await client.get(COMPANIES)
+            return await client.get(COMPANIES)
+
+    response = asyncio.run(scenario())
+    assert response.json()["call"] == 2
+    assert upstream.calls == 2
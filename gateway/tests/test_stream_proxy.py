@@ -0,0 +1,182 @@
+"""
+WebSocket 프록시 테스트 (Origin 확인, Origin 전달, 서킷 브레이커, 세션 동안 동시성 슬롯 점유)
+"""
+import asyncio
+import contextlib
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.domain.model import stream_proxy as stream_proxy_module
+from app.domain.model.circuit_breaker import BreakerState
+from app.domain.model.stream_proxy import stream_proxy
+from app.main import app as gateway_app
+
+CHAT = "/api/v1/chatbot/chat/ws"
+ALLOWED = "http://localhost:3000"
+
+
+class FakeUpstream:
+    """websockets 클라이언트 연결 대역: 받은 프레임을 그대로 돌려주고 "bye"를 받으면 연결 종료"""
+
+    subprotocol = None
+    close_code = 1000
+    close_reason = ""
+
+    def __init__(self):
+        self.frames: asyncio.Queue = asyncio.Queue()
+
+    async def send(self, data):
+        await self.frames.put(data)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        data = await self.frames.get()
+        if data == "bye":
+            raise StopAsyncIteration
+        return data
+
+    async def close(self, code=1000, reason=""):
+        self.close_code = code
+
+
+@pytest.fixture
+def ws_upstream(upstream, monkeypatch):
+    """ws_connect 호출을 기록하는 가짜 업스트림 (fail=True면 연결 실패)"""
+    state = {"connects": [], "fail": False}
+
+    @contextlib.asynccontextmanager
+    async def connect(url, additional_headers=None, **kwargs):
+        state["connects"].append((url, dict(additional_headers or {})))
+        if state["fail"]:
+            raise OSError("connection refused")
+        yield FakeUpstream()
+
+    monkeypatch.setattr(stream_proxy_module, "ws_connect", connect)
+    monkeypatch.setattr(stream_proxy, "local_app", None)
+    monkeypatch.setattr(stream_proxy, "allowed_origins", (ALLOWED,))
+    return state
+
+
+def finish(ws) -> None:
+    """업스트림이 먼저 닫게 해 게이트웨이 중계가 끝날 때까지 기다림"""
+    ws.send_text("bye")
+    with pytest.raises(WebSocketDisconnect):
+        ws.receive_text()
+
+
+def breaker():
+    return stream_proxy_module.circuit_breakers.get("chatbot")
+
+
+def limiter():
+    return stream_proxy_module.concurrency_limiters.get("chatbot")
+
+
+def test_origin_outside_cors_allowlist_is_rejected(ws_upstream):
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with TestClient(gateway_app).websocket_connect(CHAT, headers={"origin": "https://evil.example"}):
+            pass
+    assert exc.value.code == 1008
+    assert ws_upstream["connects"] == []
+
+
+def test_allowed_origin_is_relayed_and_forwarded(ws_upstream):
+    headers = {"origin": ALLOWED, "cookie": "session=abc", "x-request-timeout-ms": "1"}
+    with TestClient(gateway_app).websocket_connect(CHAT + "?room=1", headers=headers) as ws:
+        ws.send_text("hello")
+        echoed = ws.receive_text()
+        finish(ws)
+
+    url, forwarded = ws_upstream["connects"][0]
+    assert echoed == "hello"
+    assert url.endswith("/v1/chatbot/chat/ws?room=1")
+    assert forwarded["origin"] == ALLOWED
+    assert forwarded["cookie"] == "session=abc"
+    assert "x-request-timeout-ms" not in forwarded
+
+
+def test_request_without_origin_is_allowed(ws_upstream):
+    with TestClient(gateway_app).websocket_connect(CHAT) as ws:
+        ws.send_text("ping")
+        assert ws.receive_text() == "ping"
+        finish(ws)
+    assert "origin" not in ws_upstream["connects"][0][1]
+
+
+def test_open_circuit_rejects_without_connecting(ws_upstream, monkeypatch):
+    breaker()._transition(BreakerState.open)
+
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with TestClient(gateway_app).websocket_connect(CHAT):
+            pass
+    assert exc.value.code == 1013
+    assert ws_upstream["connects"] == []
+
+
+def test_failed_handshakes_open_the_circuit(ws_upstream, monkeypatch):
+    monkeypatch.setenv("CIRCUIT_BREAKER_MIN_REQUESTS", "2")
+    ws_upstream["fail"] = True
+    client = TestClient(gateway_app)
+
+    for _ in range(2):
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(CHAT):
+                pass
+        assert exc.value.code == 1011
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with client.websocket_connect(CHAT):
+            pass
+    assert breaker().state == BreakerState.open
+    assert exc.value.code == 1013
+    assert len(ws_upstream["connects"]) == 2
+
+
+def test_session_holds_concurrency_slot_until_closed(ws_upstream, monkeypatch):
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_INITIAL", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_MIN", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_MAX", "1")
+    monkeypatch.setenv("GATEWAY_CONCURRENCY_QUEUE", "0")
+    client = TestClient(gateway_app)
+
+    with client.websocket_connect(CHAT) as ws:
+        ws.send_text("hold")
+        ws.receive_text()
+        in_flight = limiter().in_flight
+        # 세션이 슬롯을 잡고 있으므로 같은 서비스의 다음 세션/요청은 거부
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with client.websocket_connect(CHAT):
+                pass
+        shed = client.get("/api/v1/chatbot/chat")
+        finish(ws)
+
+    assert in_flight == 1
+    assert exc.value.code == 1013
+    assert shed.status_code == 503
+    assert "overloaded" in shed.json()["detail"]
+    assert limiter().in_flight == 0
+    assert stream_proxy.stats()["active"]["chatbot"]["websocket"] == 0
+
+
+def test_colocated_session_holds_concurrency_slot(upstream, monkeypatch):
+    seen = {}
+
+    async def echo_app(scope, receive, send):
+        seen["path"] = scope["path"]
+        seen["in_flight"] = limiter().in_flight
+        await receive()
+        await send({"type": "websocket.accept"})
+        message = await receive()
+        await send({"type": "websocket.send", "text": message["text"]})
+        await send({"type": "websocket.close", "code": 1000})
+
+    monkeypatch.setattr(stream_proxy, "local_app", lambda service: echo_app if service == "chatbot" else None)
+    with TestClient(gateway_app).websocket_connect(CHAT) as ws:
+        ws.send_text("hi")
+        assert ws.receive_text() == "hi"
+
+    assert seen == {"path": "/v1/chatbot/chat/ws", "in_flight": 1}
+    assert limiter().in_flight == 0
@@ -0,0 +1,60 @@
+"""
+스트리밍 프록시 테스트 (업스트림 바이트를 그대로 전달하므로 클라이언트가 풀 수 있는 인코딩만 업스트림에 요청)
+"""
+import asyncio
+import gzip
+
+import httpx
+
+EXPORT = "/api/v1/gri/reports/export"
+BODY = b"id,name\n" + b"1,acme\n" * 500
+
+
+def encoding_aware_upstream(upstream):
+    """Accept-Encoding에 gzip이 있으면 gzip으로 압축해 응답하는 업스트림 (본문은 읽지 않은 스트림)"""
+    def handler(request):
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            return httpx.Response(200, stream=httpx.ByteStream(gzip.compress(BODY)),
+                                  headers={"content-type": "text/csv", "content-encoding": "gzip"})
+        return httpx.Response(200, stream=httpx.ByteStream(BODY), headers={"content-type": "text/csv"})
+    upstream.handler = handler
+
+
+def export(gateway, accept_encoding=None):
+    async def scenario():
+        async with gateway() as client:
+            del client.headers["accept-encoding"]
+            headers = {"accept-encoding": accept_encoding} if accept_encoding else {}
+            response = await client.get(EXPORT, headers=headers)
+            return response, response.headers.get("content-encoding"), response.content
+    return asyncio.run(scenario())
+
+
+def test_client_without_accept_encoding_gets_identity_stream(upstream, gateway):
+    encoding_aware_upstream(upstream)
+
+    response, encoding, body = export(gateway)
+    assert response.status_code == 200
+    assert upstream.requests[0].headers["accept-encoding"] == "identity"
+    assert encoding is None
+    assert body == BODY
+
+
+def test_client_accept_encoding_is_forwarded_verbatim(upstream, gateway):
+    encoding_aware_upstream(upstream)
+
+    response, encoding, body = export(gateway, "gzip")
+    assert upstream.requests[0].headers["accept-encoding"] == "gzip"
+    # 업스트림 gzip 바이트를 다시 압축하지 않고 그대로 전달 (httpx 클라이언트가 풀어서 비교)
+    assert encoding == "gzip"
+    assert body == BODY
+
+
+def test_buffered_requests_use_decodable_encodings(upstream, gateway):
+    async def scenario():
+        async with gateway() as client:
+            return await client.get("/api/v1/gri/companies", headers={"accept-encoding": "br"})
+
+    asyncio.run(scenario())
+    # 버퍼링 응답은 게이트웨이가 풀어서 다시 압축하므로 클라이언트 값(br) 대신 httpx 기본값
+    assert upstream.requests[0].headers["accept-encoding"] != "br"
@@ -0,0 +1,104 @@
+"""
+파일 업로드 프록시 테스트 (스풀 후 전달, 크기 초과 413, 잘못된 multipart 400, 실패 시 임시 파일 정리)
+"""
+import asyncio
+
+import pytest
+from starlette.formparsers import MultiPartParser
+
+from app.domain.model import upload as upload_module
+from app.domain.model.upload import upload_proxy
+
+UPLOAD = "/api/v1/gri/evidence/upload"
+BOUNDARY = "xyz"
+CONTENT_TYPE = f"multipart/form-data; boundary={BOUNDARY}"
+
+
+def file_part(name: str, content: bytes) -> bytes:
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{name}"\r\n'
+        f"Content-Type: text/csv\r\n\r\n"
+    ).encode() + content + b"\r\n"
+
+
+@pytest.fixture
+def parsers(upstream, monkeypatch):
+    """생성된 파서를 기록해 파싱 중 만든 스풀 파일이 닫혔는지 확인"""
+    created = []
+
+    class RecordingParser(MultiPartParser):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(upload_module, "MultiPartParser", RecordingParser)
+    monkeypatch.setattr(upload_proxy, "max_bytes", 64 * 1024)
+    monkeypatch.setattr(upload_proxy, "spool_bytes", 1024)
+    return created
+
+
+def spooled_files(parsers):
+    return [file for parser in parsers for file in parser._files_to_close_on_error]
+
+
+def post(gateway, content, headers=None):
+    async def scenario():
+        async with gateway() as client:
+            return await client.post(UPLOAD, content=content, headers={"content-type": CONTENT_TYPE, **(headers or {})})
+    return asyncio.run(scenario())
+
+
+def test_upload_is_spooled_and_forwarded(upstream, gateway, parsers):
+    body = file_part("big.csv", b"a" * 4096) + file_part("small.csv", b"b" * 10) + f"--{BOUNDARY}--\r\n".encode()
+
+    response = post(gateway, body)
+    assert response.status_code == 200
+    forwarded = upstream.requests[0]
+    assert forwarded.url.path == "/v1/gri/evidence/upload"
+    assert b"a" * 4096 in forwarded.content and b'filename="small.csv"' in forwarded.content
+    files = spooled_files(parsers)
+    # 1KB를 넘은 파일은 디스크로 스풀, 전달 후 모두 정리
+    assert [file._rolled for file in files] == [True, False]
+    assert all(file.closed for file in files)
+
+
+def test_declared_oversize_upload_is_rejected_before_reading(upstream, gateway, parsers):
+    response = post(gateway, b"x" * 10, headers={"content-length": str(upload_proxy.max_bytes + 1)})
+    assert response.status_code == 413
+    assert parsers == []
+    assert upstream.calls == 0
+
+
+def test_chunked_oversize_upload_is_rejected_and_spool_closed(upstream, gateway, parsers):
+    async def chunks():
+        yield file_part("huge.csv", b"")[:-2]
+        for _ in range(100):
+            yield b"a" * 1024
+
+    response = post(gateway, chunks())
+    assert response.status_code == 413
+    assert upstream.calls == 0
+    files = spooled_files(parsers)
+    assert files and all(file.closed for file in files)
+
+
+def test_malformed_upload_is_rejected_and_spool_closed(upstream, gateway, parsers):
+    # 첫 파일 파트(스풀 파일 생성) 뒤에 잘못된 파트 헤더
+    body = file_part("big.csv", b"a" * 4096) + f"--{BOUNDARY}\r\nbad header line\r\n\r\n".encode()
+
+    response = post(gateway, body)
+    assert response.status_code == 400
+    assert "Malformed multipart body" in response.json()["detail"]
+    assert upstream.calls == 0
+    files = spooled_files(parsers)
+    assert files and all(file.closed for file in files)
+
+
+def test_upload_without_files_is_rejected(upstream, gateway, parsers):
+    body = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="note"\r\n\r\nhello\r\n--{BOUNDARY}--\r\n'
+    ).encode()
+
+    response = post(gateway, body)
+    assert response.status_code == 400
+    assert upstream.calls == 0
@@ -0,0 +1,104 @@
+"""
+트레이스 워터폴 출력 도구
+
+게이트웨이/서비스가 TRACE_EXPORT_FILE로 기록한 span JSONL 파일들을 모아
+요청(trace) 단위로 hop별 소요 시간을 워터폴 형태로 보여준다.
+
+사용 예
+    python trace_waterfall.py traces/*.jsonl                  # 가장 느린 요청 5개
+    python trace_waterfall.py traces/*.jsonl --slowest 20
+    python trace_waterfall.py traces/*.jsonl --trace 4bf92f3577b34da6a3ce929d0e0e4736
+"""
+from collections import defaultdict
+from typing import Dict, List
+import argparse
+import json
+
+
+def load_spans(paths: List[str]) -> Dict[str, List[dict]]:
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    span = json.loads(line)
+                except ValueError:
+                    continue
+                traces[span["trace_id"]].append(span)
+    return traces
+
+
+def root_of(spans: List[dict]) -> dict:
+    ids = {span["span_id"] for span in spans}
+    roots = [span for span in spans if not span.get("parent_span_id") or span["parent_span_id"] not in ids]
+    return min(roots or spans, key=lambda span: span["start_time_unix_nano"])
+
+
+def print_waterfall(trace_id: str, spans: List[dict], width: int) -> None:
+    children: Dict[str, List[dict]] = defaultdict(list)
+    for span in spans:
+        children[span.get("parent_span_id")].append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span["start_time_unix_nano"])
+
+    start = min(span["start_time_unix_nano"] for span in spans)
+    end = max(span["end_time_unix_nano"] for span in spans)
+    total = max(end - start, 1)
+    print(f"\n🧵 trace {trace_id}  ({total / 1e6:.2f} ms, spans={len(spans)})")
+
+    def walk(span: dict, depth: int) -> None:
+        offset = int((span["start_time_unix_nano"] - start) / total * width)
+        length = max(1, int((span["end_time_unix_nano"] - span["start_time_unix_nano"]) / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = f"{'  ' * depth}{span['service']}: {span['name']}"
+        status = " ❌" if span.get("status") == "error" else ""
+        print(f"  {label[:48]:<48} {span['duration_ms']:>9.2f} ms |{bar:<{width}}|{status}")
+        for child in children.get(span["span_id"], []):
+            walk(child, depth + 1)
+
+    root = root_of(spans)
+    walk(root, 0)
+    # 부모를 찾지 못한 span (다른 파일에 부모가 없는 경우 등)
+    reachable = set()
+    stack = [root]
+    while stack:
+        span = stack.pop()
+        reachable.add(span["span_id"])
+        stack.extend(children.get(span["span_id"], []))
+    ids = {span["span_id"] for span in spans}
+    for span in spans:
+        if span["span_id"] not in reachable and span.get("parent_span_id") not in ids:
+            walk(span, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="span JSONL → 요청별 워터폴")
+    parser.add_argument("files", nargs="+", help="TRACE_EXPORT_FILE로 기록된 JSONL 파일들")
+    parser.add_argument("--trace", help="출력할 trace ID")
+    parser.add_argument("--slowest", type=int, default=5, help="가장 느린 요청 N개 출력 (기본 5)")
+    parser.add_argument("--width", type=int, default=50, help="막대 폭")
+    args = parser.parse_args()
+
+    traces = load_spans(args.files)
+    if args.trace:
+        if args.trace not in traces:
+            print(f"❌ trace {args.trace}를 찾을 수 없습니다")
+            return
+        print_waterfall(args.trace, traces[args.trace], args.width)
+        return
+
+    def duration(spans: List[dict]) -> int:
+        root = root_of(spans)
+        return root["end_time_unix_nano"] - root["start_time_unix_nano"]
+
+    slowest = sorted(traces.items(), key=lambda item: duration(item[1]), reverse=True)[:args.slowest]
+    print(f"📊 traces={len(traces)}, 가장 느린 {len(slowest)}개")
+    for trace_id, spans in slowest:
+        print_waterfall(trace_id, spans, args.width)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,9 @@
 import os
 import logging
 
+from app.common.deadline import enforce_deadline
+from app.common.tracing import instrument_engine
+
 logger = logging.getLogger(__name__)
 
 # Railway PostgreSQL 환경변수 사용
@@ -28,6 +31,10 @@
         echo=False            # SQL 로그 비활성화
     )
     
+    # 쿼리마다 트레이싱 span 기록 (트레이싱 비활성 시 즉시 반환)
+    instrument_engine(engine)
+    enforce_deadline(engine)
+    
     # Async 세션 팩토리 생성
     SessionLocal = async_sessionmaker(
         engine, 
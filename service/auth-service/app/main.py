@@ -11,6 +11,9 @@
 
 from app.common.database import get_db, engine, check_database_connection, test_database_connection, init_database, check_tables_status
 from .router.auth_router import auth_router
+from app.common.tracing import init_tracing
+from app.common.deadline import DeadlineMiddleware
+from app.common.discovery import register_with_gateway
 
 # ---------- 로깅 설정 ----------
 log_dir = tempfile.gettempdir()
@@ -67,6 +70,15 @@
     allow_headers=["*"],
 )
 
+# 게이트웨이 X-Request-Timeout-Ms 준수 (deadline이 지나면 처리 중단 후 504)
+app.add_middleware(DeadlineMiddleware)
+
+# W3C traceparent 기반 분산 트레이싱 (TRACE_EXPORT_FILE / OTEL_EXPORTER_OTLP_ENDPOINT 설정 시 span 기록)
+init_tracing("auth-service", app)
+
+# GATEWAY_DISCOVERY_URL 설정 시 게이트웨이 서비스 레지스트리에 등록하고 heartbeat 전송
+register_with_gateway(app, "auth", default_port=8008)
+
 # ---------- 라우터 ----------
 app.include_router(auth_router)  # prefix 제거 (auth_router에 이미 있음)
 
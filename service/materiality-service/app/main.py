@@ -3,6 +3,9 @@
 from pydantic import BaseModel
 from datetime import datetime
 import logging
+from app.common.tracing import init_tracing
+from app.common.deadline import DeadlineMiddleware
+from app.common.discovery import register_with_gateway
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +26,15 @@
     allow_headers=["*"],
 )
 
+# 게이트웨이 X-Request-Timeout-Ms 준수 (deadline이 지나면 처리 중단 후 504)
+app.add_middleware(DeadlineMiddleware)
+
+# W3C traceparent 기반 분산 트레이싱 (TRACE_EXPORT_FILE / OTEL_EXPORTER_OTLP_ENDPOINT 설정 시 span 기록)
+init_tracing("materiality-service", app)
+
+# GATEWAY_DISCOVERY_URL 설정 시 게이트웨이 서비스 레지스트리에 등록하고 heartbeat 전송
+register_with_gateway(app, "materiality", default_port=8002)
+
 # APIRouter 정의
 materiality_router = APIRouter()
 
@@ -0,0 +1,180 @@
+# 자동 생성 파일 - 원본: shared/common/deadline.py (직접 수정하지 말고 원본 수정 후 `python shared/sync.py`)
+"""
+요청 deadline 준수 (게이트웨이 X-Request-Timeout-Ms 헤더)
+
+게이트웨이는 라우트별 타임아웃 예산 중 남은 시간(ms)을 상대값으로 전달하고, 서비스는 받은 시점의
+monotonic 시계로 로컬 deadline을 계산한다 (호스트 간 벽시계 차이의 영향을 받지 않음).
+- DeadlineMiddleware: deadline이 이미 지난 요청은 바로 504, 처리 중 deadline이 지나면 작업을 취소
+  (asyncpg는 태스크 취소 시 실행 중인 서버 쿼리도 취소)
+  요청 본문이 있으면 본문 수신이 끝난 시점부터 예산을 적용 (큰 업로드가 전송 중에 504가 되지 않도록)
+- enforce_deadline(engine): deadline이 지난 뒤에는 새 DB 쿼리를 실행하지 않음
+- deadline_headers(): 다른 서비스를 호출할 때 남은 deadline을 그대로 전달
+헤더가 없으면(게이트웨이를 거치지 않은 직접 호출) 아무 제한도 걸지 않는다.
+"""
+from contextvars import ContextVar
+from typing import Dict, Optional
+import asyncio
+import json
+import logging
+import time
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_HEADER = "x-request-timeout-ms"
+
+
+
+class _Deadline:
+    """요청 deadline (time.monotonic 기준 초). 본문 수신 후에 정해질 수 있어 가변 객체로 둠"""
+
+    __slots__ = ("at",)
+
+    def __init__(self, at: Optional[float] = None):
+        self.at = at
+
+
+# 현재 요청의 deadline
+_deadline: ContextVar[Optional[_Deadline]] = ContextVar("request_deadline", default=None)
+
+
+def parse_timeout(value: Optional[str]) -> Optional[float]:
+    """헤더 값(남은 ms) → 초. 형식이 잘못되면 None (0 이하는 이미 만료)"""
+    if not value:
+        return None
+    try:
+        return int(value.strip()) / 1000
+    except ValueError:
+        return None
+
+
+def get_deadline() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline.at
+
+
+def remaining() -> Optional[float]:
+    """deadline까지 남은 시간(초). deadline이 없으면(본문 수신 중 포함) None"""
+    deadline = get_deadline()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+class DeadlineExceeded(HTTPException):
+    def __init__(self):
+        super().__init__(status_code=504, detail="Request deadline exceeded")
+
+
+def check_deadline() -> None:
+    """오래 걸리는 작업 사이사이에 호출해 deadline이 지났으면 중단"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+def deadline_headers() -> Dict[str, str]:
+    """외부 서비스 호출용 남은 시간 헤더 (deadline이 없으면 빈 dict)"""
+    left = remaining()
+    return {} if left is None else {TIMEOUT_HEADER: str(max(0, int(left * 1000)))}
+
+
+def enforce_deadline(engine) -> None:
+    """SQLAlchemy (Async)Engine: deadline이 지난 요청의 쿼리는 실행 전에 중단"""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        check_deadline()
+
+
+class DeadlineMiddleware:
+    """X-Request-Timeout-Ms를 읽어 요청 처리를 deadline 안으로 제한하는 ASGI 미들웨어"""
+
+    def __init__(self, app):
+        self.app = app
+        self.expired = 0
+        self.abandoned = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        left = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-timeout-ms":
+                left = parse_timeout(value.decode("latin-1"))
+                break
+        if left is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope.get("path", "")
+        if left <= 0:
+            # 게이트웨이가 이미 포기한 요청이므로 처리하지 않음
+            self.expired += 1
+            logger.warning(f"⏱️ deadline이 지난 요청 거부: {path} ({max(0.0, -left) * 1000:.0f}ms 초과)")
+            await _send_timeout(send)
+            return
+
+        started = False
+        deadline = _Deadline()
+        loop = asyncio.get_running_loop()
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        async def receive_wrapper():
+            message = await receive()
+            if deadline.at is None and message["type"] == "http.request" and not message.get("more_body", False):
+                # 본문 수신 완료 → 이 시점부터 예산 적용
+                deadline.at = time.monotonic() + left
+                timeout.reschedule(loop.time() + left)
+            return message
+
+        token = _deadline.set(deadline)
+        try:
+            async with asyncio.timeout(None) as timeout:
+                if not _has_body(scope):
+                    deadline.at = time.monotonic() + left
+                    timeout.reschedule(loop.time() + left)
+                await self.app(scope, receive_wrapper, send_wrapper)
+        except TimeoutError:
+            if not timeout.expired():
+                # 앱 내부에서 발생한 다른 타임아웃
+                raise
+            self.abandoned += 1
+            logger.warning(f"⏱️ deadline 초과로 요청 처리 중단: {path}")
+            if not started:
+                await _send_timeout(send)
+        except DeadlineExceeded:
+            # 라우터 밖(응답 스트리밍 중 등)에서 발생한 경우
+            self.abandoned += 1
+            logger.warning(f"⏱️ deadline 초과로 요청 처리 중단: {path}")
+            if not started:
+                await _send_timeout(send)
+        finally:
+            _deadline.reset(token)
+
+
+def _has_body(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            return value.strip() not in (b"", b"0")
+        if name == b"transfer-encoding":
+            return True
+    return False
+
+
+async def _send_timeout(send) -> None:
+    body = json.dumps({"detail": "Request deadline exceeded"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 504,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
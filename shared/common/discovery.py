@@ -0,0 +1,132 @@
+"""
+게이트웨이 서비스 레지스트리 등록
+
+GATEWAY_DISCOVERY_URL(예: http://gateway:8080/api/v1/discovery)이 설정되어 있으면
+시작 시 자기 주소를 등록하고, 게이트웨이가 알려준 주기로 heartbeat를 보내며, 종료 시 등록을 해제한다.
+- 게이트웨이 재시작이나 TTL 만료로 heartbeat가 404를 받으면 같은 instance_id로 다시 등록
+- 게이트웨이에 연결할 수 없어도 서비스 시작/요청 처리는 막지 않음 (로그만 남기고 재시도)
+설정이 없으면 아무것도 하지 않으며, 게이트웨이는 환경변수({SERVICE}_SERVICE_URL) 주소로 라우팅한다.
+"""
+from typing import Any, Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import socket
+import urllib.error
+import urllib.request
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class GatewayRegistration:
+    def __init__(
+        self,
+        service: str,
+        url: Optional[str] = None,
+        gateway_url: Optional[str] = None,
+        ttl: Optional[float] = None,
+        weight: Optional[float] = None,
+        token: Optional[str] = None,
+        default_port: int = 8000,
+    ):
+        self.service = service
+        self.gateway_url = (gateway_url or os.getenv("GATEWAY_DISCOVERY_URL", "")).rstrip("/")
+        # 게이트웨이가 이 인스턴스를 호출할 주소 (기본: 컨테이너 호스트명:PORT)
+        self.url = url or os.getenv("SERVICE_ADVERTISE_URL") or (
+            f"http://{socket.gethostname()}:{os.getenv('PORT', default_port)}"
+        )
+        self.ttl = ttl or float(os.getenv("GATEWAY_DISCOVERY_TTL", 30))
+        self.weight = weight if weight is not None else float(os.getenv("SERVICE_WEIGHT", 1.0))
+        self.token = token if token is not None else os.getenv("GATEWAY_DISCOVERY_TOKEN", "")
+        self.instance_id = os.getenv("SERVICE_INSTANCE_ID") or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.heartbeat_interval = self.ttl / 3
+        self.registered = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.gateway_url)
+
+    def _call(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(f"{self.gateway_url}{path}", data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        if self.token:
+            request.add_header("Authorization", f"Bearer {self.token}")
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                payload = response.read()
+                return response.status, json.loads(payload) if payload else {}
+        except urllib.error.HTTPError as e:
+            return e.code, {}
+
+    async def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any]]:
+        # 표준 라이브러리 HTTP 클라이언트는 동기식이므로 스레드에서 실행
+        return await asyncio.to_thread(self._call, method, path, body)
+
+    async def register(self) -> bool:
+        status, body = await self._request("POST", "/register", {
+            "service": self.service,
+            "url": self.url,
+            "weight": self.weight,
+            "instance_id": self.instance_id,
+            "ttl": self.ttl,
+        })
+        if status != 201:
+            logger.warning(f"⚠️ 게이트웨이 등록 실패 (HTTP {status}): {self.gateway_url}")
+            return False
+        self.heartbeat_interval = float(body.get("heartbeat_interval") or self.ttl / 3)
+        self.registered = True
+        logger.info(f"🧭 게이트웨이 등록 완료: {self.service} → {self.url} (id={self.instance_id})")
+        return True
+
+    async def heartbeat(self) -> bool:
+        status, _ = await self._request("PUT", f"/{self.service}/{self.instance_id}/heartbeat", {"ttl": self.ttl})
+        if status == 404:
+            logger.info("🧭 게이트웨이에 등록 정보가 없어 다시 등록합니다")
+            return await self.register()
+        return status == 200
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                ok = await (self.heartbeat() if self.registered else self.register())
+            except Exception as e:
+                ok = False
+                logger.warning(f"⚠️ 게이트웨이 레지스트리 연결 실패: {e}")
+            # 실패하면 TTL이 끝나기 전에 여러 번 재시도하도록 짧게 대기
+            await asyncio.sleep(self.heartbeat_interval if ok else min(self.heartbeat_interval, 5.0))
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        if self.registered:
+            try:
+                await self._request("DELETE", f"/{self.service}/{self.instance_id}")
+                logger.info(f"🧭 게이트웨이 등록 해제: {self.service} (id={self.instance_id})")
+            except Exception as e:
+                # 해제에 실패해도 TTL이 지나면 게이트웨이에서 빠짐
+                logger.warning(f"⚠️ 게이트웨이 등록 해제 실패: {e}")
+            self.registered = False
+
+
+def register_with_gateway(app, service: str, default_port: int = 8000) -> GatewayRegistration:
+    """앱 startup/shutdown에 게이트웨이 등록/해제를 연결 (GATEWAY_DISCOVERY_URL이 없으면 아무것도 하지 않음)"""
+    registration = GatewayRegistration(service, default_port=default_port)
+    app.add_event_handler("startup", registration.start)
+    app.add_event_handler("shutdown", registration.stop)
+    app.state.gateway_registration = registration
+    return registration
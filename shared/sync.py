@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+공용 모듈 동기화 (shared/common → 각 서비스 app/common, 게이트웨이 app/common/utility)
+
+서비스는 자기 디렉터리를 빌드 컨텍스트로 독립 배포되므로 공용 모듈을 설치하지 않고 복사(vendor)해 사용한다.
+원본은 shared/common 하나뿐이고 복사본은 이 스크립트로만 만든다 (복사본을 직접 고치지 말 것).
+    python shared/sync.py          # 복사본 갱신
+    python shared/sync.py --check  # 원본과 다른 복사본이 있으면 목록을 출력하고 실패 (테스트/CI)
+"""
+from pathlib import Path
+from typing import Dict, List, Tuple
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+SOURCE_DIR = ROOT / "shared" / "common"
+
+# 서비스마다 app/common 아래에 복사하는 모듈
+SERVICE_MODULES = ("tracing.py", "deadline.py", "discovery.py")
+# 게이트웨이에 복사하는 모듈: 원본 → (대상 경로, 치환 목록)
+GATEWAY_MODULES: Dict[str, Tuple[Path, Tuple[Tuple[str, str], ...]]] = {
+    "tracing.py": (
+        ROOT / "gateway" / "app" / "common" / "utility" / "tracing.py",
+        # 게이트웨이 로그는 모두 gateway_api 로거로 모음
+        (('logger = logging.getLogger(__name__)', 'logger = logging.getLogger("gateway_api")'),),
+    ),
+}
+
+HEADER = "# 자동 생성 파일 - 원본: shared/common/{name} (직접 수정하지 말고 원본 수정 후 `python shared/sync.py`)\n"
+
+
+def render(name: str, replacements: Tuple[Tuple[str, str], ...] = ()) -> str:
+    text = (SOURCE_DIR / name).read_text(encoding="utf-8")
+    for old, new in replacements:
+        if old not in text:
+            raise ValueError(f"{name}: '{old}' not found")
+        text = text.replace(old, new)
+    return HEADER.format(name=name) + text
+
+
+def targets() -> List[Tuple[Path, str]]:
+    """(복사본 경로, 기대 내용) 목록"""
+    result = []
+    for service_dir in sorted((ROOT / "service").glob("*-service")):
+        common = service_dir / "app" / "common"
+        if common.is_dir():
+            result.extend((common / name, render(name)) for name in SERVICE_MODULES)
+    for name, (path, replacements) in GATEWAY_MODULES.items():
+        result.append((path, render(name, replacements)))
+    return result
+
+
+def stale() -> List[Path]:
+    """원본과 내용이 다른(또는 없는) 복사본"""
+    return [
+        path for path, expected in targets()
+        if not path.exists() or path.read_text(encoding="utf-8") != expected
+    ]
+
+
+def sync() -> List[Path]:
+    updated = []
+    for path, expected in targets():
+        if not path.exists() or path.read_text(encoding="utf-8") != expected:
+            path.write_text(expected, encoding="utf-8")
+            updated.append(path)
+    return updated
+
+
+def main(argv: List[str]) -> int:
+    if "--check" in argv:
+        paths = stale()
+        for path in paths:
+            print(f"❌ 원본과 다름: {path.relative_to(ROOT)}")
+        if paths:
+            print("👉 python shared/sync.py 로 복사본을 갱신하세요")
+            return 1
+        print("✅ 공용 모듈 복사본이 모두 최신입니다")
+        return 0
+    for path in sync():
+        print(f"🔄 갱신: {path.relative_to(ROOT)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))